@@ -0,0 +1,58 @@
+"""
+Per-call cost of Binding on numpy functions,
+with the signature cache against inspect.signature at each call.
+
+    python benchmarks/bench_binding.py [--number N]
+"""
+import argparse
+import inspect
+import timeit
+
+import numpy as np
+
+from pytracer.core.inout import binding
+
+
+def uncached_binding(function, *args, **kwargs):
+    try:
+        bind = inspect.signature(function).bind(*args, **kwargs)
+        return bind.arguments
+    except (ValueError, TypeError):
+        return {**{f"Arg{i}": x for i, x in enumerate(args)}, **kwargs}
+
+
+def cached_binding(function, *args, **kwargs):
+    return binding.Binding(function, *args, **kwargs).arguments
+
+
+x = np.arange(10.)
+calls = [
+    ("numpy.sum(x, axis=0)", np.sum, (x,), {"axis": 0}),
+    ("numpy.mean(x)", np.mean, (x,), {}),
+    ("numpy.linspace(0, 1, num=5)", np.linspace, (0, 1), {"num": 5}),
+    ("numpy.concatenate((x, x))", np.concatenate, ((x, x),), {}),
+    ("numpy.add(x, x) (ufunc)", np.add, (x, x), {}),
+    ("numpy.asarray(x) (builtin)", np.asarray, (x,), {}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'call':<32}{'uncached':>12}{'cached':>12}{'speedup':>10}")
+    for name, function, fargs, fkwargs in calls:
+        times = []
+        for bind in (uncached_binding, cached_binding):
+            assert bind(function, *fargs, **fkwargs) is not None
+            t = timeit.timeit(lambda: bind(function, *fargs, **fkwargs),
+                              number=args.number)
+            times.append(t / args.number * 1e9)
+        uncached, cached = times
+        print(f"{name:<32}{uncached:>10.0f}ns{cached:>10.0f}ns"
+              f"{uncached / cached:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Write and read throughput of the arrays exported by pytracer parse for
+several compression settings (config io.export). Each call exports the
+mean, std and sig of a 2D argument, then every call is read back as the
+GUI heatmaps do.
+
+    PYTRACER_CONFIG=<config.json> python benchmarks/bench_export.py \
+        [--calls N] [--shape 256 256]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+settings = {
+    "zlib-9": {"complib": "zlib", "complevel": 9, "shuffle": "none"},
+    "lz4-5": {"complib": "blosc:lz4", "complevel": 5, "shuffle": "byte"},
+    "lz4-5-bit": {"complib": "blosc:lz4", "complevel": 5, "shuffle": "bit"},
+    "zstd-5": {"complib": "blosc:zstd", "complevel": 5, "shuffle": "byte"},
+    "none": {"complib": "none"},
+}
+
+chunks = ("auto", 4096)
+
+
+def worker(calls, shape):
+    from types import SimpleNamespace
+
+    import numpy as np
+    import tables
+
+    from pytracer.core.inout.exporter._hdf5 import ExporterHDF5
+    from pytracer.core.stats.stats import get_stats
+    from pytracer.gui.core import Data
+
+    rng = np.random.default_rng(0)
+    axes = np.meshgrid(*(np.linspace(0, np.pi, n) for n in shape),
+                       indexing="ij")
+    reference = np.sin(sum(axes))
+    # Statistics of a few arguments, exported again and again
+    stats = [get_stats([reference + rng.normal(0, 1e-6 * (i + 1), shape)
+                        for _ in range(4)])
+             for i in range(8)]
+    for statistic in stats:
+        statistic.mean(), statistic.std(), statistic.sig()
+
+    exporter = ExporterHDF5()
+    backtrace = SimpleNamespace(filename="bench", line="", lineno=0,
+                                name="bench")
+    expectedrows = [10]
+    start = time.perf_counter()
+    for time_ in range(calls):
+        exporter.export({"module": "bench", "function": "heatmap",
+                         "label": "outputs", "id": 0, "time": time_,
+                         "backtrace": backtrace,
+                         "args": {"Ret": stats[time_ % len(stats)]}},
+                        expectedrows)
+    exporter.end()
+    write = time.perf_counter() - start
+
+    os.makedirs(os.path.join(exporter.parameters.cache_path, "sources"),
+                exist_ok=True)
+    data = Data(exporter.filename_path, exporter.parameters.cache_path)
+    start = time.perf_counter()
+    for time_ in range(calls):
+        for mode in ("mean", "std", "sig"):
+            data.get_extra_value("bench", "heatmap", "outputs", "Ret",
+                                 time_, mode).read()
+    read = time.perf_counter() - start
+
+    # Moments are written with the statistics but not read
+    with tables.open_file(exporter.filename_path) as h5file:
+        written = sum(array.size_in_memory
+                      for array in h5file.walk_nodes("/", "EArray"))
+        size = sum(array.size_on_disk
+                   for array in h5file.walk_nodes("/", "EArray"))
+    print(write, read, written, 3 * calls * reference.nbytes, size)
+
+
+def run(directory, config, name, chunk, calls, shape):
+    config = dict(config)
+    export = dict(settings[name], chunk=chunk)
+    config["io"] = dict(config.get("io", {}), export=export,
+                        cache={"root": os.path.join(directory,
+                                                    f"{name}.{chunk}")})
+    config["logger"] = dict(config.get("logger", {}),
+                            output=os.path.join(directory, "bench.log"))
+    path = os.path.join(directory, f"config.{name}.{chunk}.json")
+    with open(path, "w") as ostream:
+        json.dump(config, ostream)
+    env = dict(os.environ, PYTRACER_CONFIG=path)
+    output = subprocess.run([sys.executable, __file__, "--worker",
+                             "--calls", str(calls),
+                             "--shape", *map(str, shape)],
+                            env=env, cwd=directory, check=True,
+                            capture_output=True, text=True).stdout
+    write, read, written, nbytes, size = output.split()[-5:]
+    return float(write), float(read), int(written), int(nbytes), int(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--shape", type=int, nargs="+", default=[256, 256])
+    parser.add_argument("--worker", action="store_true",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.calls, tuple(args.shape))
+        return
+
+    config_path = os.getenv("PYTRACER_CONFIG")
+    if not config_path:
+        sys.exit("PYTRACER_CONFIG does not exist")
+    with open(config_path) as istream:
+        config = json.load(istream)
+
+    print(f"{args.calls} calls of shape {tuple(args.shape)}")
+    print(f"{'setting':<12}{'chunk':>8}{'write':>12}{'read':>12}"
+          f"{'ratio':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in settings:
+            for chunk in chunks:
+                write, read, written, nbytes, size = run(
+                    directory, config, name, chunk, args.calls, args.shape)
+                print(f"{name:<12}{chunk:>8}"
+                      f"{written / write / 1e6:>8.0f}MB/s"
+                      f"{nbytes / read / 1e6:>8.0f}MB/s"
+                      f"{written / size:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
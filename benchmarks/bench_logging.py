@@ -0,0 +1,112 @@
+"""
+Per-call cost of tracing a function at each logger level, and cost of
+the record debug message of the writer alone, deferred (%-style args)
+or formatted eagerly with an f-string. The binary trace format is used
+so that pickling does not hide the logging cost.
+
+    PYTRACER_CONFIG=<config.json> python benchmarks/bench_logging.py \
+        [--number N]
+"""
+import argparse
+import atexit
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+levels = ("debug", "info", "warning")
+
+
+def traced(x, y=1.0):
+    return x * y
+
+
+def worker(number):
+    import numpy as np
+
+    import pytracer.cache as cache
+    import pytracer.utils.report as report
+    report.report = report.Report("off", "")
+    from pytracer.core.inout.writer import Writer
+    atexit.unregister(Writer.exit)
+
+    cache.id_dict[id(traced)] = traced
+    info = (id(traced), __name__, "traced")
+    x = np.arange(16.)
+
+    def call():
+        Writer.write_function(info, x, y=2.0)
+
+    from pytracer.utils.log import get_logger
+    logger = get_logger()
+    fields = (id(traced), 0, __name__, "traced", "inputs", Writer.backtrace())
+
+    function_id, time, module, function, label, backtrace = fields
+
+    def deferred():
+        logger.debug(("id: %s\ntime: %s\nmodule: %s\nfunction: %s\n"
+                      "label: %s\nbacktrace: %s\n"),
+                     function_id, time, module, function, label, backtrace)
+
+    def eager():
+        logger.debug((f"id: {function_id}\n"
+                      f"time: {time}\n"
+                      f"module: {module}\n"
+                      f"function: {function}\n"
+                      f"label: {label}\n"
+                      f"backtrace: {backtrace}\n"))
+
+    call()
+    times = [timeit.timeit(f, number=number) / number * 1e9
+             for f in (call, deferred, eager)]
+    Writer.exit()
+    print(*times)
+
+
+def run(directory, config, level, number):
+    config = dict(config)
+    config["logger"] = dict(config.get("logger", {}), level=level,
+                            output=os.path.join(directory, f"{level}.log"))
+    config["io"] = dict(config.get("io", {}), type="binary",
+                        cache={"root": os.path.join(directory, "cache")})
+    path = os.path.join(directory, f"config.{level}.json")
+    with open(path, "w") as ostream:
+        json.dump(config, ostream)
+    env = dict(os.environ, PYTRACER_CONFIG=path)
+    output = subprocess.run([sys.executable, __file__, "--worker",
+                             "--number", str(number)],
+                            env=env, cwd=directory, check=True,
+                            capture_output=True, text=True).stdout
+    return [float(t) for t in output.split()[-3:]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--worker", action="store_true",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.number)
+        return
+
+    config_path = os.getenv("PYTRACER_CONFIG")
+    if not config_path:
+        sys.exit("PYTRACER_CONFIG does not exist")
+    with open(config_path) as istream:
+        config = json.load(istream)
+
+    print(f"{'level':<10}{'traced call':>14}{'deferred debug':>16}"
+          f"{'eager debug':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for level in levels:
+            call, deferred, eager = run(directory, config, level, args.number)
+            print(f"{level:<10}{call:>12.0f}ns{deferred:>14.0f}ns"
+                  f"{eager:>12.0f}ns")
+
+
+if __name__ == "__main__":
+    main()
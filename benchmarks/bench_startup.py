@@ -0,0 +1,91 @@
+"""
+Startup time of pytracer trace with eager and lazy wrapping of the
+traced modules (config wrapper.lazy), on an application that imports
+them and calls a single function.
+
+    PYTRACER_CONFIG=<config.json> python benchmarks/bench_startup.py \
+        [--modules numpy scipy] [--repeat N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+application = """
+import {module}
+"""
+
+call = "{module}.sum([1.0, 2.0])\n"
+
+
+def write_config(directory, config, modules, lazy):
+    config = dict(config, modules_to_load=modules, wrapper={"lazy": lazy})
+    name = "lazy" if lazy else "eager"
+    path = os.path.join(directory, f"config.{name}.json")
+    with open(path, "w") as ostream:
+        json.dump(config, ostream)
+    return path
+
+
+def write_application(directory, modules):
+    path = os.path.join(directory, "application.py")
+    with open(path, "w") as ostream:
+        for module in modules:
+            ostream.write(application.format(module=module))
+        ostream.write(call.format(module=modules[0]))
+    return path
+
+
+def run(directory, config_path, application_path):
+    env = dict(os.environ, PYTRACER_CONFIG=config_path)
+    command = [sys.executable, "-m", "pytracer", "trace",
+               "--command", application_path]
+    start = time.perf_counter()
+    subprocess.run(command, env=env, cwd=directory, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", nargs="+", default=["numpy"])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    config_path = os.getenv("PYTRACER_CONFIG")
+    if not config_path:
+        sys.exit("PYTRACER_CONFIG does not exist")
+    with open(config_path) as istream:
+        config = json.load(istream)
+    # Relative paths of the config are resolved from its directory
+    config_directory = os.path.dirname(os.path.abspath(config_path))
+    for key in ("include_file", "exclude_file"):
+        value = config.get(key)
+        if isinstance(value, str) and value:
+            config[key] = os.path.join(config_directory, value)
+        elif isinstance(value, list):
+            config[key] = [os.path.join(config_directory, v) for v in value]
+
+    with tempfile.TemporaryDirectory() as directory:
+        application_path = write_application(directory, args.modules)
+        times = {}
+        for lazy in (False, True):
+            path = write_config(directory, config, args.modules, lazy)
+            times[lazy] = [run(directory, path, application_path)
+                           for _ in range(args.repeat)]
+
+    print(f"modules: {' '.join(args.modules)} ({args.repeat} runs)")
+    print(f"{'wrapping':<10}{'median':>10}{'min':>10}")
+    for lazy, name in ((False, "eager"), (True, "lazy")):
+        print(f"{name:<10}{statistics.median(times[lazy]):>9.2f}s"
+              f"{min(times[lazy]):>9.2f}s")
+    speedup = statistics.median(times[False]) / statistics.median(times[True])
+    print(f"speedup {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import json
 import os
 
 import pytest
@@ -19,6 +20,42 @@ def parse(script_runner):
     assert(ret.success)
 
 
+def _update(config, sections):
+    for key, value in sections.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            _update(config[key], value)
+        else:
+            config[key] = value
+
+
+@pytest.fixture
+def pytracer_config(tmp_path, monkeypatch):
+    """
+    Configuration of PYTRACER_CONFIG updated with the given sections,
+    used by the scripts run next
+    """
+    path = os.getenv("PYTRACER_CONFIG")
+    with open(path) as istream:
+        default = json.load(istream)
+    directory = os.path.dirname(os.path.abspath(path))
+    default["exclude_file"] = [os.path.join(directory, filename)
+                               for filename in default["exclude_file"]]
+    if default.get("include_file"):
+        default["include_file"] = os.path.join(directory,
+                                               default["include_file"])
+
+    def update(**sections):
+        config = json.loads(json.dumps(default))
+        _update(config, sections)
+        filename = tmp_path / "config.json"
+        with open(filename, "w") as ostream:
+            json.dump(config, ostream)
+        monkeypatch.setenv("PYTRACER_CONFIG", str(filename))
+        return filename
+
+    return update
+
+
 def pytest_addoption(parser):
     parser.addoption(
         "--nsamples", action="store", type=int, default=1,
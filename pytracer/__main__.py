@@ -6,6 +6,7 @@ import pytracer.builtins
 import pytracer.cache
 import pytracer.gui.index_init as visualize_init
 import pytracer.module.clean_init as clean_init
+import pytracer.module.compact_init as compact_init
 import pytracer.module.info as pytracer_info
 import pytracer.module.info_init as info_init
 import pytracer.module.parser_init as parser_init
@@ -23,7 +24,16 @@ def clean():
 
 
 def pytracer_module_main(args):
-    if args.pytracer_module == "trace":
+    if args.pytracer_module == "trace" and args.samples > 1:
+        # Imported alone since importing the tracer opens a trace
+        from pytracer.module.campaign import main
+        pytracer_info.register.set_args(args)
+        main(args)
+        pytracer_info.register.register_campaign()
+        if args.aggregate:
+            pytracer_info.register.set_aggregation_size()
+            pytracer_info.register.register_aggregation()
+    elif args.pytracer_module == "trace":
         from pytracer.module.tracer import TracerRun
         pytracer.builtins.overload_builtins()
         pytracer_info.register.set_args(args)
@@ -38,6 +48,10 @@ def pytracer_module_main(args):
         main(args)
         pytracer_info.register.set_aggregation_size()
         pytracer_info.register.register_aggregation()
+    elif args.pytracer_module == "compact":
+        from pytracer.module.compact import main
+        pytracer.cache.set_module_args(args)
+        main(args)
     elif args.pytracer_module == "visualize":
         from pytracer.gui.index import main
         pytracer.cache.set_module_args(args)
@@ -56,6 +70,7 @@ def main():
 
     tracer_init.init_module(subparser)
     parser_init.init_module(subparser)
+    compact_init.init_module(subparser)
     visualize_init.init_module(subparser)
     info_init.init_module(subparser)
     clean_init.init_module(subparser)
@@ -67,12 +67,16 @@ class DictAt:
 
 
 environment_variables = {
-    "config": "PYTRACER_CONFIG"
+    "config": "PYTRACER_CONFIG",
+    "aggregator": "PYTRACER_AGGREGATOR",
+    "sample": "PYTRACER_SAMPLE"
 }
 
 _text_extension = ".txt"
 _json_extension = ".json"
 _pickle_extension = ".pkl"
+_binary_extension = ".ptb"
+_blobs_extension = ".blobs"
 _hdf5_extension = ".h5"
 _csv_extension = ".csv"
 
@@ -84,15 +88,20 @@ class _Constant(metaclass=Singleton):
                   "stats": "stats",
                   'sources': 'sources',
                   'info': 'info',
-                  'report': 'report'},
+                  'report': 'report',
+                  'plans': 'plans',
+                  'campaigns': 'campaigns'},
         "register": {
             'trace': 'trace',
-            'aggregation': 'aggregation'
+            'aggregation': 'aggregation',
+            'campaign': 'campaign'
         },
         "extension": {
             'text': _text_extension,
             'json': _json_extension,
             'pickle': _pickle_extension,
+            'binary': _binary_extension,
+            'blobs': _blobs_extension,
             'hdf5': _hdf5_extension,
             "csv": _csv_extension
         },
@@ -108,11 +117,26 @@ class _Constant(metaclass=Singleton):
             "filename": "callgraph",
             "ext": _pickle_extension
         },
+        "plan": {
+            "filename": "plan",
+            "ext": _pickle_extension
+        },
+        "metrics": {
+            "filename": "metrics"
+        },
+        "campaign": {
+            "filename": "campaign",
+            "sample": "sample"
+        },
+        "sampling": {
+            "filename": "sampling_schedule",
+            "ext": _pickle_extension
+        },
         "export": {
             "filename": "stats",
             "ext": _hdf5_extension
         },
-        "iotypes": ["pickle"],
+        "iotypes": ["pickle", "binary"],
         "env": environment_variables,
     }
 
@@ -192,12 +216,21 @@ class _Config(object, metaclass=Singleton):
                    "io.cache.sources",
                    "io.cache.report",
                    "io.cache.info",
+                   "io.cache.plans",
+                   "io.cache.campaigns",
                    "io.export.filename",
                    "io.stats.filename",
                    "io.stats.callgraph",
                    "io.report.filename",
                    "numpy",
-                   "numpy.ufunc"
+                   "numpy.ufunc",
+                   "sampling",
+                   "sampling.enable",
+                   "sampling.rules",
+                   "sampling.schedule",
+                   "wrapper",
+                   "wrapper.lazy",
+                   "wrapper.plan"
                    ]
 
     _data = {}
@@ -6,6 +6,7 @@ class IOType(IntEnum):
     TEXT = auto()
     JSON = auto()
     PICKLE = auto()
+    BINARY = auto()
 
     def from_string(string):
         if string == "text":
@@ -14,9 +15,20 @@ class IOType(IntEnum):
             return IOType.JSON
         if string == "pickle":
             return IOType.PICKLE
+        if string == "binary":
+            return IOType.BINARY
         return None
 
 
+# Record written before the writer clears its pickler memo:
+# readers must clear their unpickler memo when they meet it
+memo_reset_marker = "__pytracer_memo_reset__"
+
+# Record written last by a writer streaming to an aggregator:
+# a stream ending without it comes from a sample that failed
+end_of_stream_marker = "__pytracer_end_of_stream__"
+
+
 def split_filename(filename):
     _, name = os.path.split(filename)
     head, count, ext = name.split(os.extsep)
@@ -10,6 +10,7 @@ class IOType(IntEnum):
     TEXT = auto()
     JSON = auto()
     PICKLE = auto()
+    BINARY = auto()
 
     def from_string(string):
         if string == "text":
@@ -18,6 +19,35 @@ class IOType(IntEnum):
             return IOType.JSON
         if string == "pickle":
             return IOType.PICKLE
+        if string == "binary":
+            return IOType.BINARY
+        return None
+
+
+class WriterMode(IntEnum):
+    SYNC = auto()
+    ASYNC = auto()
+
+    def from_string(string):
+        if string == "sync":
+            return WriterMode.SYNC
+        if string == "async":
+            return WriterMode.ASYNC
+        return None
+
+
+class Backpressure(IntEnum):
+    BLOCK = auto()
+    DROP = auto()
+    SPILL = auto()
+
+    def from_string(string):
+        if string == "block":
+            return Backpressure.BLOCK
+        if string == "drop":
+            return Backpressure.DROP
+        if string == "spill":
+            return Backpressure.SPILL
         return None
 
 
@@ -31,10 +61,23 @@ class IOInitializer(metaclass=Singleton):
                      "sources": constant.cache.sources,
                      "info": constant.cache.info,
                      "report": constant.cache.report,
+                     "plans": constant.cache.plans,
+                     "campaigns": constant.cache.campaigns,
                      "trace": constant.trace.filename,
                      "callgraph": constant.callgraph.filename,
                      "export": constant.export.filename
                      }
+    writer_default = {"mode": WriterMode.SYNC,
+                      "queue_size": 1024,
+                      "backpressure": Backpressure.BLOCK,
+                      "memo_records": 1024,
+                      "memo_bytes": 64 * 2**20}
+    dedup_default = {"enable": False,
+                     "min_bytes": 4096,
+                     "cache_size": 128}
+    metrics_default = {"enable": False,
+                       "interval": 10}
+    report_default = {"sample": 0}
 
     def __init__(self):
         self.read_parameters()
@@ -45,6 +88,11 @@ class IOInitializer(metaclass=Singleton):
             return param
         return default
 
+    def _get_limit(self, param, default):
+        if isinstance(param, int):
+            return param
+        return default
+
     def read_parameters(self):
 
         self.type = self._get_parameters(
@@ -68,6 +116,12 @@ class IOInitializer(metaclass=Singleton):
         self.cache_report = self._get_parameters(
             cfg.io.cache.report, self.cache_default["report"])
 
+        self.cache_plans = self._get_parameters(
+            cfg.io.cache.plans, self.cache_default["plans"])
+
+        self.cache_campaigns = self._get_parameters(
+            cfg.io.cache.campaigns, self.cache_default["campaigns"])
+
         self.trace = self._get_parameters(
             cfg.io.trace, self.cache_default['trace'])
 
@@ -77,6 +131,42 @@ class IOInitializer(metaclass=Singleton):
         self.callgraph = self._get_parameters(
             cfg.io.stats.callgraph, self.cache_default["callgraph"])
 
+        self.writer_mode = self._get_parameters(
+            WriterMode.from_string(cfg.io.writer.mode),
+            self.writer_default["mode"])
+
+        self.writer_queue_size = self._get_parameters(
+            cfg.io.writer.queue_size, self.writer_default["queue_size"])
+
+        self.writer_backpressure = self._get_parameters(
+            Backpressure.from_string(cfg.io.writer.backpressure),
+            self.writer_default["backpressure"])
+
+        # 0 disables the memo resets
+        self.writer_memo_records = self._get_limit(
+            cfg.io.writer.memo_records, self.writer_default["memo_records"])
+
+        self.writer_memo_bytes = self._get_limit(
+            cfg.io.writer.memo_bytes, self.writer_default["memo_bytes"])
+
+        self.dedup_enable = self._get_parameters(
+            cfg.io.dedup.enable, self.dedup_default["enable"])
+
+        self.dedup_min_bytes = self._get_parameters(
+            cfg.io.dedup.min_bytes, self.dedup_default["min_bytes"])
+
+        self.dedup_cache_size = self._get_parameters(
+            cfg.io.dedup.cache_size, self.dedup_default["cache_size"])
+
+        self.metrics_enable = self._get_parameters(
+            cfg.io.metrics.enable, self.metrics_default["enable"])
+
+        self.metrics_interval = self._get_parameters(
+            cfg.io.metrics.interval, self.metrics_default["interval"])
+
+        self.report_sample = self._get_parameters(
+            cfg.io.report.sample, self.report_default["sample"])
+
     def mkdir_cache(self):
         self.cache_path = os.path.abspath(self.cache_root)
         if not os.path.isdir(self.cache_path):
@@ -105,5 +195,14 @@ class IOInitializer(metaclass=Singleton):
         if not os.path.isdir(self.cache_report_path):
             os.makedirs(self.cache_report_path, exist_ok=True)
 
+        self.cache_plans_path = os.path.join(self.cache_path, self.cache_plans)
+        if not os.path.isdir(self.cache_plans_path):
+            os.makedirs(self.cache_plans_path, exist_ok=True)
+
+        self.cache_campaigns_path = os.path.join(
+            self.cache_path, self.cache_campaigns)
+        if not os.path.isdir(self.cache_campaigns_path):
+            os.makedirs(self.cache_campaigns_path, exist_ok=True)
+
     def get_type(self):
         return self.type
@@ -0,0 +1,27 @@
+import struct
+
+# Layout of a binary trace (little-endian):
+#   magic | record blocks | strings | call sites | index | footer
+# A record block holds the raw buffers of its array arguments, each
+# aligned on `alignment` bytes, followed by the pickled list of its
+# argument descriptors (name, kind, dtype, shape, offset, nbytes).
+# The index has one fixed-width entry per record and the footer gives
+# the position of each table, so a reader only maps the file and
+# seeks straight to any record.
+magic = b"PTRACE\x00\x01"
+alignment = 64
+index_format = "<QQIIIiQQ"
+index_size = struct.calcsize(index_format)
+footer_format = "<8sQQQQQQ"
+footer_size = struct.calcsize(footer_format)
+
+# Names and numpy types of the index entry fields, in index_format order
+index_fields = [("time", "<u8"), ("id", "<u8"),
+                ("module", "<u4"), ("function", "<u4"), ("label", "<u4"),
+                ("callsite", "<i4"),
+                ("offset", "<u8"), ("size", "<u8")]
+
+
+class ArgKind:
+    ARRAY = 0
+    PICKLE = 1
@@ -1,15 +1,112 @@
 import inspect
 import copy
+import types
+
+_positional = (inspect.Parameter.POSITIONAL_ONLY,
+               inspect.Parameter.POSITIONAL_OR_KEYWORD)
+_keyword = (inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            inspect.Parameter.KEYWORD_ONLY)
+
+
+class Signature:
+    """
+    Argument mapper precompiled from the signature of a function
+    """
+
+    __slots__ = ("signature", "names", "positional", "keyword",
+                 "required", "var_positional", "var_keyword")
+
+    def __init__(self, signature):
+        self.signature = signature
+        parameters = signature.parameters.values()
+        self.names = [p.name for p in parameters]
+        self.positional = [p.name for p in parameters if p.kind in _positional]
+        self.keyword = frozenset(p.name for p in parameters
+                                 if p.kind in _keyword)
+        self.required = [p.name for p in parameters
+                         if p.default is p.empty and
+                         p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD)]
+        self.var_positional = next((p.name for p in parameters
+                                    if p.kind == p.VAR_POSITIONAL), None)
+        self.var_keyword = next((p.name for p in parameters
+                                 if p.kind == p.VAR_KEYWORD), None)
+
+    def map(self, args, kwargs):
+        """
+        Same mapping as signature.bind(*args, **kwargs).arguments
+        or None if the call does not match the signature
+        """
+        npositional = len(self.positional)
+        arguments = dict(zip(self.positional, args))
+        if len(args) > npositional:
+            if self.var_positional is None:
+                return None
+            arguments[self.var_positional] = args[npositional:]
+        if kwargs:
+            extra = {}
+            for name, value in kwargs.items():
+                if name in self.keyword and name not in arguments:
+                    arguments[name] = value
+                elif self.var_keyword is not None and \
+                        name not in arguments:
+                    extra[name] = value
+                else:
+                    return None
+            if extra:
+                arguments[self.var_keyword] = extra
+            arguments = {name: arguments[name] for name in self.names
+                         if name in arguments}
+        for name in self.required:
+            if name not in arguments:
+                return None
+        return arguments
+
+
+# Signature of each function seen, None when it has none (builtins)
+_signatures = dict()
+
+
+def _get_key(function):
+    if isinstance(function, types.MethodType):
+        # Bound methods are created at each access
+        return (types.MethodType, function.__func__)
+    return function
+
+
+def _compute_signature(function):
+    try:
+        return Signature(inspect.signature(function))
+    except (ValueError, TypeError):
+        return None
+
+
+def get_signature(function):
+    key = _get_key(function)
+    try:
+        return _signatures[key]
+    except KeyError:
+        signature = _signatures[key] = _compute_signature(function)
+        return signature
+    except TypeError:
+        # Unhashable callable
+        return _compute_signature(function)
 
 
 class Binding:
 
     def __init__(self, function, *args, **kwargs):
-        try:
-            sig = inspect.signature(function)
-            self._bind_initializer(sig, *args, **kwargs)
-        except (ValueError, TypeError):
+        signature = get_signature(function)
+        if signature is None:
             self._default_initializer(*args, **kwargs)
+        elif (arguments := signature.map(args, kwargs)) is not None:
+            self.arguments = arguments
+            self.args = args
+            self.kwargs = kwargs
+        else:
+            try:
+                self._bind_initializer(signature.signature, *args, **kwargs)
+            except (ValueError, TypeError):
+                self._default_initializer(*args, **kwargs)
 
     def _bind_initializer(self, sig, *args, **kwargs):
         bind = sig.bind(*args, **kwargs)
@@ -0,0 +1,161 @@
+import os
+from collections import OrderedDict
+
+import dill as pickle
+import xxhash
+
+from pytracer.utils.log import get_logger
+
+logger = get_logger()
+
+# A blob store is a directory next to the trace holding
+#   pack: the pickled payloads, each written once
+#   index: the pickled (digest, offset, size) of each payload
+# Records keep a BlobReference in place of the argument.
+pack_filename = "pack"
+index_filename = "index"
+
+
+def is_raw_array(obj):
+    """
+    Arrays whose buffer can be hashed or written as is
+    """
+    _type = type(obj)
+    if _type.__name__ != "ndarray" or _type.__module__ != "numpy":
+        return False
+    dtype = obj.dtype
+    return dtype.fields is None and not dtype.hasobject \
+        and dtype.kind != 'V'
+
+
+def get_digest(array):
+    """
+    Digest of the content of a raw array, its type and shape included
+    """
+    if not array.flags.c_contiguous:
+        array = array.copy(order='C')
+    h = xxhash.xxh3_128()
+    h.update(array.dtype.str.encode())
+    h.update(repr(array.shape).encode())
+    h.update(array.reshape(-1).view('u1'))
+    return h.digest()
+
+
+class BlobReference:
+
+    __slots__ = ("digest",)
+
+    def __init__(self, digest):
+        self.digest = digest
+
+    def __reduce__(self):
+        return (BlobReference, (self.digest,))
+
+    def __repr__(self):
+        return f"BlobReference({self.digest.hex()})"
+
+
+class BlobWriter:
+
+    def __init__(self, path):
+        self.path = path
+        self.digests = set()
+        self.pack = None
+        self.index = None
+
+    def _open(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.pack = open(os.path.join(self.path, pack_filename), "wb")
+        self.index = open(os.path.join(self.path, index_filename), "wb")
+
+    def __contains__(self, digest):
+        return digest in self.digests
+
+    def put(self, digest, payload):
+        if self.pack is None:
+            self._open()
+        offset = self.pack.tell()
+        self.pack.write(payload)
+        pickle.dump((digest, offset, len(payload)), self.index,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+        self.digests.add(digest)
+
+    def flush(self):
+        if self.pack is not None:
+            self.pack.flush()
+            self.index.flush()
+
+    def close(self):
+        if self.pack is not None:
+            self.pack.close()
+            self.index.close()
+
+
+class BlobReader:
+
+    def __init__(self, path, cache_size):
+        self.path = path
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.index = None
+        self.pack = None
+
+    def _open(self):
+        self.index = dict()
+        try:
+            with open(os.path.join(self.path, index_filename), "rb") as fi:
+                while True:
+                    try:
+                        digest, offset, size = pickle.load(fi)
+                    except EOFError:
+                        break
+                    self.index[digest] = (offset, size)
+            self.pack = open(os.path.join(self.path, pack_filename), "rb")
+        except OSError as e:
+            logger.error(f"Can't open blob store: {self.path}",
+                         error=e, caller=self)
+
+    def get(self, digest):
+        if (value := self.cache.get(digest)) is not None:
+            self.cache.move_to_end(digest)
+            return value
+        if self.index is None:
+            self._open()
+        offset, size = self.index[digest]
+        self.pack.seek(offset)
+        value = pickle.loads(self.pack.read(size))
+        # The same array is shared by every record referencing it
+        value.flags.writeable = False
+        self.cache[digest] = value
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return value
+
+
+class LazyArgs(dict):
+    """
+    Arguments whose blob references are resolved on access
+    """
+
+    def __init__(self, args, blobs):
+        super().__init__(args)
+        self.blobs = blobs
+
+    def __getitem__(self, name):
+        value = super().__getitem__(name)
+        if isinstance(value, BlobReference):
+            return self.blobs.get(value.digest)
+        return value
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def values(self):
+        return [self[name] for name in self]
+
+    def items(self):
+        return [(name, self[name]) for name in self]
+
+
+def has_references(args):
+    return any(isinstance(value, BlobReference) for value in args.values())
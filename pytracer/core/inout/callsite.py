@@ -0,0 +1,110 @@
+import linecache
+import os
+import sys
+import threading
+
+# Frame of the traced call seen from CallSiteTable.capture:
+# capture <- Writer.backtrace <- Writer.write* <- wrapper <- caller
+_caller_depth = 4
+
+
+class CallSite:
+    """
+    Code location of a traced call. Records refer to it by id,
+    its source line is only read when asked for.
+    """
+
+    __slots__ = ("id", "filename", "lineno", "name", "_line")
+
+    def __init__(self, id, filename, lineno, name):
+        self.id = id
+        self.filename = filename
+        self.lineno = lineno
+        self.name = name
+        self._line = None
+
+    def __reduce__(self):
+        return (CallSite, (self.id, self.filename, self.lineno, self.name))
+
+    def _key(self):
+        return (self.filename, self.lineno, self.name)
+
+    def __eq__(self, other):
+        return isinstance(other, CallSite) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return (f"<CallSite file {self.filename}, "
+                f"line {self.lineno} in {self.name}>")
+
+    @property
+    def line(self):
+        if self._line is None:
+            self._line = get_line(self.filename, self.lineno)
+        return self._line
+
+
+def get_line(filename, lineno):
+    line = linecache.getline(filename, lineno)
+    if not line:
+        # Sources are copied in the cache at the end of the trace
+        import pytracer.core.inout._init as _init
+        path = _init.IOInitializer().cache_sources_path
+        line = linecache.getline(f"{path}{os.sep}{filename}", lineno)
+    return line.strip()
+
+
+def get_frame(depth):
+    """
+    Frame depth levels above the caller, or the outermost one
+    """
+    try:
+        return sys._getframe(depth + 1)
+    except ValueError:
+        frame = sys._getframe(1)
+        while frame.f_back is not None:
+            frame = frame.f_back
+        return frame
+
+
+class CallSiteTable:
+    """
+    Interned call sites of the traced calls
+    """
+
+    def __init__(self):
+        self.callsites = []
+        self._ids = dict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.callsites)
+
+    def __getitem__(self, i):
+        return self.callsites[i]
+
+    def __iter__(self):
+        return iter(self.callsites)
+
+    def capture(self):
+        """
+        Id of the call site of the traced call
+        """
+        frame = get_frame(_caller_depth)
+        code = frame.f_code
+        key = (code.co_filename, frame.f_lineno, code.co_name)
+        try:
+            return self._ids[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if (callsite_id := self._ids.get(key)) is None:
+                callsite_id = len(self.callsites)
+                self.callsites.append(CallSite(callsite_id, *key))
+                self._ids[key] = callsite_id
+        return callsite_id
+
+    def filenames(self):
+        return {callsite.filename for callsite in self.callsites}
@@ -0,0 +1,139 @@
+import zlib
+
+import numpy as np
+
+from pytracer.utils.log import get_logger
+
+logger = get_logger()
+
+# Samples of a stochastic run differ from the reference sample in the
+# last bits of their floating-point values. XORing both buffers leaves
+# mostly zero bytes; grouping the bytes by significance (byte shuffle)
+# makes them long runs that compress well.
+delta_kinds = ('f', 'c')
+
+
+def shuffle(buffer, itemsize):
+    return buffer.reshape(-1, itemsize).T.tobytes()
+
+
+def unshuffle(payload, itemsize):
+    buffer = np.frombuffer(payload, dtype=np.uint8)
+    return buffer.reshape(itemsize, -1).T.reshape(-1)
+
+
+def as_bytes(array):
+    return np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+
+
+class XorDelta:
+    """
+    Floating-point array stored as its XOR against the reference sample
+    """
+
+    __slots__ = ("dtype", "shape", "payload")
+
+    def __init__(self, dtype, shape, payload):
+        self.dtype = dtype
+        self.shape = shape
+        self.payload = payload
+
+    def __reduce__(self):
+        return (XorDelta, (self.dtype, self.shape, self.payload))
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + len(self.payload)
+
+    def apply(self, reference):
+        dtype = np.dtype(self.dtype)
+        xor = unshuffle(zlib.decompress(self.payload), dtype.itemsize)
+        buffer = np.bitwise_xor(xor, as_bytes(reference))
+        return buffer.view(dtype).reshape(self.shape)
+
+
+def is_delta_candidate(value, reference):
+    return isinstance(value, np.ndarray) and \
+        isinstance(reference, np.ndarray) and \
+        type(value) is type(reference) and \
+        value.dtype.kind in delta_kinds and \
+        value.dtype == reference.dtype and \
+        value.shape == reference.shape
+
+
+def encode(value, reference, level):
+    """
+    XorDelta of value against reference or value itself if it
+    cannot be expressed as a delta
+    """
+    if not is_delta_candidate(value, reference):
+        return value
+    xor = np.bitwise_xor(as_bytes(value), as_bytes(reference))
+    payload = zlib.compress(shuffle(xor, value.dtype.itemsize), level)
+    return XorDelta(value.dtype.str, value.shape, payload)
+
+
+def get_reference(records, name):
+    for record in records:
+        args = record["args"]
+        if name in args and \
+                not isinstance(dict.__getitem__(args, name), XorDelta):
+            return args[name]
+    return None
+
+
+def reconstruct(records):
+    """
+    Replace the deltas of the records read together from several
+    samples by the values they encode
+    """
+    for record in records:
+        args = record["args"]
+        for name, value in dict.items(args):
+            if not isinstance(value, XorDelta):
+                continue
+            if (reference := get_reference(records, name)) is None:
+                logger.error(
+                    f"No reference sample to decode argument {name} "
+                    f"of {record['module']}.{record['function']}")
+            dict.__setitem__(args, name, value.apply(reference))
+    return records
+
+
+def _decode(record, references):
+    args = record["args"]
+    deltas = [(name, value) for name, value in dict.items(args)
+              if isinstance(value, XorDelta)]
+    if any(name not in references for name, _ in deltas):
+        return False
+    for name, value in deltas:
+        dict.__setitem__(args, name, value.apply(references[name][name]))
+    return True
+
+
+def reconstruct_stream(records):
+    """
+    Decode the records of several samples read one at a time.
+    The first values that are not deltas are kept as references,
+    the records read before their reference wait for it.
+    """
+    references = dict()
+    pending = []
+    for record in records:
+        args = record["args"]
+        for name, value in dict.items(args):
+            if name not in references and not isinstance(value, XorDelta):
+                references[name] = args
+        pending.append(record)
+        waiting = []
+        for candidate in pending:
+            if _decode(candidate, references):
+                yield candidate
+            else:
+                waiting.append(candidate)
+        pending = waiting
+    for record in pending:
+        names = [name for name, value in dict.items(record["args"])
+                 if isinstance(value, XorDelta) and name not in references]
+        logger.error(
+            f"No reference sample to decode arguments {names} "
+            f"of {record['module']}.{record['function']}")
@@ -7,6 +7,7 @@ import numpy as np
 import pytracer.utils as ptutils
 import scipy.sparse as spr
 import tables
+from pytracer.cache import module_args
 from pytracer.core.config import constant
 from pytracer.utils.log import get_logger
 
@@ -34,6 +35,9 @@ class ExportDescription(tables.IsDescription):
     sig = tables.Float64Col()
     info = tables.StringCol(256)
     dtype = tables.StringCol(256)
+    # Sufficient statistics of scalars to append samples
+    count = tables.UInt64Col()
+    m2 = tables.Float64Col()
 
     class BacktraceDescription(tables.IsDescription):
         filename = tables.StringCol(1024)
@@ -42,31 +46,67 @@ class ExportDescription(tables.IsDescription):
         name = tables.StringCol(128)
 
 
-_id_to_times = dict()
+# Arrays of every call of an argument are appended to flat arrays,
+# one per statistic and dtype, the index gives where each call lies
+statistics = ("mean", "std", "sig")
+max_ndim = 32
+expected_elements = 1 << 20
+# Bounds of the chunks picked by io.export.chunk auto
+chunk_bytes_min = 1 << 12
+chunk_bytes_max = 1 << 20
 
 
-class ExporterHDF5(_exporter.Exporter):
+class IndexDescription(tables.IsDescription):
+    time = tables.UInt64Col()
+    dtype = tables.StringCol(32)
+    # Of each statistic, the sparse representations differ in size
+    offset = tables.UInt64Col(shape=(len(statistics),))
+    size = tables.UInt64Col(shape=(len(statistics),))
+    ndim = tables.UInt8Col()
+    shape = tables.Int64Col(shape=(max_ndim,))
+    sparse = tables.BoolCol()
+    # Sufficient statistics to append samples, moments is -1 without them
+    count = tables.UInt64Col()
+    moments = tables.Int64Col(dflt=-1)
+
+
+class SamplesDescription(tables.IsDescription):
+    time = tables.UInt64Col()
+    offset = tables.UInt64Col()
+    count = tables.UInt64Col()
 
-    count_ofile = 0
-    group_id = dict()
 
-    def _get_path(self, path):
-        if path not in ExporterHDF5.group_id:
-            ExporterHDF5.group_id[path] = 0
-            _path = f"{path};{ExporterHDF5.group_id[path]}"
-        else:
-            _path = f"{path};{ExporterHDF5.group_id[path]}"
-            node = self.h5file.get_node(_path)
+def get_array_name(stat, dtype):
+    return f"{stat}_{np.dtype(dtype).name}"
+
+
+def get_flat_slice(elements, offset, shape):
+    """
+    Flattened elements of an array in its flat array
+    """
+    start, stop, _ = elements.indices(int(np.prod(shape, dtype=np.int64)))
+    return slice(offset + start, offset + stop)
 
-            if len(node._v_groups) >= node._v_max_group_width:
-                ExporterHDF5.group_id[path] += 1
-                _path = f"{path};{ExporterHDF5.group_id[path]}"
 
-        return _path
+_id_to_times = dict()
+
+
+class ExporterHDF5(_exporter.Exporter):
 
-    def __init__(self):
+    count_ofile = 0
+
+    def __init__(self, append=None):
         self.parameters = _init.IOInitializer()
-        self._init_ostream()
+        self.append = append
+        self.filters = self._get_filters()
+        self.chunk = self._get_chunk()
+        self._rows = dict()
+        self._nrows = dict()
+        self.method = module_args.get("method", "cnh")
+        if append:
+            self._init_append()
+        else:
+            self._init_ostream()
         atexit.register(self.end)
 
     def get_filename(self):
@@ -81,6 +121,23 @@ class ExporterHDF5(_exporter.Exporter):
             filename, ext=constant.extension.hdf5)
         self.filename_path = self._get_filename_path(self.filename)
         self.h5file = tables.open_file(self.filename_path, mode="w")
+        attrs = self.h5file.root._v_attrs
+        attrs.method = self.method
+        attrs.appends = self.generation = 0
+
+    def _init_append(self):
+        self.filename_path = os.path.abspath(self.append)
+        self.filename = os.path.basename(self.filename_path)
+        self.h5file = tables.open_file(self.filename_path, mode="a")
+        attrs = self.h5file.root._v_attrs
+        if "appends" not in attrs:
+            logger.error((f"{self.filename_path} has no sufficient "
+                          f"statistics to append samples to"), caller=self)
+        if attrs.method != self.method:
+            logger.error((f"{self.filename_path} was parsed with the "
+                          f"{attrs.method} method, not {self.method}"),
+                         caller=self)
+        attrs.appends = self.generation = attrs.appends + 1
 
     def _get_filename_path(self, filename):
         ptutils.check_extension(filename, constant.extension.hdf5)
@@ -93,6 +150,18 @@ class ExporterHDF5(_exporter.Exporter):
     def end(self):
         self.h5file.close()
 
+    def remove(self):
+        """
+        Close the export of a parse that failed, removed unless
+        the samples were appended to a previous aggregation
+        """
+        self.end()
+        if self.append:
+            logger.warning((f"{self.filename_path} may hold part of the "
+                            f"appended samples"), caller=self)
+        else:
+            os.remove(self.filename_path)
+
     def backtrace_to_dict(self, backtrace):
         return BacktraceDict(filename=backtrace.filename,
                              line=backtrace.line,
@@ -175,6 +244,212 @@ class ExporterHDF5(_exporter.Exporter):
 
         return _sparse
 
+    def _get_samples_arrays(self, generation):
+        return (f"samples_{generation}", f"samples_index_{generation}")
+
+    def _append_scalar_samples(self, function_grp, row_index, samples):
+        """
+        Samples of a scalar kept for the general method, in a samples
+        array per parse of the function and the rows they belong to
+        """
+        samples = np.real(np.ravel(samples)).astype(np.float64)
+        if samples.size == 0:
+            return
+        name, index_name = self._get_samples_arrays(self.generation)
+        if name not in function_grp:
+            self.h5file.create_earray(function_grp, name,
+                                      atom=tables.Float64Atom(),
+                                      shape=(0, len(samples)))
+            self.h5file.create_earray(function_grp, index_name,
+                                      atom=tables.Int64Atom(), shape=(0,))
+        array = function_grp[name]
+        if array.shape[1] != len(samples):
+            logger.warning((f"Cannot keep {len(samples)} samples in "
+                            f"{array._v_pathname}"), caller=self)
+            return
+        array.append(samples[None])
+        function_grp[index_name].append([row_index])
+
+    def _get_scalar_samples(self, function_grp, row_index):
+        samples = []
+        for generation in range(self.generation):
+            name, index_name = self._get_samples_arrays(generation)
+            if index_name not in function_grp:
+                continue
+            positions = self._get_samples_positions(function_grp[index_name])
+            if (position := positions.get(row_index)) is not None:
+                samples.append(function_grp[name][position])
+        return np.concatenate(samples) if samples else np.empty(0)
+
+    def _get_samples_positions(self, index):
+        """
+        Position in the samples array of the first samples of each row,
+        the arrays of the previous parses are not modified
+        """
+        path = index._v_pathname
+        if path not in self._rows:
+            positions = dict()
+            for position, row_index in enumerate(index.read()):
+                positions.setdefault(int(row_index), position)
+            self._rows[path] = positions
+        return self._rows[path]
+
+    def _get_argument_group(self, function_grp, label, name):
+        path = tables.path.join_path(function_grp._v_pathname,
+                                     "/".join([label, name]))
+        if path in self.h5file:
+            return self.h5file.get_node(path)
+        where = tables.path.join_path(function_grp._v_pathname, label)
+        group = self.h5file.create_group(where, name, createparents=True)
+        self.h5file.create_table(group, "index",
+                                 description=IndexDescription)
+        return group
+
+    def _get_filters(self):
+        """
+        Filters of the flat arrays from the io.export section
+        """
+        complib = self.parameters.complib
+        complevel = self.parameters.complevel
+        shuffle = self.parameters.shuffle
+        if complib == "none":
+            return tables.Filters(complevel=0)
+        if complib not in tables.filters.all_complibs or \
+                tables.which_lib_version(complib) is None:
+            logger.warning(f"Compressor {complib} not available, using zlib",
+                           caller=self)
+            complib = "zlib"
+        if not isinstance(complevel, int) or not 0 <= complevel <= 9:
+            default = self.parameters.compression_default["complevel"]
+            logger.warning(f"Invalid compression level {complevel}, "
+                           f"using {default}", caller=self)
+            complevel = default
+        bitshuffle = shuffle == _init.Shuffle.BIT
+        if bitshuffle and not complib.startswith("blosc"):
+            logger.warning(f"Bit shuffle requires blosc, not {complib}, "
+                           f"using byte shuffle", caller=self)
+            bitshuffle = False
+        return tables.Filters(complevel=complevel, complib=complib,
+                              shuffle=not bitshuffle and
+                              shuffle != _init.Shuffle.NONE,
+                              bitshuffle=bitshuffle)
+
+    def _get_chunk(self):
+        chunk = self.parameters.chunk
+        if chunk == "auto" or chunk is None:
+            return chunk
+        if isinstance(chunk, int) and not isinstance(chunk, bool) and \
+                chunk > 0:
+            return chunk
+        logger.warning(f"Invalid chunk {chunk}, using auto", caller=self)
+        return "auto"
+
+    def _get_chunkshape(self, size, dtype):
+        """
+        Chunk of a flat array: io.export.chunk elements, or with auto the
+        power of two holding the first array appended, so that reading
+        the array of a call, as the GUI heatmaps do, decompresses one or
+        two chunks
+        """
+        if self.chunk != "auto":
+            return None if self.chunk is None else (self.chunk,)
+        itemsize = np.dtype(dtype).itemsize
+        nbytes = 1 << max(0, size * itemsize - 1).bit_length()
+        nbytes = min(max(nbytes, chunk_bytes_min), chunk_bytes_max)
+        return (max(1, nbytes // itemsize),)
+
+    def _get_flat_array(self, group, stat, dtype, size):
+        name = get_array_name(stat, dtype)
+        if name not in group:
+            self.h5file.create_earray(
+                group, name, atom=tables.Atom.from_dtype(dtype),
+                shape=(0,), filters=self.filters,
+                expectedrows=expected_elements,
+                chunkshape=self._get_chunkshape(size, dtype))
+        return group[name]
+
+    def _append_flat(self, array, value, stats):
+        if spr.issparse(value):
+            array.append(self._get_sparse_representation(value)["Pytracer"])
+            return
+        if np.ndim(value) == 0:
+            array.append(np.full(int(np.prod(stats.shape())), value,
+                                 dtype=array.atom.dtype))
+            return
+        # Tiled statistics are on disk and copied one tile at a time
+        value = np.ravel(value)
+        for elements in stats.tiles():
+            array.append(value[elements])
+
+    def _export_moments(self, group, index, stats, time, mean, std):
+        """
+        Count, mean and M2 of the samples of an array, and the samples
+        for the general method, from which --append goes on
+        """
+        from pytracer.core.stats.stream import get_m2
+        count = stats.count()
+        index["count"] = count
+        if spr.issparse(mean) or np.shape(mean) != stats.shape():
+            return
+        dtype = np.result_type(mean, np.float64)
+        size = int(np.prod(stats.shape()))
+        mean_array = self._get_flat_array(group, "mean_acc", dtype, size)
+        m2_array = self._get_flat_array(group, "m2", dtype, size)
+        index["moments"] = mean_array.nrows
+        mean, std = np.ravel(mean), np.ravel(std)
+        for elements in stats.tiles():
+            mean_array.append(mean[elements])
+            m2_array.append(get_m2(np.asarray(std[elements]), count))
+        self._append_array_samples(group, time, stats.get_samples())
+
+    def _append_array_samples(self, group, time, samples):
+        if samples is None:
+            return
+        if "samples" not in group:
+            self.h5file.create_table(group, "samples",
+                                     description=SamplesDescription)
+        array = self._get_flat_array(group, "samples", samples.dtype,
+                                     int(np.prod(samples.shape[1:])))
+        row = group.samples.row
+        row["time"] = time
+        row["offset"] = array.nrows
+        row["count"] = len(samples)
+        row.append()
+        entries = self._rows.get(group.samples._v_pathname)
+        if entries is not None:
+            entries.setdefault(int(time), []).append(
+                (int(array.nrows), len(samples)))
+        for sample in samples:
+            array.append(np.ravel(sample))
+
+    def _get_array_samples(self, group, time, dtype, size, columns):
+        """
+        Samples of the call at time kept by every parse,
+        restricted to the flat columns of the array
+        """
+        if "samples" not in group:
+            return None
+        name = get_array_name("samples", dtype)
+        entries = self._get_samples_entries(group.samples)
+        samples = []
+        for offset, count in entries.get(int(time), ()):
+            samples.append(group[name][offset:offset + count * size]
+                           .reshape(count, size)[:, columns])
+        return np.concatenate(samples) if samples else None
+
+    def _get_samples_entries(self, table):
+        """
+        Offset and count of the samples of each time in the samples table
+        """
+        path = table._v_pathname
+        if path not in self._rows:
+            entries = dict()
+            for entry in table.read():
+                entries.setdefault(int(entry["time"]), []).append(
+                    (int(entry["offset"]), int(entry["count"])))
+            self._rows[path] = entries
+        return self._rows[path]
+
     def export_arg(self, *args, **kwargs):
 
         row = kwargs["row"]
@@ -223,52 +498,261 @@ class ExporterHDF5(_exporter.Exporter):
         row['dtype'] = stats.dtype()
         if info:
             row['info'] = info
+        row['count'] = stats.count()
+        samples = None
+        if ndim == 0 and not spr.issparse(raw_std):
+            from pytracer.core.stats.stream import get_m2
+            row['m2'] = np.real(get_m2(raw_std, stats.count()))
+            samples = stats.get_samples()
         row.append()
+        row_index = self._next_row(row.table)
+        if samples is not None:
+            self._append_scalar_samples(function_grp, row_index, samples)
 
-        # We create array to keep the object
+        # We append the array to the flat arrays of the argument
         if ndim > 0:
-            filters = tables.Filters(complevel=9, complib='zlib')
-
-            unique_id = "/".join([label, name])
             _type = stats.dtype()
             if _type == np.dtype("object"):
                 _type = np.dtype("float64")
 
             try:
-                atom_type = tables.Atom.from_dtype(_type)
+                tables.Atom.from_dtype(_type)
             except Exception:
                 return
             shape = stats.shape()
-            path = tables.path.join_path(function_grp._v_pathname, unique_id)
-
-            path_ = self._get_path(path)
-
-            group = self.h5file.create_group(path_,
-                                             str(time), createparents=True)
+            if len(shape) > max_ndim:
+                return
 
-            mean_array = self.h5file.create_carray(
-                group, "mean",
-                atom=atom_type, shape=shape, filters=filters)
-            if spr.issparse(raw_mean):
-                mean_array[:] = self._get_sparse_representation(raw_mean)
-            else:
-                mean_array[:] = raw_mean
+            group = self._get_argument_group(function_grp, label, name)
+            index = group.index.row
+            index["time"] = time
+            index["dtype"] = _type.str
+            index["ndim"] = len(shape)
+            index["shape"] = shape + (0,) * (max_ndim - len(shape))
+            index["sparse"] = spr.issparse(raw_mean)
+
+            size = int(np.prod(shape))
+            offsets, sizes = [], []
+            for stat, value in zip(statistics, (raw_mean, raw_std, raw_sig)):
+                array = self._get_flat_array(group, stat, _type, size)
+                offsets.append(array.nrows)
+                self._append_flat(array, value, stats)
+                sizes.append(array.nrows - offsets[-1])
+            index["offset"] = offsets
+            index["size"] = sizes
+
+            self._export_moments(group, index, stats, time, raw_mean,
+                                 raw_std)
+            index.append()
+
+    def _update_scalar(self, table, function_grp, index, stats):
+        from pytracer.core.stats.stream import (get_m2, get_std,
+                                                merge_moments, sig_moments)
+        row = table[index]
+        count_a = int(row["count"])
+        count_b = stats.count()
+        dtype = self._get_dtype(row["dtype"])
+        if dtype is None:
+            self._add_count(table, index, count_b)
+            return
+        mean_b = np.real(stats.mean())
+        m2_b = np.real(get_m2(stats.std(), count_b))
+        count, mean, m2 = merge_moments(count_a, row["mean"], row["m2"],
+                                        count_b, mean_b, m2_b)
+        std = get_std(m2, count)
+        samples = stats.get_samples()
+        old = None
+        if samples is not None and np.size(samples) == count_b:
+            old = self._get_scalar_samples(function_grp, index)
+            self._append_scalar_samples(function_grp, index, samples)
+        if old is not None and old.size == count_a:
+            samples = np.concatenate([old, np.real(np.ravel(samples))])
+        else:
+            samples = None
+        sig = sig_moments(mean, std, count, dtype, samples)
+        table.modify_columns(start=index, stop=index + 1,
+                             columns=[[mean], [std], [sig], [count], [m2]],
+                             names=["mean", "std", "sig", "count", "m2"])
+
+    def _add_count(self, table, index, count):
+        # Only numbers have moments, the others only count their samples
+        table.modify_column(start=index, stop=index + 1,
+                            column=[table[index]["count"] + count],
+                            colname="count")
+
+    def _get_dtype(self, name):
+        """
+        Numeric dtype of the dtype column, None for other types
+        """
+        try:
+            dtype = np.dtype(name.decode())
+        except TypeError:
+            return None
+        return dtype if dtype.kind in "biufc" else None
+
+    def _next_row(self, table):
+        # Rows are buffered, nrows only counts the written ones
+        path = table._v_pathname
+        self._nrows[path] = self._nrows.get(path, table.nrows) + 1
+        return self._nrows[path] - 1
+
+    def _get_index_rows(self, index):
+        # UInt64 columns cannot be used in table queries
+        path = index._v_pathname
+        if path not in self._rows:
+            self._rows[path] = {int(time): i for i, time
+                                in enumerate(index.read(field="time"))}
+        return self._rows[path]
+
+    def _update_array(self, table, function_grp, index, stats, label, name,
+                      time):
+        from pytracer.core.stats.stream import (get_m2, get_std,
+                                                merge_moments, sig_moments)
+        path = tables.path.join_path(function_grp._v_pathname,
+                                     "/".join([label, name]))
+        i = None
+        if path in self.h5file:
+            group = self.h5file.get_node(path)
+            i = self._get_index_rows(group.index).get(time)
+        if i is not None and self._get_dtype(table[index]["dtype"]) is None:
+            self._add_count(table, index, stats.count())
+            self._add_count(group.index, i, stats.count())
+            return
+        entry = None if i is None else group.index[i]
+        shape = None if i is None else \
+            tuple(int(n) for n in entry["shape"][:entry["ndim"]])
+        if entry is None or entry["moments"] < 0 or \
+                spr.issparse(stats.mean()) or shape != stats.shape():
+            logger.warning((f"Cannot append the samples of {path} at "
+                            f"time {time}"), caller=self)
+            return
+        dtype = np.dtype(entry["dtype"].decode())
+        accumulator_dtype = np.result_type(dtype, np.float64)
+        mean_acc = group[get_array_name("mean_acc", accumulator_dtype)]
+        m2_acc = group[get_array_name("m2", accumulator_dtype)]
+        arrays = [group[get_array_name(stat, dtype)]
+                  for stat in statistics]
+        offsets = [int(offset) for offset in entry["offset"]]
+        moments = int(entry["moments"])
+        size = int(entry["size"][0])
+        count_a = int(entry["count"])
+        count_b = stats.count()
+        raw_mean = np.ravel(stats.mean())
+        raw_std = np.ravel(stats.std())
+        samples = stats.get_samples()
+        sums = np.zeros(3)
+        for elements in stats.tiles():
+            columns = get_flat_slice(elements, 0, shape)
+            flat = get_flat_slice(elements, moments, shape)
+            count, mean, m2 = merge_moments(
+                count_a, mean_acc[flat], m2_acc[flat],
+                count_b, raw_mean[elements],
+                get_m2(np.asarray(raw_std[elements]), count_b))
+            std = get_std(m2, count)
+            old = None
+            if samples is not None:
+                old = self._get_array_samples(group, time, samples.dtype,
+                                              size, columns)
+            tile_samples = None
+            if old is not None and len(old) == count_a:
+                tile_samples = np.concatenate(
+                    [old, samples.reshape(count_b, -1)[:, columns]])
+            sig = sig_moments(mean, std, count, dtype, tile_samples)
+            mean_acc[flat] = mean
+            m2_acc[flat] = m2
+            for array, offset, value in zip(arrays, offsets,
+                                            (mean, std, sig)):
+                array[get_flat_slice(elements, offset, shape)] = value
+            sums += [np.sum(np.real(value), dtype=np.float64)
+                     for value in (mean, std, sig)]
+        self._append_array_samples(group, time, samples)
+        group.index.modify_column(start=i, stop=i + 1,
+                                  column=[count_a + count_b],
+                                  colname="count")
+        table.modify_columns(start=index, stop=index + 1,
+                             columns=[[value] for value in
+                                      sums / max(1, size)] +
+                             [[count_a + count_b]],
+                             names=["mean", "std", "sig", "count"])
+
+    def update_arg(self, table, function_grp, stats, label, name, time):
+        if stats is None or stats == [] or stats.shape() == (0,):
+            return
+        index = self._get_rows(table).get((time, label.encode(),
+                                           name.encode()))
+        if index is None:
+            logger.warning((f"{function_grp._v_pathname} has no {label} "
+                            f"{name} at time {time} to append to"),
+                           caller=self)
+            return
+        if stats.ndim() == 0:
+            self._update_scalar(table, function_grp, index, stats)
+        else:
+            self._update_array(table, function_grp, index, stats,
+                               label, name, time)
+
+    def _get_rows(self, table):
+        """
+        Row numbers of the table by (time, label, name),
+        UInt64 columns cannot be used in table queries
+        """
+        path = table._v_pathname
+        if path not in self._rows:
+            columns = table.read(field="time"), table.read(field="label"), \
+                table.read(field="name")
+            self._rows[path] = {(int(time), label, name): index
+                                for index, (time, label, name)
+                                in enumerate(zip(*columns))}
+        return self._rows[path]
+
+    def update(self, obj):
+        """
+        Merge the statistics of new samples into the exported ones
+        """
+        module = obj["module"]
+        function = obj["function"]
+        try:
+            tables.path.check_attribute_name(function)
+        except ValueError:
+            function = f'safename_{function}'
+        path = f"/{module}/{function}"
+        if path not in self.h5file:
+            logger.warning(f"{path} is not in {self.filename_path}",
+                           caller=self)
+            return
+        function_grp = self.h5file.get_node(path)
+        table = function_grp["values"]
+        for name, stats in self._iter_stats(obj["args"]):
+            self.update_arg(table, function_grp, stats, obj["label"], name,
+                            obj["time"])
+
+    def export_sampling(self, counts):
+        """
+        Number of sampled and skipped calls per (module, function)
+        """
+        attrs = self.h5file.root._v_attrs
+        if self.append and "sampling" in attrs:
+            previous = attrs.sampling
+            for function, function_counts in counts.items():
+                if function in previous:
+                    counts[function] = {
+                        key: value + previous[function].get(key, 0)
+                        for key, value in function_counts.items()}
+            counts = {**previous, **counts}
+        attrs.sampling = counts
+
+    def _iter_stats(self, args):
+        for name, stats in args.items():
+            if isinstance(stats, list):
+                for i, stat in enumerate(stats):
+                    yield f"{name}_TID{i}", stat
 
-            std_array = self.h5file.create_carray(
-                group, "std",
-                atom=atom_type, shape=shape, filters=filters)
-            if spr.issparse(raw_std):
-                std_array[:] = self._get_sparse_representation(raw_std)
-            else:
-                std_array[:] = raw_std
+            if isinstance(stats, dict):
+                for name_attr, stat in stats.items():
+                    yield f"{name}_{name_attr}", stat
 
-            sig_array = self.h5file.create_carray(
-                group, "sig",
-                atom=atom_type, shape=shape, filters=filters)
-            if spr.issparse(raw_sig):
-                sig_array[:] = self._get_sparse_representation(raw_sig)
             else:
-                sig_array[:] = raw_sig
+                yield name, stats
 
     def export(self, obj, expectedrows):
         module = obj["module"]  # .replace(".", "$")
@@ -284,11 +768,14 @@ class ExporterHDF5(_exporter.Exporter):
             logger.error('Exported value has no module', caller=self)
         if function is None:
             logger.error('Exported value has no function', caller=self)
+        if self.append:
+            self.update(obj)
+            return
 
         try:
             tables.path.check_attribute_name(function)
         except ValueError:
-            function = 'safename_{function}'
+            function = f'safename_{function}'
 
         if module_grp_name in self.h5file:
             module_grp = self.h5file.get_node(module_grp_name)
@@ -306,39 +793,12 @@ class ExporterHDF5(_exporter.Exporter):
                                              expectedrows=expectedrows[0])
         expectedrows[0] = table.nrows + 1000
         row = table.row
-        for name, stats in args.items():
-
-            if isinstance(stats, list):
-                for i, stat in enumerate(stats):
-                    self.export_arg(row=row,
-                                    stats=stat,
-                                    function_id=function_id,
-                                    label=label,
-                                    name=f"{name}_TID{i}",
-                                    time=time,
-                                    backtrace=backtrace,
-                                    hdf5_function_group=function_grp)
-
-            if isinstance(stats, dict):
-                for name_attr, stat in stats.items():
-                    self.export_arg(row=row,
-                                    stats=stat,
-                                    function_id=function_id,
-                                    label=label,
-                                    name=f"{name}_{name_attr}",
-                                    time=time,
-                                    backtrace=backtrace,
-                                    hdf5_function_group=function_grp)
-
-            else:
-                self.export_arg(row=row,
-                                stats=stats,
-                                function_id=function_id,
-                                label=label,
-                                name=name,
-                                time=time,
-                                backtrace=backtrace,
-                                hdf5_function_group=function_grp)
-
-            table.flush()
-        self.h5file.flush()
+        for name, stats in self._iter_stats(args):
+            self.export_arg(row=row,
+                            stats=stats,
+                            function_id=function_id,
+                            label=label,
+                            name=name,
+                            time=time,
+                            backtrace=backtrace,
+                            hdf5_function_group=function_grp)
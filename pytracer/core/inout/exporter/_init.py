@@ -1,6 +1,7 @@
 import os
 from enum import IntEnum, auto
 
+from pytracer.core.config import NoneDict
 from pytracer.core.config import config as cfg
 from pytracer.core.config import constant
 from pytracer.utils.log import get_logger
@@ -24,6 +25,21 @@ class IOType(IntEnum):
         return None
 
 
+class Shuffle(IntEnum):
+    NONE = auto()
+    BYTE = auto()
+    BIT = auto()
+
+    def from_string(string):
+        if string == "none":
+            return Shuffle.NONE
+        if string == "byte":
+            return Shuffle.BYTE
+        if string == "bit":
+            return Shuffle.BIT
+        return None
+
+
 class IOInitializer(metaclass=Singleton):
 
     parameters = {}
@@ -33,15 +49,20 @@ class IOInitializer(metaclass=Singleton):
                      "traces": constant.cache.traces,
                      "stats": constant.cache.stats}
     export_default = constant.export.filename
+    compression_default = {"complib": "zlib",
+                           "complevel": 9,
+                           "shuffle": Shuffle.BYTE,
+                           "chunk": "auto"}
 
     def __init__(self):
         self.read_parameters()
         self.mkdir_cache()
 
     def _get_parameters(self, param, default):
-        if param:
-            return param
-        return default
+        # Missing keys are NoneDict, 0 or false are kept
+        if param is None or isinstance(param, NoneDict):
+            return default
+        return param
 
     def read_parameters(self):
 
@@ -60,8 +81,30 @@ class IOInitializer(metaclass=Singleton):
         self.filename = self._get_parameters(
             cfg.io.filename, self.filename_default)
 
-        self.export = self._get_parameters(
-            cfg.io.export, self.export_default)
+        # io.export is the filename, or a section with the filename and
+        # the compression of the exported arrays
+        export = cfg.io.export
+        if isinstance(export, str):
+            self.export = export
+            export = NoneDict()
+        else:
+            self.export = self._get_parameters(
+                export.filename, self.export_default)
+
+        self.complib = self._get_parameters(
+            export.complib, self.compression_default["complib"])
+
+        self.complevel = self._get_parameters(
+            export.complevel, self.compression_default["complevel"])
+
+        self.shuffle = self._get_parameters(
+            Shuffle.from_string(export.shuffle),
+            self.compression_default["shuffle"])
+
+        # null lets PyTables pick the chunks
+        chunk = export.chunk
+        self.chunk = None if chunk is None else self._get_parameters(
+            chunk, self.compression_default["chunk"])
 
     def mkdir_cache(self):
         self.cache_path = f"{os.getcwd()}{os.sep}{self.cache_root}"
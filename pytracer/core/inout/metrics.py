@@ -0,0 +1,199 @@
+import csv
+import json
+import os
+import tempfile
+import threading
+from enum import IntEnum
+from time import perf_counter_ns
+
+import pytracer.utils as ptutils
+from pytracer.core.config import constant
+from pytracer.utils.log import get_logger
+
+logger = get_logger()
+
+
+class Phase(IntEnum):
+    BINDING = 0
+    BACKTRACE = 1
+    SERIALIZATION = 2
+    WRITE = 3
+    FUNCTION = 4
+
+
+phases = [phase.name.lower() for phase in Phase]
+
+# Counters of each traced function: calls, bytes, then ns of each phase
+_calls = 0
+_bytes = 1
+_phases = 2
+
+csv_fields = ["module", "function", "calls", "bytes"] + \
+    [f"{phase}_ns" for phase in phases]
+
+
+def _atomic_write(path, write):
+    # Readers (pytracer info) may open the snapshot while it is written
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", newline="") as ostream:
+        write(ostream)
+    os.replace(tmp_path, path)
+
+
+class Metrics:
+    """
+    Time spent by the tracer in each phase of the traced calls, bytes and
+    records written. A snapshot is written every interval seconds.
+    Each thread updates counters of its own, merged by the snapshots.
+    """
+
+    def __init__(self, enable, interval, path):
+        self.enable = enable
+        self.interval_ns = int(interval * 1e9)
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._thread_counters = []
+        self.records = 0
+        self.bytes_written = 0
+        self.queue_depth = 0
+        self.queue_depth_max = 0
+        self.start_ns = perf_counter_ns()
+        self._last_snapshot_ns = self.start_ns
+        self._last_snapshot_records = 0
+
+    def _get_counters(self, module, function):
+        key = (module, function)
+        try:
+            thread_counters = self._local.counters
+        except AttributeError:
+            thread_counters = self._local.counters = dict()
+            with self._lock:
+                self._thread_counters.append(thread_counters)
+        try:
+            return thread_counters[key]
+        except KeyError:
+            counters = thread_counters[key] = [0] * (_phases + len(Phase))
+            return counters
+
+    def get_counters(self):
+        """
+        Counters of each traced function summed over the threads
+        """
+        with self._lock:
+            threads = list(self._thread_counters)
+        merged = dict()
+        for thread_counters in threads:
+            # Copied at once, the thread may add functions meanwhile
+            for key, counters in list(thread_counters.items()):
+                total = merged.setdefault(key, [0] * len(counters))
+                for i, value in enumerate(list(counters)):
+                    total[i] += value
+        return merged
+
+    def add(self, module, function, phase, elapsed_ns):
+        self._get_counters(module, function)[_phases + phase] += elapsed_ns
+
+    def lap(self, module, function, phase, start_ns):
+        """
+        Charge the time elapsed since start_ns to phase and return now
+        """
+        now = perf_counter_ns()
+        self._get_counters(module, function)[_phases + phase] += \
+            now - start_ns
+        return now
+
+    def call(self, module, function):
+        self._get_counters(module, function)[_calls] += 1
+
+    def record(self, module, function, nbytes, queue_depth):
+        self._get_counters(module, function)[_bytes] += nbytes
+        self.records += 1
+        self.bytes_written += nbytes
+        self.queue_depth = queue_depth
+        self.queue_depth_max = max(self.queue_depth_max, queue_depth)
+        if perf_counter_ns() - self._last_snapshot_ns >= self.interval_ns:
+            self.snapshot()
+
+    def summary(self, counters=None):
+        if counters is None:
+            counters = self.get_counters()
+        now = perf_counter_ns()
+        elapsed = (now - self.start_ns) / 1e9
+        interval = (now - self._last_snapshot_ns) / 1e9
+        totals = [0] * len(Phase)
+        for values in counters.values():
+            for phase in Phase:
+                totals[phase] += values[_phases + phase]
+        return {
+            "elapsed": elapsed,
+            "records": self.records,
+            "bytes_written": self.bytes_written,
+            "records_per_second": self.records / elapsed if elapsed else 0,
+            "current_records_per_second":
+            (self.records - self._last_snapshot_records) / interval
+            if interval else 0,
+            "queue_depth": self.queue_depth,
+            "queue_depth_max": self.queue_depth_max,
+            "phases_ns": dict(zip(phases, totals))
+        }
+
+    def get_rows(self, counters=None):
+        if counters is None:
+            counters = self.get_counters()
+        return [[module, function, *values]
+                for (module, function), values in counters.items()]
+
+    def snapshot(self):
+        """
+        Write the metrics in the report directory (JSON for the summary
+        and the functions, CSV for the functions) and return the summary
+        """
+        counters = self.get_counters()
+        summary = self.summary(counters)
+        rows = self.get_rows(counters)
+        functions = [dict(zip(csv_fields, row)) for row in rows]
+
+        def write_json(ostream):
+            json.dump({**summary, "functions": functions}, ostream, indent=1)
+
+        def write_csv(ostream):
+            writer = csv.writer(ostream)
+            writer.writerow(csv_fields)
+            writer.writerows(rows)
+
+        try:
+            _atomic_write(self.get_json_path(), write_json)
+            _atomic_write(self.get_csv_path(), write_csv)
+        except OSError as e:
+            logger.warning(f"Cannot write metrics {self.path}",
+                           caller=self, error=e)
+        self._last_snapshot_ns = perf_counter_ns()
+        self._last_snapshot_records = self.records
+        return summary
+
+    def get_json_path(self):
+        return f"{self.path}{constant.extension.json}"
+
+    def get_csv_path(self):
+        return f"{self.path}{constant.extension.csv}"
+
+
+def load(path):
+    with open(path) as istream:
+        return json.load(istream)
+
+
+def format_summary(summary):
+    """
+    One line summary of a metrics snapshot
+    """
+    total = sum(summary["phases_ns"].values())
+    shares = ", ".join(f"{phase} {ns / total:.0%}"
+                       for phase, ns in summary["phases_ns"].items()
+                       if total)
+    return (f"{summary['records']} records, "
+            f"{summary['records_per_second']:.1f} records/s, "
+            f"{ptutils.get_human_size(summary['bytes_written'])} written, "
+            f"max queue depth {summary['queue_depth_max']}"
+            + (f" ({shares})" if shares else ""))
@@ -1,3 +1,12 @@
+import pytracer.core.inout as ptinout
+import pytracer.core.inout.reader._binary as _binary
 import pytracer.core.inout.reader._pickle as _pickle
 
 Reader = _pickle.ReaderPickle
+
+readers = {ptinout.IOType.PICKLE: _pickle.ReaderPickle,
+           ptinout.IOType.BINARY: _binary.ReaderBinary}
+
+
+def get_reader(iotype):
+    return readers.get(iotype, Reader)
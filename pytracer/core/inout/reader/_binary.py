@@ -0,0 +1,129 @@
+import mmap
+import struct
+
+import dill as pickle
+import numpy as np
+
+import pytracer.core.inout._init as _init
+import pytracer.core.inout.reader._reader as _reader
+import pytracer.utils as ptutils
+from pytracer.core.config import constant
+from pytracer.core.inout.binary import (ArgKind, footer_format, footer_size,
+                                        index_fields, magic)
+from pytracer.core.inout.callsite import CallSite
+from pytracer.utils.log import get_logger
+
+logger = get_logger()
+
+index_dtype = np.dtype(index_fields)
+
+
+class ReaderBinary(_reader.Reader):
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.parameters = _init.IOInitializer()
+        self._import_modules()
+        self.position = 0
+        self.__init_mapping(filename)
+
+    def __init_mapping(self, filename):
+        try:
+            ptutils.check_extension(filename, constant.extension.binary)
+            logger.debug(f"Opening {filename}", caller=self)
+            with open(filename, "rb") as istream:
+                self.buffer = mmap.mmap(istream.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+            self.__read_tables()
+        except OSError as e:
+            logger.error(f"Can't open binary file: {filename}",
+                         error=e, caller=self)
+        except Exception as e:
+            logger.critical(f"While reading binary file: {filename}",
+                            error=e, caller=self)
+
+    def __read_tables(self):
+        if self.buffer[:len(magic)] != magic:
+            raise ValueError("Not a pytracer binary trace")
+        (footer_magic, index_offset, records,
+         strings_offset, strings_size,
+         callsites_offset, callsites_size) = struct.unpack_from(
+            footer_format, self.buffer, len(self.buffer) - footer_size)
+        if footer_magic != magic:
+            raise ValueError("Truncated binary trace")
+        self.index = np.frombuffer(self.buffer, dtype=index_dtype,
+                                   count=records, offset=index_offset)
+        self.strings = pickle.loads(
+            self.buffer[strings_offset:strings_offset+strings_size])
+        self.callsites = [
+            CallSite(i, *callsite) for i, callsite in enumerate(pickle.loads(
+                self.buffer[callsites_offset:callsites_offset+callsites_size]))]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __bool__(self):
+        # The logger tests its caller before the index is read
+        return True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.position >= len(self.index):
+            raise StopIteration
+        record = self[self.position]
+        self.position += 1
+        return record
+
+    def __getitem__(self, i):
+        record = self.header(i)
+        record["args"] = self.read_args(i)
+        return record
+
+    def seek(self, i):
+        self.position = i
+
+    def get_index(self):
+        return _reader.RecordIndex(len(self.index))
+
+    def seek_record(self, i, index):
+        self.seek(i)
+
+    def header(self, i):
+        """
+        Record i without its arguments, read from the index only
+        """
+        entry = self.index[i]
+        callsite = int(entry["callsite"])
+        return dict(id=int(entry["id"]),
+                    time=int(entry["time"]),
+                    module=self.strings[entry["module"]],
+                    function=self.strings[entry["function"]],
+                    label=self.strings[entry["label"]],
+                    backtrace=self.callsites[callsite]
+                    if callsite >= 0 else None)
+
+    def headers(self):
+        for i in range(len(self.index)):
+            yield self.header(i)
+
+    def read_args(self, i):
+        """
+        Arguments of record i. Arrays are views on the mapped file.
+        """
+        entry = self.index[i]
+        offset = int(entry["offset"])
+        descriptors = pickle.loads(
+            self.buffer[offset:offset+int(entry["size"])])
+        args = dict()
+        for name, kind, dtype, shape, offset, nbytes in descriptors:
+            if kind == ArgKind.ARRAY:
+                dtype = np.dtype(dtype)
+                count = nbytes // dtype.itemsize if dtype.itemsize else 0
+                args[name] = np.frombuffer(self.buffer, dtype=dtype,
+                                           count=count,
+                                           offset=offset).reshape(shape)
+            else:
+                args[name] = pickle.loads(self.buffer[offset:offset+nbytes])
+        return args
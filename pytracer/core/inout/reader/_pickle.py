@@ -1,45 +1,51 @@
-import importlib
 import dill as pickle
 
+import pytracer.core.inout as ptinout
 import pytracer.core.inout._init as _init
+import pytracer.core.inout.blob as blob
+from pytracer.core.inout.callsite import CallSite
 import pytracer.core.inout.reader._reader as _reader
 import pytracer.utils as ptutils
-from pytracer.core.config import config as cfg
 from pytracer.core.config import constant
 from pytracer.utils.log import get_logger
 
 logger = get_logger()
 
 
-class ReaderPickle(_reader.Reader):
+def _skip_payload(payload):
+    return None
+
+
+class IndexUnpickler(pickle.Unpickler):
+    """
+    Unpickler skipping the arguments serialized by the writer (PickledArg),
+    which the index does not need
+    """
+
+    def find_class(self, module, name):
+        if name == "loads" and module in ("pickle", "_pickle", "dill._dill"):
+            return _skip_payload
+        return super().find_class(module, name)
+
 
-    modules_to_load = []
-    are_module_imported = False
+class ReaderPickle(_reader.Reader):
 
     def __init__(self, filename):
         self.filename = filename
+        self.callsites = dict()
         self.parameters = _init.IOInitializer()
         self._import_modules()
         self.__init_generator(filename)
 
-    def _import_modules(self):
-        if ReaderPickle.are_module_imported:
-            return
-        append = self.modules_to_load.append
-        if self.modules_to_load == []:
-            for module in cfg.modules_to_load:
-                module_name = module.strip()
-                append(module_name)
-        for module in self.modules_to_load:
-            importlib.import_module(module)
-        ReaderPickle.are_module_imported = True
-
     def __init_generator(self, filename):
         try:
             ptutils.check_extension(filename, constant.extension.pickle)
             logger.debug(f"Opening {filename}", caller=self)
-            fi = open(filename, "rb")
-            self.unpickler = pickle.Unpickler(fi)
+            self.istream = open(filename, "rb")
+            self.unpickler = pickle.Unpickler(self.istream)
+            self.blobs = blob.BlobReader(
+                f"{filename}{constant.extension.blobs}",
+                self.parameters.dedup_cache_size)
         except OSError as e:
             logger.error(f"Can't open Pickle file: {filename}",
                          error=e, caller=self)
@@ -53,11 +59,62 @@ class ReaderPickle(_reader.Reader):
     def __iter__(self):
         return self
 
+    def get_index(self):
+        """
+        The records written right after a memo reset can be read alone
+        """
+        self.istream.seek(0)
+        unpickler = IndexUnpickler(self.istream)
+        starts = dict()
+        callsites = dict()
+        records = 0
+        start = 0
+        while True:
+            try:
+                obj = unpickler.load()
+            except EOFError:
+                break
+            if isinstance(obj, str) and obj == ptinout.memo_reset_marker:
+                unpickler = IndexUnpickler(self.istream)
+                start = self.istream.tell()
+            elif isinstance(obj, CallSite):
+                callsites[obj.id] = obj
+            else:
+                if start is not None:
+                    starts[records] = start
+                    start = None
+                records += 1
+        self.seek_record(0, _reader.RecordIndex(records, {0: 0}))
+        return _reader.RecordIndex(records, starts, callsites)
+
+    def seek_record(self, i, index):
+        self.istream.seek(index.starts[i])
+        self.unpickler = pickle.Unpickler(self.istream)
+        self.callsites = dict(index.callsites)
+
+    def _load(self):
+        obj = self.unpickler.load()
+        while True:
+            if isinstance(obj, str) and obj == ptinout.memo_reset_marker:
+                # Traces written with a bounded memo: the unpickler memo
+                # cannot be reset in place so a new unpickler takes over
+                self.unpickler = pickle.Unpickler(self.istream)
+            elif isinstance(obj, CallSite):
+                self.callsites[obj.id] = obj
+            else:
+                return obj
+            obj = self.unpickler.load()
+
     def __next__(self):
         try:
-            return self.unpickler.load()
+            record = self._load()
         except EOFError:
             raise StopIteration
         except Exception as e:
             logger.critical("Unknown exception",
                             error=e, caller=self)
+        if isinstance(record["backtrace"], int):
+            record["backtrace"] = self.callsites[record["backtrace"]]
+        if blob.has_references(record["args"]):
+            record["args"] = blob.LazyArgs(record["args"], self.blobs)
+        return record
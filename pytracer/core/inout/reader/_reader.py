@@ -1,8 +1,58 @@
+import importlib
 from abc import abstractmethod
 
+from pytracer.core.config import config as cfg
+
+
+class RecordIndex:
+    """
+    Number of records of a trace and the records it can be read from
+    without reading the previous ones. starts maps these records to
+    their offset, None when every record is a start.
+    """
+
+    def __init__(self, records, starts=None, callsites=None):
+        self.records = records
+        self.starts = starts
+        self.callsites = {} if callsites is None else callsites
+
+    def get_starts(self):
+        if self.starts is None:
+            return set(range(self.records))
+        return set(self.starts)
+
 
 class Reader():
 
+    modules_to_load = []
+    are_module_imported = False
+
+    def _import_modules(self):
+        if Reader.are_module_imported:
+            return
+        append = self.modules_to_load.append
+        if self.modules_to_load == []:
+            for module in cfg.modules_to_load:
+                module_name = module.strip()
+                append(module_name)
+        for module in self.modules_to_load:
+            importlib.import_module(module)
+        Reader.are_module_imported = True
+
     @abstractmethod
     def read(self, filename):
         pass
+
+    @abstractmethod
+    def get_index(self):
+        """
+        RecordIndex of the trace
+        """
+        pass
+
+    @abstractmethod
+    def seek_record(self, i, index):
+        """
+        Read from record i, a start of index
+        """
+        pass
@@ -0,0 +1,47 @@
+import dill as pickle
+
+import pytracer.core.inout as ptinout
+import pytracer.core.inout._init as _init
+import pytracer.core.inout.reader._pickle as _pickle
+from pytracer.utils.log import get_logger
+
+logger = get_logger()
+
+
+class ReaderStream(_pickle.ReaderPickle):
+    """
+    Records sent by a WriterStream. complete tells whether the stream
+    reached its end marker once the iteration is over.
+    """
+
+    def __init__(self, istream):
+        self.filename = None
+        self.callsites = dict()
+        self.parameters = _init.IOInitializer()
+        self._import_modules()
+        self.istream = istream
+        self.unpickler = pickle.Unpickler(istream)
+        self.blobs = None
+        self.complete = False
+        self.sample, self.filename = self.unpickler.load()
+
+    def _load(self):
+        obj = super()._load()
+        if isinstance(obj, str) and obj == ptinout.end_of_stream_marker:
+            self.complete = True
+            raise EOFError
+        return obj
+
+    def __next__(self):
+        try:
+            record = self._load()
+        except EOFError:
+            raise StopIteration
+        except Exception as e:
+            # A sample killed while writing leaves a truncated record
+            logger.warning(f"Stream of sample {self.sample} interrupted",
+                           caller=self, error=e)
+            raise StopIteration
+        if isinstance(record["backtrace"], int):
+            record["backtrace"] = self.callsites[record["backtrace"]]
+        return record
@@ -0,0 +1,288 @@
+import os
+import pickle
+import re
+import tempfile
+from enum import IntEnum, auto
+
+import xxhash
+
+from pytracer.core.config import config as cfg
+from pytracer.core.config import constant
+from pytracer.core.inout.callsite import get_frame
+from pytracer.core.wrapper import plan
+from pytracer.utils.log import get_logger
+
+logger = get_logger()
+
+# Frame of the traced call seen from Sampler.sample:
+# sample <- Writer.write* <- wrapper <- caller
+_caller_depth = 3
+
+
+class SamplingPolicy(IntEnum):
+    ALL = auto()
+    EVERY = auto()
+    FIRST = auto()
+    RESERVOIR = auto()
+    BUDGET = auto()
+
+    def from_string(string):
+        if string == "all":
+            return SamplingPolicy.ALL
+        if string == "every":
+            return SamplingPolicy.EVERY
+        if string == "first":
+            return SamplingPolicy.FIRST
+        if string == "reservoir":
+            return SamplingPolicy.RESERVOIR
+        if string == "budget":
+            return SamplingPolicy.BUDGET
+        return None
+
+
+def get_key():
+    """
+    Digest of what the budget schedules depend on: the instrumentation
+    decisions and the sampling rules
+    """
+    key = (plan.get_key(), repr(cfg.sampling.rules))
+    return xxhash.xxh3_64_hexdigest(repr(key).encode())
+
+
+def get_schedule_path(directory):
+    """
+    Schedule frozen by the campaign running the trace,
+    or the one of directory for this key
+    """
+    if cfg.sampling.schedule:
+        return cfg.sampling.schedule
+    filename = (f"{constant.sampling.filename}.{get_key()}"
+                f"{constant.sampling.ext}")
+    return os.path.join(directory, filename)
+
+
+def save(obj, path):
+    # Concurrent runs may save the same schedule
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                    suffix=".tmp")
+    with os.fdopen(fd, "wb") as ostream:
+        pickle.dump(obj, ostream)
+    os.replace(tmp_path, path)
+
+
+def get_site():
+    frame = get_frame(_caller_depth + 1)
+    return (frame.f_code.co_filename, frame.f_lineno)
+
+
+class Policy:
+
+    per_site = False
+
+    def __init__(self, rule):
+        self.sampled = 0
+        self.skipped = 0
+
+    def keep(self, site):
+        return True
+
+    def __call__(self, site):
+        if self.keep(site):
+            self.sampled += 1
+            return True
+        self.skipped += 1
+        return False
+
+
+class EveryPolicy(Policy):
+    """
+    Keep one call out of n
+    """
+
+    def __init__(self, rule):
+        super().__init__(rule)
+        self.n = rule.get("n", 1)
+        self.calls = 0
+
+    def keep(self, site):
+        self.calls += 1
+        return (self.calls - 1) % self.n == 0
+
+
+class FirstPolicy(Policy):
+    """
+    Keep the first k calls of each call site
+    """
+
+    per_site = True
+
+    def __init__(self, rule):
+        super().__init__(rule)
+        self.k = rule.get("k", 1)
+        self.calls = dict()
+
+    def keep(self, site):
+        calls = self.calls.get(site, 0)
+        self.calls[site] = calls + 1
+        return calls < self.k
+
+
+class ReservoirPolicy(FirstPolicy):
+    """
+    Reservoir of k calls per call site. Records cannot be withdrawn from
+    the trace so every call entering the reservoir is kept. The random
+    draws are hashes of the site and call number, hence identical across
+    the runs.
+    """
+
+    def __init__(self, rule):
+        super().__init__(rule)
+        self.seed = rule.get("seed", 0)
+
+    def keep(self, site):
+        calls = self.calls.get(site, 0)
+        self.calls[site] = calls + 1
+        if calls < self.k:
+            return True
+        key = f"{site[0]}:{site[1]}:{calls}".encode()
+        draw = xxhash.xxh64_intdigest(key, seed=self.seed) / 2**64
+        return draw * (calls + 1) < self.k
+
+
+class BudgetPolicy(Policy):
+    """
+    Keep one call out of stride, stride being doubled when tracing the
+    last window calls took more than budget seconds and halved when it
+    took less than half of it. The first run records the strides used,
+    the next runs replay them so they trace the same calls.
+    """
+
+    def __init__(self, rule, schedule=None):
+        super().__init__(rule)
+        self.budget = rule.get("budget", 0.1)
+        self.window = rule.get("window", 1000)
+        self.stride = 1
+        self.calls = 0
+        self.elapsed = 0
+        self.replay = schedule is not None
+        self.schedule = list(schedule) if self.replay else []
+        self._next_change = 0
+
+    def keep(self, site):
+        if self.replay:
+            while self._next_change < len(self.schedule) and \
+                    self.schedule[self._next_change][0] == self.calls:
+                self.stride = self.schedule[self._next_change][1]
+                self._next_change += 1
+        elif self.calls and self.calls % self.window == 0:
+            self.adapt()
+        self.calls += 1
+        return (self.calls - 1) % self.stride == 0
+
+    def adapt(self):
+        stride = self.stride
+        if self.elapsed > self.budget:
+            stride *= 2
+        elif self.elapsed < self.budget / 2 and stride > 1:
+            stride //= 2
+        self.elapsed = 0
+        if stride != self.stride:
+            self.stride = stride
+            self.schedule.append((self.calls, stride))
+
+    def charge(self, elapsed):
+        self.elapsed += elapsed
+
+
+_policies = {SamplingPolicy.ALL: Policy,
+             SamplingPolicy.EVERY: EveryPolicy,
+             SamplingPolicy.FIRST: FirstPolicy,
+             SamplingPolicy.RESERVOIR: ReservoirPolicy,
+             SamplingPolicy.BUDGET: BudgetPolicy}
+
+
+class Sampler:
+
+    _wildcard = ".*"
+
+    def __init__(self, directory):
+        self.enable = bool(cfg.sampling.enable)
+        self.schedule_path = None
+        self.timed = False
+        self._rules = []
+        self._policies = dict()
+        self._schedules = dict()
+        if self.enable:
+            self._read_rules()
+        if self.timed:
+            self.schedule_path = get_schedule_path(directory)
+            self._load_schedules()
+
+    def _read_rules(self):
+        for rule in cfg.sampling.rules or []:
+            policy = SamplingPolicy.from_string(rule.get("policy", "all"))
+            if policy is None:
+                logger.error(f"Unknown sampling policy: {rule}",
+                             caller=self, raise_error=False)
+                continue
+            module = rule.get("module", "*")
+            function = rule.get("function", "*")
+            module_re = re.compile(module.replace("*", self._wildcard))
+            function_re = re.compile(function.replace("*", self._wildcard))
+            self._rules.append((module_re, function_re, policy, rule))
+            self.timed |= policy == SamplingPolicy.BUDGET
+
+    def _load_schedules(self):
+        if not os.path.isfile(self.schedule_path):
+            return
+        with open(self.schedule_path, "rb") as istream:
+            self._schedules = pickle.load(istream)
+        logger.info(f"Replay sampling schedule {self.schedule_path}",
+                    caller=self)
+
+    def save_schedules(self):
+        schedules = {key: policy.schedule
+                     for key, policy in self._policies.items()
+                     if isinstance(policy, BudgetPolicy) and
+                     not policy.replay}
+        if not schedules or os.path.isfile(self.schedule_path):
+            return
+        save(schedules, self.schedule_path)
+
+    def _resolve(self, module, function):
+        for module_re, function_re, policy, rule in self._rules:
+            if module_re.fullmatch(str(module)) and \
+                    function_re.fullmatch(str(function)):
+                if policy == SamplingPolicy.BUDGET and self._schedules:
+                    return BudgetPolicy(
+                        rule, self._schedules.get((module, function), []))
+                return _policies[policy](rule)
+        return None
+
+    def sample(self, module, function):
+        """
+        True if this call of module.function must be traced
+        """
+        if not self.enable:
+            return True
+        key = (module, function)
+        try:
+            policy = self._policies[key]
+        except KeyError:
+            policy = self._policies[key] = self._resolve(module, function)
+        if policy is None:
+            return True
+        return policy(get_site() if policy.per_site else None)
+
+    def charge(self, module, function, elapsed):
+        policy = self._policies.get((module, function))
+        if isinstance(policy, BudgetPolicy):
+            policy.charge(elapsed)
+
+    def get_counts(self):
+        """
+        Number of sampled and skipped calls of each sampled function
+        """
+        return {key: (policy.sampled, policy.skipped)
+                for key, policy in self._policies.items()
+                if policy is not None}
@@ -0,0 +1,56 @@
+import os
+import socket
+import tempfile
+
+# Unix socket paths are limited to about a hundred characters
+_socket_filename = "aggregator.sock"
+
+
+class StreamOutput:
+    """
+    Buffered output to a socket. The bytes written stand for the
+    position of the stream, as the writers use tell() on their trace.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.ostream = connection.makefile("wb")
+        self.position = 0
+
+    def write(self, data):
+        self.position += len(data)
+        return self.ostream.write(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        self.ostream.flush()
+
+    def close(self):
+        self.ostream.close()
+        self.connection.close()
+
+
+def get_address():
+    directory = tempfile.mkdtemp(prefix="pytracer.")
+    return os.path.join(directory, _socket_filename)
+
+
+def remove_address(address):
+    if os.path.exists(address):
+        os.remove(address)
+    os.rmdir(os.path.dirname(address))
+
+
+def listen(address, backlog):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(address)
+    server.listen(backlog)
+    return server
+
+
+def connect(address):
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(address)
+    return StreamOutput(connection)
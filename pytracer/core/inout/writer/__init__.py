@@ -1,6 +1,15 @@
-from . import _pickle
+import os
 
+from . import _binary, _pickle, _stream
+
+from pytracer.core.config import constant
+from pytracer.core.inout import _init
 from pytracer.module.info import register
 
-Writer = _pickle.WriterPickle()
+if address := os.getenv(constant.env.aggregator):
+    Writer = _stream.WriterStream(address, int(os.getenv(constant.env.sample)))
+elif _init.IOInitializer().get_type() == _init.IOType.BINARY:
+    Writer = _binary.WriterBinary()
+else:
+    Writer = _pickle.WriterPickle()
 register.set_trace(Writer.get_filename(), Writer.get_filename_path())
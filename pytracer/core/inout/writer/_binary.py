@@ -0,0 +1,139 @@
+import struct
+import tempfile
+
+import dill as pickle
+
+import pytracer.core.inout.blob as blob
+import pytracer.core.inout.writer._pickle as _pickle
+from pytracer.core.config import constant
+from pytracer.core.inout.binary import (ArgKind, alignment, footer_format,
+                                        index_format, magic)
+from pytracer.utils.log import get_logger
+
+logger = get_logger()
+
+
+class WriterBinary(_pickle.WriterPickle):
+
+    extension = constant.extension.binary
+
+    def _init_streams(self):
+        self.memo_size_max = 0
+        self.records = 0
+        self._strings = dict()
+        # Arrays already written, the file is its own blob store
+        self._blob_offsets = dict()
+        self._init_dedup()
+        try:
+            self.ostream = open(self.filename_path, "wb")
+            self.ostream.write(magic)
+            self._index_ostream = tempfile.TemporaryFile(
+                prefix=f"{self.filename}.", suffix=".index")
+        except OSError as e:
+            logger.error(f"Can't open binary file: {self.filename_path}",
+                         error=e, caller=self, raise_error=False)
+        except Exception as e:
+            logger.critical("Unexpected error", error=e, caller=self)
+
+    def _close_streams(self):
+        if self.records == 0:
+            # Nothing traced: leave an empty file that exit removes
+            self.ostream.truncate(0)
+        else:
+            self._write_tables()
+        self._index_ostream.close()
+        super()._close_streams()
+
+    def _write_tables(self):
+        strings = list(self._strings)
+        strings_offset = self.ostream.tell()
+        self.ostream.write(pickle.dumps(strings,
+                                        protocol=pickle.HIGHEST_PROTOCOL))
+        callsites = [(callsite.filename, callsite.lineno, callsite.name)
+                     for callsite in self.callsites]
+        callsites_offset = self.ostream.tell()
+        self.ostream.write(pickle.dumps(callsites,
+                                        protocol=pickle.HIGHEST_PROTOCOL))
+        index_offset = self._align()
+        self._index_ostream.seek(0)
+        while chunk := self._index_ostream.read(1 << 20):
+            self.ostream.write(chunk)
+        footer = struct.pack(footer_format, magic, index_offset, self.records,
+                             strings_offset, callsites_offset - strings_offset,
+                             callsites_offset, index_offset - callsites_offset)
+        self.ostream.write(footer)
+
+    def _align(self):
+        position = self.ostream.tell()
+        if (padding := -position % alignment):
+            self.ostream.write(bytes(padding))
+        return position + padding
+
+    def _intern(self, table, key):
+        if (_id := table.get(key)) is None:
+            _id = table[key] = len(table)
+        return _id
+
+    def _write_args(self, args):
+        descriptors = []
+        for name, value in args.items():
+            if isinstance(value, _pickle.PickledArg):
+                offset = self.ostream.tell()
+                self.ostream.write(value.payload)
+                descriptors.append((name, ArgKind.PICKLE, None, None,
+                                    offset, len(value.payload)))
+            else:
+                offset = self._write_array(value)
+                descriptors.append((name, ArgKind.ARRAY, value.dtype.str,
+                                    value.shape, offset, value.nbytes))
+        offset = self.ostream.tell()
+        self.ostream.write(pickle.dumps(descriptors,
+                                        protocol=pickle.HIGHEST_PROTOCOL))
+        return offset, self.ostream.tell() - offset
+
+    def _write_array(self, value):
+        digest = None
+        if self.parameters.dedup_enable and \
+                value.nbytes >= self.parameters.dedup_min_bytes:
+            digest = blob.get_digest(value)
+            if (offset := self._blob_offsets.get(digest)) is not None:
+                self.dedup_hits += 1
+                self.dedup_saved_bytes += value.nbytes
+                return offset
+        if not value.flags.c_contiguous:
+            value = value.copy(order='C')
+        offset = self._align()
+        if value.nbytes:
+            self.ostream.write(value.reshape(-1).view('u1'))
+        if digest is not None:
+            self._blob_offsets[digest] = offset
+        return offset
+
+    def _write(self, to_write):
+        if self.is_dumping:
+            return
+        self.is_dumping = True
+        try:
+            offset, size = self._write_args(to_write["args"])
+            entry = struct.pack(
+                index_format,
+                to_write["time"],
+                to_write["id"],
+                self._intern(self._strings, to_write["module"]),
+                self._intern(self._strings, to_write["function"]),
+                self._intern(self._strings, to_write["label"]),
+                -1 if (callsite := to_write["backtrace"]) is None
+                else callsite,
+                offset, size)
+            self._index_ostream.write(entry)
+            self.records += 1
+        except Exception as e:
+            logger.warning("Record cannot be written",
+                           caller=self, error=e)
+        finally:
+            self.is_dumping = False
+
+    def encode_arg(self, obj):
+        if blob.is_raw_array(obj):
+            return obj
+        return super().encode_arg(obj)
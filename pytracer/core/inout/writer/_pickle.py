@@ -1,23 +1,34 @@
 
 import atexit
+import copy
 import datetime
 import io
 import os
+import queue
+import resource
 import dill as pickle
 import shutil
+import sys
+import tempfile
 import threading
-import traceback
 import types
 from contextlib import contextmanager
+from time import perf_counter, perf_counter_ns
 
 import pytracer.cache as cache
+import pytracer.core.inout as ptinout
 import pytracer.core.inout._init as _init
+import pytracer.core.inout.blob as blob
+import pytracer.core.inout.callsite as callsite
+import pytracer.core.inout.metrics as metrics
+import pytracer.core.inout.sampling as sampling
 import pytracer.core.inout.binding as binding
 import pytracer.core.inout.writer._writer as _writer
 import pytracer.utils as ptutils
 from pytracer.cache import dumped_functions, visited_files
 from pytracer.core.config import config as cfg
 from pytracer.core.config import constant
+from pytracer.core.inout.metrics import Phase
 from pytracer.utils import get_functions_from_traceback, report
 from pytracer.utils.log import get_logger
 from pytracer.utils.singleton import Counter
@@ -62,6 +73,61 @@ class PytracerPickleTrace(dict):
         return repr(d)
 
 
+class PickledArg:
+    """
+    Argument serialized once by the writer.
+    Unpickling the record gives back the original object.
+    """
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __reduce__(self):
+        return (pickle.loads, (self.payload,))
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self.payload)
+
+
+# Types whose picklability depends on their content
+_container_types = (list, tuple, dict, set, frozenset)
+
+
+def _snapshot(value):
+    _type = type(value)
+    if hasattr(value, '__array_interface__'):
+        return copy.copy(value)
+    if _type.__module__.startswith("scipy.sparse"):
+        return value.copy()
+    if _type is list or _type is tuple:
+        return _type(_snapshot(item) for item in value)
+    if _type is dict:
+        return {key: _snapshot(item) for key, item in value.items()}
+    return value
+
+
+def snapshot(args):
+    """
+    Copy array arguments, sparse matrices and arrays within lists, tuples
+    and dicts included, so that the record written asynchronously
+    is not modified by the application in the meantime
+    """
+    return {name: _snapshot(value) for name, value in args.items()}
+
+
+def _is_picklable(obj):
+    try:
+        pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return False
+    return True
+
+
+_end_of_stream = object()
+
+
 @contextmanager
 def safe_dump(self, pickler):
     if self.is_dumping:
@@ -79,19 +145,50 @@ class WriterPickle(_writer.Writer):
 
     elements = 0
     count_ofile = 0
+    extension = constant.extension.pickle
+    # Seconds a record waits for the full queue before it is spilled
+    block_timeout = 1
 
     def __init__(self):
+        self._local = threading.local()
         self.is_dumping = False
+        self._picklable_types = dict()
+        self.unpicklable_instances = 0
+        self.callsites = callsite.CallSiteTable()
+        self._callsites_written = 0
         self.parameters = _init.IOInitializer()
         self.datefmt = "%y%m%d%H%M%S"
+        self.sampler = sampling.Sampler(self.parameters.cache_info_path)
         self._init_ostream()
+        self._init_queue()
+        self._init_metrics()
         atexit.register(self.exit)
 
+    @property
+    def is_dumping(self):
+        # Each thread has its own flag so the writer thread
+        # does not discard records coming from the application
+        return getattr(self._local, "is_dumping", False)
+
+    @is_dumping.setter
+    def is_dumping(self, value):
+        self._local.is_dumping = value
+
     def exit(self):
         # Be sure that all data in pickle buffer is dumped
         logger.debug("Close writer", caller=self)
-        self.ostream.flush()
-        self.ostream.close()
+        self._stop_queue()
+        self._close_streams()
+        logger.info((f"Writer memory: max memo size {self.memo_size_max}, "
+                     f"max RSS {ptutils.get_human_size(self.get_rss_max())}"),
+                    caller=self)
+        self.sampler.save_schedules()
+        if self.metrics.enable:
+            self.write_metrics()
+        if self.dedup_hits:
+            logger.info((f"Writer dedup: {self.dedup_hits} arrays reused, "
+                         f"{ptutils.get_human_size(self.dedup_saved_bytes)} "
+                         f"saved"), caller=self)
         if os.path.isfile(self.filename_path):
             if os.stat(self.filename_path).st_size == 0:
                 os.remove(self.filename_path)
@@ -104,6 +201,7 @@ class WriterPickle(_writer.Writer):
         return self.filename_path
 
     def copy_sources(self):
+        visited_files.update(self.callsites.filenames())
         for filename in visited_files:
             src = filename
             if os.path.isfile(src):
@@ -114,10 +212,13 @@ class WriterPickle(_writer.Writer):
                 shutil.copy(src, dst)
 
     def _init_streams(self):
+        self.memo_size_max = 0
+        self._memo_records = 0
+        self._memo_position = 0
+        self._init_dedup()
         try:
             self.ostream = open(self.filename_path, "wb")
-            self.pickler = pickle.Pickler(
-                self.ostream, protocol=pickle.HIGHEST_PROTOCOL)
+            self._init_pickler()
             # self.pickler.fast = True
         except OSError as e:
             logger.error(f"Can't open pickle file: {self.filename_path}",
@@ -125,52 +226,304 @@ class WriterPickle(_writer.Writer):
         except Exception as e:
             logger.critical("Unexpected error", error=e, caller=self)
 
+    def _init_pickler(self):
+        # Objects are pickled in a buffer and written once complete
+        # so that a failed dump leaves no truncated record
+        self._buffer = io.BytesIO()
+        self.pickler = pickle.Pickler(
+            self._buffer, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _init_dedup(self):
+        self.dedup_hits = 0
+        self.dedup_saved_bytes = 0
+        self.blobs = blob.BlobWriter(
+            f"{self.filename_path}{constant.extension.blobs}")
+
+    def _flush_streams(self):
+        self.ostream.flush()
+        self.blobs.flush()
+
+    def _close_streams(self):
+        self.ostream.flush()
+        self.ostream.close()
+        self.blobs.close()
+
     def _init_ostream(self):
         if not (filename := self.parameters.trace):
             filename = datetime.datetime.now().strftime(self.datefmt)
         self.filename = ptutils.get_filename(
-            filename, constant.extension.pickle)
+            filename, self.extension)
         self.filename_path = self._get_filename_path(self.filename)
 
         self._init_streams()
 
+    def _init_queue(self):
+        self.queue_depth_max = 0
+        self.dropped_records = 0
+        self.spilled_records = 0
+        self._queue = None
+        if self.parameters.writer_mode != _init.WriterMode.ASYNC:
+            return
+        self._backpressure = self.parameters.writer_backpressure
+        self._queue = queue.Queue(maxsize=self.parameters.writer_queue_size)
+        self._spill_lock = threading.Lock()
+        self._spill_ostream = None
+        self._thread = threading.Thread(target=self._drain,
+                                        name="PytracerWriter",
+                                        daemon=True)
+        self._thread.start()
+        logger.info((f"Asynchronous writer "
+                     f"(queue size: {self.parameters.writer_queue_size}, "
+                     f"backpressure: {self._backpressure.name.lower()})"),
+                    caller=self)
+
+    def _stop_queue(self):
+        if self._queue is None:
+            return
+        self._queue.put(_end_of_stream)
+        self._thread.join()
+        self._queue = None
+        logger.info((f"Writer queue: max depth {self.queue_depth_max}, "
+                     f"dropped {self.dropped_records}, "
+                     f"spilled {self.spilled_records}"), caller=self)
+        if self.dropped_records:
+            logger.warning((f"{self.dropped_records} records were dropped, "
+                            f"the trace cannot be merged with other samples"),
+                           caller=self)
+
+    def _init_metrics(self):
+        name, _ = os.path.splitext(self.filename)
+        path = os.path.join(self.parameters.cache_report_path,
+                            f"{name}.{constant.metrics.filename}")
+        self.metrics = metrics.Metrics(self.parameters.metrics_enable,
+                                       self.parameters.metrics_interval,
+                                       path)
+
+    def write_metrics(self):
+        """
+        Write a metrics snapshot and return its summary
+        """
+        summary = self.metrics.snapshot()
+        logger.info(f"Writer metrics: {metrics.format_summary(summary)}",
+                    caller=self)
+        return summary
+
+    def get_queue_depth(self):
+        if self._queue is None:
+            return 0
+        return self._queue.qsize()
+
+    def flush(self):
+        """
+        Wait until every record enqueued so far is written
+        """
+        if self._queue is not None:
+            flushed = threading.Event()
+            self._queue.put(flushed)
+            flushed.wait()
+        self._flush_streams()
+
+    def _enqueue(self, record):
+        self.is_dumping = True
+        try:
+            record["args"] = snapshot(record["args"])
+        finally:
+            self.is_dumping = False
+
+        if self._backpressure == _init.Backpressure.DROP:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.dropped_records += 1
+        else:
+            if self._backpressure == _init.Backpressure.BLOCK and \
+                    self._spill_ostream is None:
+                # The application may hold an import lock that the writer
+                # thread waits for to pickle the records, they are spilled
+                # once the queue stays full for block_timeout
+                try:
+                    self._queue.put(record, timeout=self.block_timeout)
+                    record = None
+                except queue.Full:
+                    pass
+            with self._spill_lock:
+                # Once records are spilled, the next ones follow them
+                # until the writer thread replays them to keep the order
+                if record is not None and self._spill_ostream is None:
+                    try:
+                        self._queue.put_nowait(record)
+                        record = None
+                    except queue.Full:
+                        pass
+                if record is not None:
+                    self._spill(record)
+        self.queue_depth_max = max(self.queue_depth_max,
+                                   self._queue.qsize())
+
+    def _spill(self, record):
+        """
+        Write the record as is, the writer thread encodes its
+        arguments when it replays it like those of the queue
+        """
+        if self._spill_ostream is None:
+            self._spill_ostream = tempfile.TemporaryFile(
+                prefix=f"{self.filename}.", suffix=".spill")
+        args = record["args"]
+        args.pop("self", None)
+        self.is_dumping = True
+        try:
+            try:
+                payload = pickle.dumps(record,
+                                       protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                # Arguments that cannot be pickled are dropped
+                # as clean_args does
+                record["args"] = {name: value for name, value in args.items()
+                                  if _is_picklable(value)}
+                payload = pickle.dumps(record,
+                                       protocol=pickle.HIGHEST_PROTOCOL)
+            # Each record is framed on its own so that one that
+            # fails to load does not stop the replay
+            pickle.dump(payload, self._spill_ostream,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+            self.spilled_records += 1
+        except Exception as e:
+            logger.warning("Spilled record cannot be saved",
+                           caller=self, error=e)
+        finally:
+            self.is_dumping = False
+
+    def _replay_spill(self):
+        with self._spill_lock:
+            spill_ostream = self._spill_ostream
+            self._spill_ostream = None
+        if spill_ostream is None:
+            return
+        spill_ostream.seek(0)
+        while True:
+            # Traced functions called to unpickle the arguments
+            # are not records of the application
+            self.is_dumping = True
+            try:
+                record = pickle.loads(pickle.load(spill_ostream))
+            except EOFError:
+                break
+            except Exception as e:
+                logger.warning("Spilled record cannot be loaded",
+                               caller=self, error=e)
+                continue
+            finally:
+                self.is_dumping = False
+            try:
+                self._dump_record(record)
+            except Exception as e:
+                logger.warning("Record cannot be written",
+                               caller=self, error=e)
+        spill_ostream.close()
+
+    def _drain(self):
+        while True:
+            try:
+                record = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                self._replay_spill()
+                continue
+            if record is _end_of_stream:
+                self._replay_spill()
+                break
+            if isinstance(record, threading.Event):
+                self._replay_spill()
+                self._flush_streams()
+                record.set()
+                continue
+            try:
+                self._dump_record(record)
+            except Exception as e:
+                logger.warning("Record cannot be written",
+                               caller=self, error=e)
+            if self._queue.empty():
+                self._replay_spill()
+
     def _get_filename_path(self, filename):
-        ptutils.check_extension(filename, constant.extension.pickle)
+        ptutils.check_extension(filename, self.extension)
         filename, ext = os.path.splitext(filename)
-        ext = ext if ext else constant.extension.pickle
+        ext = ext if ext else self.extension
         return (f"{self.parameters.cache_path}{os.sep}"
                 f"{self.parameters.cache_traces}{os.sep}"
                 f"{filename}{ext}")
 
-    def is_writable(self, obj):
+    def _dump(self, obj):
+        """
+        Write obj, False if a dump is already running.
+        Raise if obj cannot be pickled, nothing of it is written.
+        """
         if self.is_dumping:
             return False
         self.is_dumping = True
         try:
-            pickle.dump(obj, io.BytesIO(),
-                        protocol=pickle.HIGHEST_PROTOCOL)
-        except Exception as e:
-            print(e)
-            self.is_dumping = False
-            return False
-        else:
+            self._dump_buffered(obj)
+        finally:
             self.is_dumping = False
-            return True
+        return True
 
-    def _dump(self, obj):
-        if self.is_dumping:
-            return False
-        self.is_dumping = True
+    def _dump_buffered(self, obj):
         try:
             self.pickler.dump(obj)
         except Exception:
-            self.is_dumping = False
-        else:
-            self.is_dumping = False
+            # The memo refers to objects of the discarded dump,
+            # a new pickler takes over after the reader resets its memo
+            self._init_pickler()
+            self.pickler.dump(ptinout.memo_reset_marker)
+            self.pickler.clear_memo()
+            raise
+        finally:
+            with self._buffer.getbuffer() as view:
+                self.ostream.write(view)
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+    def get_rss_max(self):
+        """
+        High-water mark of the process resident memory in bytes
+        """
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _bound_memo(self):
+        """
+        The pickler memo keeps a reference to every object written.
+        Clear it every memo_records records or memo_bytes bytes,
+        after a marker telling the reader to do the same.
+        The record resets fall on the same records in every sample,
+        so that the parser can split the traces there.
+        """
+        self.memo_size_max = max(self.memo_size_max, len(self.pickler.memo))
+        memo_records = self.parameters.writer_memo_records
+        memo_bytes = self.parameters.writer_memo_bytes
+        if not memo_records and not memo_bytes:
+            return
+        self._memo_records += 1
+        position = self.ostream.tell()
+        if (memo_records and self._memo_records % memo_records == 0) or \
+                (memo_bytes and position - self._memo_position >= memo_bytes):
+            self._dump(ptinout.memo_reset_marker)
+            self.pickler.clear_memo()
+            self._memo_position = self.ostream.tell()
+
+    def _write_callsites(self, callsite_id):
+        """
+        Write the call sites not written yet up to callsite_id
+        before the first record referring to them
+        """
+        if callsite_id is None:
+            return
+        while self._callsites_written <= callsite_id:
+            self._dump(self.callsites[self._callsites_written])
+            self._callsites_written += 1
 
     def _write(self, to_write):
-        self._dump(to_write)
-        # self.pickler.dump(to_write)
+        self._write_callsites(to_write["backtrace"])
+        if self._dump(to_write):
+            self._bound_memo()
 
     def critical_writing_error(self, e):
         possible_functions = get_functions_from_traceback()
@@ -180,15 +533,66 @@ class WriterPickle(_writer.Writer):
         cache.cached_error = (msg, e)
         raise e
 
+    def encode_arg(self, obj):
+        """
+        Serialize obj exactly once and return its PickledArg,
+        or None if obj cannot be pickled
+        """
+        _type = type(obj)
+        if self._picklable_types.get(_type, True) is False:
+            return None
+        if self.is_dumping:
+            return None
+        if self.parameters.dedup_enable and blob.is_raw_array(obj) and \
+                obj.nbytes >= self.parameters.dedup_min_bytes:
+            return self.encode_blob(obj)
+        self.is_dumping = True
+        try:
+            payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug("Cannot pickle %s: %s", _type, e, caller=self)
+            # A type that never succeeded is not tried anymore but
+            # a failing instance of a picklable type is only skipped
+            if _type not in self._picklable_types and \
+                    not issubclass(_type, _container_types):
+                self._picklable_types[_type] = False
+            self.unpicklable_instances += 1
+            return None
+        finally:
+            self.is_dumping = False
+        self._picklable_types[_type] = True
+        return PickledArg(payload)
+
+    def encode_blob(self, obj):
+        """
+        Store obj once in the blob store and return its BlobReference
+        """
+        self.is_dumping = True
+        try:
+            digest = blob.get_digest(obj)
+            if digest in self.blobs:
+                self.dedup_hits += 1
+                self.dedup_saved_bytes += obj.nbytes
+            else:
+                self.blobs.put(digest, pickle.dumps(
+                    obj, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            logger.debug("Cannot store array in blob store: %s", e,
+                         caller=self)
+            return None
+        finally:
+            self.is_dumping = False
+        return blob.BlobReference(digest)
+
     def clean_args(self, args):
         keys = list(args.keys())
         for name in keys:
             if name == 'self':
                 args.pop(name)
-            elif not self.is_writable(args[name]):
+            elif (encoded := self.encode_arg(args[name])) is None:
                 args.pop(name)
             else:
-                continue
+                args[name] = encoded
 
     def dump(self, **kwargs):
         module_name = kwargs["module_name"]
@@ -204,8 +608,6 @@ class WriterPickle(_writer.Writer):
 
         increment_visit(module_name, function_name)
 
-        self.clean_args(args)
-
         function_id = id(function)
 
         to_write = PytracerPickleTrace(id=function_id,
@@ -216,24 +618,49 @@ class WriterPickle(_writer.Writer):
                                        args=args,
                                        backtrace=backtrace)
 
-        logger.debug((f"id: {function_id}\n"
-                      f"time: {time}\n"
-                      f"module: {module_name}\n"
-                      f"function: {function_name}\n"
-                      f"label: {label}\n"
-                      f"backtrace: {backtrace}\n"), caller=self)
+        logger.debug(("id: %s\ntime: %s\nmodule: %s\nfunction: %s\n"
+                      "label: %s\nbacktrace: %s\n"),
+                     function_id, time, module_name, function_name,
+                     label, backtrace, caller=self)
+
+        if self.sampler.timed:
+            start = perf_counter()
+        if self._queue is None:
+            self._dump_record(to_write)
+        elif not self.is_dumping:
+            self._enqueue(to_write)
+        if self.sampler.timed:
+            self.sampler.charge(module_name, function_name,
+                                perf_counter() - start)
+
+    def _dump_record(self, to_write):
+        module_name = to_write["module"]
+        function_name = to_write["function"]
+
+        if report.report.report_only():
+            # Dry run: size the arguments without serializing them
+            to_write["args"].pop("self", None)
+            report.report.report((module_name, function_name), to_write)
+            return
 
-        try:
-            if not self.is_writable(to_write):
-                to_write['args'] = {}
+        measure = self.metrics.enable
+        if measure:
+            start = perf_counter_ns()
 
+        self.clean_args(to_write["args"])
+
+        if measure:
+            start = self.metrics.lap(module_name, function_name,
+                                     Phase.SERIALIZATION, start)
+            position = self.ostream.tell()
+
+        try:
             if report.report.report_enable():
                 key = (module_name, function_name)
                 value = to_write
                 report.report.report(key, value)
 
-            if not report.report.report_only():
-                self._write(to_write)
+            self._write(to_write)
 
         except Exception as e:
             logger.warning(f"Unable to pickle object for {function_name}",
@@ -242,9 +669,18 @@ class WriterPickle(_writer.Writer):
                 key = (module_name, function_name)
                 value = to_write
                 report.report.report(key, value)
-            if not report.report.report_only():
-                to_write['args'] = {}
+            to_write['args'] = {}
+            try:
                 self._write(to_write)
+            except Exception as e:
+                logger.warning(f"Unable to write record for {function_name}",
+                               caller=self, error=e)
+
+        if measure:
+            self.metrics.lap(module_name, function_name, Phase.WRITE, start)
+            self.metrics.record(module_name, function_name,
+                                self.ostream.tell() - position,
+                                self.get_queue_depth())
 
     def inputs(self, **kwargs):
         self.dump(**kwargs, label="inputs")
@@ -280,15 +716,26 @@ class WriterPickle(_writer.Writer):
 
     def backtrace(self):
         if cfg.io.backtrace:
-            stack = traceback.extract_stack(limit=4)[0]
-            visited_files.add(stack.filename)
-            return stack
+            return self.callsites.capture()
         return None
 
     def write(self, function, module, name, *args, **kwargs):
 
+        # Calls made by the writer to pickle or unpickle the records are
+        # not traced, nor do they take a time from those of the application
+        if self.is_dumping or not self.sampler.sample(module, name):
+            return function(*args, **kwargs)
+
+        measure = self.metrics.enable
+        if measure:
+            start = perf_counter_ns()
+
         bind = binding.Binding(function, *args, **kwargs)
+        if measure:
+            start = self.metrics.lap(module, name, Phase.BINDING, start)
         stack = self.backtrace()
+        if measure:
+            self.metrics.lap(module, name, Phase.BACKTRACE, start)
 
         time = elements()
 
@@ -299,11 +746,17 @@ class WriterPickle(_writer.Writer):
                     args=bind.arguments,
                     backtrace=stack)
 
+        if measure:
+            start = perf_counter_ns()
         try:
             outputs = function(*bind.args, **bind.kwargs)
         except Exception as e:
             self.critical_writing_error(e)
 
+        if measure:
+            self.metrics.lap(module, name, Phase.FUNCTION, start)
+            self.metrics.call(module, name)
+
         _outputs = binding.format_output(outputs)
 
         self.outputs(time=time,
@@ -317,8 +770,20 @@ class WriterPickle(_writer.Writer):
 
     def write_instance(self, instance, function, module, *args, **kwargs):
 
+        if self.is_dumping or not self.sampler.sample(module, function):
+            return getattr(getattr(instance, '__class__'),
+                           function)(instance, *args, **kwargs)
+
+        measure = self.metrics.enable
+        if measure:
+            start = perf_counter_ns()
+
         bind = binding.Binding(function, *args, **kwargs)
+        if measure:
+            start = self.metrics.lap(module, function, Phase.BINDING, start)
         stack = self.backtrace()
+        if measure:
+            self.metrics.lap(module, function, Phase.BACKTRACE, start)
 
         time = elements()
 
@@ -329,12 +794,18 @@ class WriterPickle(_writer.Writer):
                     args=bind.arguments,
                     backtrace=stack)
 
+        if measure:
+            start = perf_counter_ns()
         try:
             outputs = getattr(getattr(instance, '__class__'),
                               function)(instance, *args, **kwargs)
         except Exception as e:
             self.critical_writing_error(e)
 
+        if measure:
+            self.metrics.lap(module, function, Phase.FUNCTION, start)
+            self.metrics.call(module, function)
+
         _outputs = binding.format_output(outputs)
 
         self.outputs(time=time,
@@ -353,8 +824,19 @@ class WriterPickle(_writer.Writer):
         fid, fmodule, fname = info
         function = cache.id_dict[fid]
 
+        if self.is_dumping or not self.sampler.sample(fmodule, fname):
+            return function(*args, **kwargs)
+
+        measure = self.metrics.enable
+        if measure:
+            start = perf_counter_ns()
+
         bind = binding.Binding(function, *args, **kwargs)
+        if measure:
+            start = self.metrics.lap(fmodule, fname, Phase.BINDING, start)
         stack = self.backtrace()
+        if measure:
+            self.metrics.lap(fmodule, fname, Phase.BACKTRACE, start)
 
         time = elements()
 
@@ -365,11 +847,17 @@ class WriterPickle(_writer.Writer):
                     args=bind.arguments,
                     backtrace=stack)
 
+        if measure:
+            start = perf_counter_ns()
         try:
             outputs = function(*bind.args, **bind.kwargs)
         except Exception as e:
             self.critical_writing_error(e)
 
+        if measure:
+            self.metrics.lap(fmodule, fname, Phase.FUNCTION, start)
+            self.metrics.call(fmodule, fname)
+
         _outputs = format_output(outputs)
 
         self.outputs(time=time,
@@ -0,0 +1,38 @@
+import pytracer.core.inout as ptinout
+import pytracer.core.inout.stream as stream
+import pytracer.core.inout.writer._pickle as _pickle
+from pytracer.utils.log import get_logger
+
+logger = get_logger()
+
+
+class WriterStream(_pickle.WriterPickle):
+    """
+    Pickle writer sending its records to the aggregator of a campaign
+    instead of writing a trace. The stream starts with the sample index
+    and the trace name and ends with the end of stream marker.
+    """
+
+    def __init__(self, address, sample):
+        self.address = address
+        self.sample = sample
+        super().__init__()
+
+    def _init_streams(self):
+        self.memo_size_max = 0
+        self._memo_records = 0
+        self._memo_position = 0
+        # The aggregator has no blob store, arrays are sent inline
+        self.parameters.dedup_enable = False
+        self._init_dedup()
+        try:
+            self.ostream = stream.connect(self.address)
+        except OSError as e:
+            logger.error(f"Cannot connect to the aggregator {self.address}",
+                         error=e, caller=self)
+        self._init_pickler()
+        self._dump((self.sample, self.filename_path))
+
+    def _close_streams(self):
+        self._dump(ptinout.end_of_stream_marker)
+        super()._close_streams()
@@ -17,6 +17,10 @@ class Writer(metaclass=Singleton):
     def get_filename_path(self):
         pass
 
+    @abstractmethod
+    def flush(self):
+        pass
+
     @abstractmethod
     def write(self, **kwargs):
         pass
@@ -0,0 +1,191 @@
+import collections
+
+import numpy as np
+import scipy.sparse as spr
+import xxhash
+
+from pytracer.core.stats.numpy import Method, StatisticNumpy, get_method
+from pytracer.core.stats.stats import get_stats
+from pytracer.utils.memory import Sizer
+
+# Bytes of the statistics of the last argument sets merged
+cache_bytes = 64 * 2**20
+
+
+# Bytes of the value of x87 extended precision floats, stored in 12 or 16
+_extended_bytes = 10
+
+
+def get_value_bytes(array):
+    """
+    Bytes of the values of a numeric array, one row per element,
+    without the uninitialized padding of extended precision floats
+    """
+    array = np.ascontiguousarray(array)
+    dtype = array.dtype
+    if dtype.kind not in "fc" or np.finfo(dtype).nmant != 63:
+        return array.reshape(-1).view(np.uint8).reshape(array.size, -1)
+    parts = 2 if dtype.kind == "c" else 1
+    return array.reshape(-1).view(np.uint8).reshape(
+        array.size, parts, dtype.itemsize // parts)[..., :_extended_bytes]
+
+
+def get_digest(value):
+    """
+    Digest of the buffer of a numeric sample,
+    None when the sample has no buffer to hash
+    """
+    # Python booleans are not numbers for get_stats
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        # repr round-trips the bits of floats, -0.0 included
+        return xxhash.xxh3_64_intdigest(repr(value).encode())
+    if isinstance(value, (np.number, np.bool_)):
+        return xxhash.xxh3_64_intdigest(
+            np.ascontiguousarray(get_value_bytes(value)))
+    if spr.issparse(value):
+        if not StatisticNumpy.hasinstance(value):
+            return None
+        csr = value.tocsr()
+        digest = xxhash.xxh3_64()
+        for buffer in (csr.data, csr.indices, csr.indptr):
+            digest.update(np.ascontiguousarray(buffer))
+        return digest.intdigest()
+    if isinstance(value, np.ndarray) and \
+            not isinstance(value, np.ma.MaskedArray) and \
+            StatisticNumpy.hasinstance(value):
+        return xxhash.xxh3_64_intdigest(
+            np.ascontiguousarray(get_value_bytes(value)))
+    return None
+
+
+def _get_dtype(value):
+    if hasattr(value, "dtype"):
+        return value.dtype
+    return np.asarray(value).dtype
+
+
+def get_key(digests, value):
+    return (tuple(digests), _get_dtype(value).str, np.shape(value),
+            spr.issparse(value), get_method())
+
+
+def constant_stats(value):
+    """
+    Mean, std and significant digits of identical samples
+    """
+    dtype = _get_dtype(value)
+    max_sig = StatisticNumpy.max_sig(dtype)
+    if np.iscomplexobj(value):
+        accumulator_type = np.complex128
+        max_sig = max_sig + 1j * max_sig
+    else:
+        accumulator_type = np.float64
+    if spr.issparse(value):
+        mean = value.tocsr().astype(accumulator_type)
+        sig = mean.copy()
+        sig.data = np.full(sig.data.shape, max_sig)
+        return mean, mean * 0, sig
+    mean = np.asarray(value, dtype=accumulator_type)
+    return mean, np.zeros_like(mean), np.full(mean.shape, max_sig)
+
+
+class StatisticsCache:
+    """
+    Least recently used statistics keyed by the digests of the samples,
+    an argument passed unchanged from a function to the next
+    having the same samples. The cache holds at most maxbytes bytes
+    of statistics, larger ones are not cached.
+    """
+
+    def __init__(self, maxbytes):
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._sizer = Sizer()
+
+    def get(self, key):
+        try:
+            stats = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return stats[0]
+
+    def put(self, key, stats):
+        nbytes = self._sizer.sizeof(stats)
+        if nbytes > self.maxbytes:
+            return
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key)[1]
+        self.entries[key] = (stats, nbytes)
+        self.nbytes += nbytes
+        while self.nbytes > self.maxbytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.nbytes -= evicted
+
+
+cache = StatisticsCache(cache_bytes)
+
+
+class StatisticDigest(StatisticNumpy):
+    """
+    Statistics of samples known by their digests
+    """
+
+    def __init__(self, values, stats):
+        self.i = StatisticNumpy.i
+        StatisticNumpy.i += 1
+
+        value = values[0]
+        self._data = [value]
+        self._values = values if get_method() == Method.General else None
+        self._samples = len(values)
+        if spr.issparse(value):
+            self._size = 1
+            self._shape = ()
+            self._type = value.dtype
+        else:
+            array = np.asarray(value)
+            self._size = array.size
+            self._shape = array.shape
+            self._type = array.dtype
+        self._ndim = len(self._shape)
+        self.cached_mean, self.cached_std, self.cached_sig = stats
+
+    def get_samples(self):
+        if self._values is None:
+            return None
+        return np.asarray(self._values)
+
+    def dtype(self):
+        return self._type
+
+
+def get_stats_memoized(values):
+    """
+    get_stats of values, in closed form when the samples are identical
+    and from the cache when they were merged recently
+    """
+    digests = [get_digest(value) for value in values]
+    if None in digests or \
+            len(set(map(type, values))) != 1 or \
+            len(set(map(np.shape, values))) != 1:
+        return get_stats(values)
+    if len(set(digests)) == 1 and len(values) > 1:
+        return StatisticDigest(values, constant_stats(values[0]))
+    key = get_key(digests, values[0])
+    stats = cache.get(key)
+    if stats is None:
+        statistic = get_stats(values)
+        if not isinstance(statistic, StatisticNumpy):
+            return statistic
+        stats = (statistic.mean(), statistic.std(), statistic.sig())
+        cache.put(key, stats)
+        return statistic
+    return StatisticDigest(values, stats)
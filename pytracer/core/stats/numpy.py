@@ -14,6 +14,19 @@ method_str_to_enum = {
 }
 
 
+def get_method():
+    # The aggregator of pytracer trace has no --method argument
+    return method_str_to_enum[module_args.get('method', 'cnh')]
+
+
+def get_tile_size():
+    return module_args.get('tile_size') or tile_size_default
+
+
+# Elements of a sample read at once by tiled statistics
+tile_size_default = 1 << 18
+
+
 class StatisticNumpy:
 
     i = 0
@@ -81,6 +94,13 @@ class StatisticNumpy:
             self.cached_std = np.nan
             self.cached_sig = np.nan
 
+    @classmethod
+    def max_sig(cls, dtype):
+        """
+        Significant bits of dtype, those of identical samples
+        """
+        return cls.__max_sig.get(dtype, cls.__max_sig[float])
+
     def _issparse(self, values):
         return spr.issparse(values[0])
 
@@ -100,10 +120,29 @@ class StatisticNumpy:
             return values
 
     def __getstate__(self):
-        to_return = {"mean": self.cached_mean,
-                     "std": self.cached_std,
-                     "sig": self.cached_sig}
-        return to_return
+        # Statistics merged by the parse workers are sent back pickled:
+        # they are computed beforehand and only the first sample is kept
+        state = dict(self.__dict__,
+                     cached_mean=self.mean(),
+                     cached_std=self.std(),
+                     cached_sig=self.sig())
+        if self.get_samples() is None:
+            first = self._data[:1]
+            # Objects such as modules may not pickle, the export only
+            # keeps their string
+            if np.dtype(self.dtype()) == np.object_ and len(first) and \
+                    not self._issparse(first):
+                first = self._to_str(first)
+            state["_data"] = first
+        return state
+
+    @staticmethod
+    def _to_str(values):
+        if isinstance(values, np.ndarray):
+            strings = np.empty_like(values)
+            strings.flat[:] = [str(value) for value in values.flat]
+            return strings
+        return [str(value) for value in values]
 
     def __setstate__(self, d):
         self.__dict__.update(d)
@@ -126,6 +165,26 @@ class StatisticNumpy:
     def values(self):
         return self._data
 
+    def count(self):
+        return self._samples
+
+    def get_samples(self):
+        """
+        Samples kept for the general method, None when they are not
+        """
+        if get_method() == Method.General and \
+                isinstance(self._data, np.ndarray) and \
+                np.issubdtype(self._data.dtype, np.number) and \
+                len(self._data) == self._samples:
+            return self._data
+        return None
+
+    def tiles(self):
+        """
+        Slices of the flattened elements to read the statistics by
+        """
+        yield slice(None)
+
     def _mean_sparse(self):
         try:
             return np.sum(self._data, axis=0)/self._samples
@@ -192,7 +251,7 @@ class StatisticNumpy:
 
     def _sig_part(self, mean, std):
         # if not spr.issparse(mean):
-        method = method_str_to_enum[module_args['method']]
+        method = get_method()
         sig = significant_digits(self._data, reference=mean, method=method)
         # else:
         #     sig = mean.copy()
@@ -1,7 +1,7 @@
 from enum import IntEnum, auto
 from types import FunctionType
 
-from pytracer.utils.log import get_logger
+from pytracer.utils.log import Level, get_logger
 
 logger = get_logger()
 
@@ -123,7 +123,7 @@ def get_stats(values):
             array = np.array(values)
             _stats = StatisticNumpy(array)
         except Exception:
-            logger.debug(f"Cannot parse {values}")
+            logger.debug("Cannot parse %s", values)
             _stats = StatisticNumpy(values, empty=True)
     elif _type == TypeValue.STRING:
         _stats = StatisticNumpy(values, empty=True, dtype=type(values[0]))
@@ -148,11 +148,13 @@ def tohex(value):
 def print_stats(arg, stat):
     from pytracer.core.stats.numpy import StatisticNumpy
     types = (StatisticNumpy,)
-    logger.debug(f"\tArg {arg}")
+    if not logger.is_enabled(Level.DEBUG):
+        return
+    logger.debug("\tArg %s", arg)
     if isinstance(stat, types):
-        logger.debug(f"\tNumber of elements: {stat.size()}")
-        logger.debug(f"\t\tmean: {stat.mean()}")
-        logger.debug(f"\t\t std: {stat.std()}")
-        logger.debug(f"\t\t sig: {stat.significant_digits()}")
+        logger.debug("\tNumber of elements: %s", stat.size())
+        logger.debug("\t\tmean: %s", stat.mean())
+        logger.debug("\t\t std: %s", stat.std())
+        logger.debug("\t\t sig: %s", stat.significant_digits())
     else:
-        logger.debug(f"\t\tNo stats provided for {stat}")
+        logger.debug("\t\tNo stats provided for %s", stat)
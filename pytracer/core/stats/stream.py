@@ -0,0 +1,515 @@
+import functools
+import tempfile
+
+import numpy as np
+import scipy.sparse as spr
+import scipy.stats
+
+import pytracer.core.stats.digest as digest
+from pytracer.core.stats.numpy import (Method, StatisticNumpy, get_method,
+                                       get_tile_size, significant_digits)
+from pytracer.utils.log import get_logger
+
+logger = get_logger()
+
+# Defaults of significant_digits
+_probability = 0.95
+_confidence = 0.95
+
+# Bytes of samples evaluated at once by the general method
+_chunk_bytes = 1 << 26
+
+
+@functools.lru_cache(maxsize=None)
+def cnh_correction(samples):
+    """
+    Bits lost by the CNH estimator to the probability and the
+    confidence of the significant digits for a number of samples
+    """
+    if samples < 2:
+        return np.nan
+    # Lower bound of the two-sided interval, as significant_digits does
+    chi2 = scipy.stats.chi2.interval(_confidence, samples - 1)[0]
+    return 0.5 * np.log2((samples - 1) / chi2) + \
+        np.log2(scipy.stats.norm.ppf((_probability + 1) / 2))
+
+
+def sig_cnh(mean, std, samples):
+    """
+    CNH significant digits of the relative error, by part for complex values
+    """
+    if np.iscomplexobj(mean) or np.iscomplexobj(std):
+        return sig_cnh(mean.real, std.real, samples) + \
+            1j * sig_cnh(mean.imag, std.imag, samples)
+    return -np.log2(std / np.abs(mean)) - cnh_correction(samples)
+
+
+def get_sig(samples, mean, method):
+    """
+    significant_digits of samples, by part for complex values
+    """
+    if np.iscomplexobj(samples):
+        return get_sig(samples.real, mean.real, method) + \
+            1j * get_sig(samples.imag, mean.imag, method)
+    return significant_digits(samples, reference=mean, method=method)
+
+
+def sig_general(samples, mean):
+    """
+    General significant digits of samples computed by chunks of elements
+    """
+    shape = np.shape(mean)
+    samples = samples.reshape(len(samples), -1)
+    mean = np.reshape(mean, -1)
+    sig = np.empty(mean.shape, dtype=np.result_type(mean, np.float64))
+    step = max(1, _chunk_bytes // (samples.itemsize * len(samples)))
+    for start in range(0, mean.size, step):
+        chunk = slice(start, start + step)
+        sig[chunk] = get_sig(samples[:, chunk], mean[chunk], Method.General)
+    return sig.reshape(shape)
+
+
+def get_std(m2, samples):
+    if np.iscomplexobj(m2):
+        return np.sqrt(m2.real / samples) + 1j * np.sqrt(m2.imag / samples)
+    return np.sqrt(m2 / samples)
+
+
+def get_m2(std, samples):
+    """
+    Sum of the squared deviations to the mean, by part for complex values
+    """
+    if np.iscomplexobj(std):
+        return samples * (np.square(std.real) + 1j * np.square(std.imag))
+    return samples * np.square(std, dtype=np.float64)
+
+
+def merge_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    """
+    Count, mean and M2 of two sets of samples (Chan et al.)
+    """
+    count = count_a + count_b
+    # Equal means, infinite ones included, do not move
+    with np.errstate(invalid="ignore"):
+        delta = np.where(mean_a == mean_b, 0, mean_b - mean_a)
+    mean = mean_a + delta * (count_b / count)
+    if np.iscomplexobj(delta):
+        correction = np.square(delta.real) + 1j * np.square(delta.imag)
+    else:
+        correction = np.square(delta)
+    m2 = m2_a + m2_b + correction * (count_a * count_b / count)
+    return count, mean, m2
+
+
+def constant_sig(sig, std, dtype):
+    """
+    Samples without deviation have all the significant bits of their dtype
+    """
+    if np.iscomplexobj(std):
+        return constant_sig(np.real(sig), std.real, dtype) + \
+            1j * constant_sig(np.imag(sig), std.imag, dtype)
+    return np.where(std == 0, StatisticNumpy.max_sig(dtype), sig)
+
+
+def sig_moments(mean, std, samples, dtype, values=None):
+    """
+    Significant digits of merged statistics, from the values of the
+    samples for the general method. Parse and --append share it so that
+    elements without deviation have the significant bits of their dtype
+    in both, as identical samples do.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if values is None:
+            sig = sig_cnh(mean, std, samples)
+        else:
+            sig = sig_general(values, mean)
+    return constant_sig(sig, std, dtype)
+
+
+def _memmap(shape, dtype):
+    # The file is removed once the array is released
+    return np.memmap(tempfile.TemporaryFile(), dtype=dtype, mode="w+",
+                     shape=shape)
+
+
+def _product(x, y):
+    if spr.issparse(x):
+        return x.multiply(y)
+    return x * y
+
+
+def is_streamable(value, method):
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    if spr.issparse(value):
+        return method == Method.CNH and StatisticNumpy.hasinstance(value)
+    return isinstance(value, np.ndarray) and \
+        not isinstance(value, np.ma.MaskedArray) and \
+        StatisticNumpy.hasinstance(value)
+
+
+class StatisticStream(StatisticNumpy):
+    """
+    Statistics of a numeric argument folded one sample at a time in
+    Welford's running mean and M2, so that the samples are not held
+    together. The general method keeps the samples and evaluates the
+    significant digits by chunks of elements.
+    Arrays larger than the tile size are spilled to a temporary stack
+    on disk and their statistics computed by tiles of their elements.
+    Samples identical to the first one are only counted until a
+    different one comes, the statistics of identical samples having
+    a closed form.
+    """
+
+    def __init__(self, value, samples, method):
+        self.i = StatisticNumpy.i
+        StatisticNumpy.i += 1
+
+        self._method = method
+        self._kind = type(value)
+        self._sparse = spr.issparse(value)
+        if not self._sparse:
+            value = np.asarray(value)
+        self._data = [value]
+        self._samples = 0
+        self._size = value.size if not self._sparse else 1
+        self._type = value.dtype
+        self._complex = np.iscomplexobj(value)
+        self._empty = False
+        # Sparse statistics are exported as arrays of their shape
+        self._value_shape = value.shape
+        self._shape = value.shape
+        self._ndim = len(self._shape)
+        self._accumulator_type = np.complex128 if self._complex \
+            else np.float64
+        self._running_mean = None
+        self._m2 = None
+        self._digests = []
+        self._identical = 0
+        self._stack = None
+        self._tile_size = get_tile_size()
+        self._tiled = not self._sparse and value.size > self._tile_size
+        if self._tiled:
+            self._stack = _memmap((samples, *self._value_shape),
+                                  value.dtype)
+        elif method == Method.General:
+            self._stack = np.empty((samples, *self._value_shape),
+                                   dtype=value.dtype)
+
+    def _cast(self, value):
+        if self._sparse:
+            return value.tocsr().astype(self._accumulator_type)
+        return np.asarray(value, dtype=self._accumulator_type)
+
+    def _m2_delta(self, delta, delta_updated):
+        if self._complex:
+            return _product(delta.real, delta_updated.real) + \
+                1j * _product(delta.imag, delta_updated.imag)
+        return _product(delta, delta_updated)
+
+    def push(self, value):
+        if self._empty:
+            return
+        if type(value) is not self._kind:
+            logger.error(f'Parsed values do not have the same type: '
+                         f'{self._kind} {type(value)}')
+        if np.shape(value) != self._value_shape:
+            logger.debug("Cannot parse samples of shapes %s and %s",
+                         self._value_shape, np.shape(value))
+            self._set_empty()
+            return
+
+        value_digest = digest.get_digest(value)
+        self._digests.append(value_digest)
+        if self._identical == self._samples and \
+                value_digest == self._digests[0]:
+            self._identical += 1
+            self._samples += 1
+            return
+        if self._identical:
+            self._fold_identical()
+
+        if self._stack is not None:
+            self._stack[self._samples] = value
+        self._samples += 1
+        if self._tiled:
+            return
+        x = self._cast(value)
+        delta = x - self._running_mean
+        self._running_mean = self._running_mean + delta / self._samples
+        self._m2 = self._m2 + self._m2_delta(delta, x - self._running_mean)
+
+    def _fold_identical(self):
+        """
+        Fold the identical samples counted so far
+        """
+        value = self._data[0]
+        if self._stack is not None:
+            self._stack[:self._identical] = value
+        if not self._tiled:
+            self._running_mean = self._cast(value)
+            self._m2 = self._running_mean * 0
+        self._identical = 0
+
+    def _set_empty(self):
+        self._empty = True
+        self._running_mean = self._m2 = self._stack = None
+        self._size = 1
+        self._ndim = 0
+        self._shape = ()
+        self._type = np.dtype('object')
+        self.cached_mean = np.nan
+        self.cached_std = np.nan
+        self.cached_sig = np.nan
+
+    def _running_std(self):
+        if self._sparse:
+            if self._complex:
+                return (self._m2.real / self._samples).sqrt() + \
+                    1j * (self._m2.imag / self._samples).sqrt()
+            return (self._m2 / self._samples).sqrt()
+        return get_std(self._m2, self._samples)
+
+    def _sig_sparse(self, mean, std):
+        # Relative errors are only defined where the mean is not zero
+        mean = mean.tocsr()
+        rows, cols = mean.nonzero()
+        _mean = np.asarray(mean[rows, cols]).ravel()
+        _std = np.asarray(std.tocsr()[rows, cols]).ravel()
+        _sig = sig_cnh(_mean, _std, self._samples)
+        return spr.csr_matrix((_sig, (rows, cols)), shape=mean.shape)
+
+    def tiles(self):
+        """
+        Slices of the flattened elements to read the statistics by
+        """
+        if not self._tiled:
+            yield slice(None)
+            return
+        for start in range(0, self._size, self._tile_size):
+            yield slice(start, start + self._tile_size)
+
+    def _get_tiled_stats(self):
+        """
+        Statistics written by tiles into arrays on disk, reading
+        tile size elements of each sample at a time
+        """
+        stack = self._stack[:self._samples].reshape(self._samples, -1)
+        stats = [_memmap(self._shape, self._accumulator_type)
+                 for _ in range(3)]
+        mean, std, sig = [stat.reshape(-1) for stat in stats]
+        for elements in self.tiles():
+            tile = np.asarray(stack[:, elements])
+            if self._complex:
+                mean[elements] = self._mean(tile.real) + \
+                    1j * self._mean(tile.imag)
+                std[elements] = self._std(tile.real) + \
+                    1j * self._std(tile.imag)
+            else:
+                mean[elements] = self._mean(tile)
+                std[elements] = self._std(tile)
+            sig[elements] = sig_moments(
+                mean[elements], std[elements], self._samples, self._type,
+                tile if self._method == Method.General else None)
+        return stats
+
+    def _get_tiled_constant_stats(self):
+        value = self._data[0]
+        constant = digest.constant_stats(value.flat[:1])
+        stats = [_memmap(self._shape, self._accumulator_type)
+                 for _ in constant]
+        mean, std, sig = [stat.reshape(-1) for stat in stats]
+        for elements in self.tiles():
+            mean[elements] = value.flat[elements]
+            std[elements] = constant[1][0]
+            sig[elements] = constant[2][0]
+        return stats
+
+    def _get_stats(self):
+        mean = self._running_mean
+        std = self._running_std()
+        if self._sparse:
+            sig = self._sig_sparse(mean, std)
+        else:
+            sig = sig_moments(mean, std, self._samples, self._type,
+                              self._stack[:self._samples]
+                              if self._method == Method.General else None)
+        return mean, std, sig
+
+    def get_stats(self):
+        """
+        Compute the statistics and release the accumulators
+        """
+        if self._empty or self._samples == 0:
+            if not self._empty:
+                self._set_empty()
+            return self
+        if self._identical and self._samples > 1:
+            if self._tiled:
+                stats = self._get_tiled_constant_stats()
+            else:
+                stats = digest.constant_stats(self._data[0])
+        elif self._tiled:
+            if self._identical:
+                self._fold_identical()
+            stats = self._get_tiled_stats()
+        else:
+            if self._identical:
+                self._fold_identical()
+            key = digest.get_key(self._digests, self._data[0])
+            stats = digest.cache.get(key)
+            if stats is None:
+                stats = self._get_stats()
+                digest.cache.put(key, stats)
+        if self._method == Method.General:
+            self._kept = self._get_samples()
+        self.cached_mean, self.cached_std, self.cached_sig = stats
+        self._running_mean = self._m2 = self._stack = None
+        return self
+
+    def _get_samples(self):
+        if self._identical:
+            return np.broadcast_to(self._data[0],
+                                   (self._samples, *self._value_shape))
+        return self._stack[:self._samples]
+
+    def get_samples(self):
+        return getattr(self, "_kept", None)
+
+    def dtype(self):
+        return self._type
+
+
+class StatisticValues:
+    """
+    Samples of an argument that cannot be streamed, merged all together
+    by get_stats, in closed form or from the cache when they have digests
+    """
+
+    def __init__(self):
+        self._values = []
+
+    def push(self, value):
+        self._values.append(value)
+
+    def get_stats(self):
+        return digest.get_stats_memoized(self._values)
+
+
+def is_scalar(value):
+    """
+    Numbers batched by ScalarBatch, numpy booleans included as for
+    arrays, Python booleans being no numbers for get_stats
+    """
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, (int, float, np.bool_)) or \
+        (isinstance(value, np.number) and value.dtype.kind in "iuf")
+
+
+class StatisticScalar(StatisticNumpy):
+    """
+    Statistics of a scalar argument, computed with
+    the other scalars of its batch
+    """
+
+    def __init__(self, value, batch):
+        self.i = StatisticNumpy.i
+        StatisticNumpy.i += 1
+
+        self._batch = batch
+        self._kind = type(value)
+        self._data = [value]
+        self._values = []
+        self._samples = 0
+        self._size = 1
+        self._ndim = 0
+        self._shape = ()
+        self._type = np.asarray(value).dtype
+
+    def push(self, value):
+        if type(value) is not self._kind:
+            logger.error(f'Parsed values do not have the same type: '
+                         f'{self._kind} {type(value)}')
+        self._values.append(value)
+        self._samples += 1
+
+    def get_stats(self):
+        self._batch.append(self)
+        return self
+
+    def get_samples(self):
+        if self._values is None:
+            return None
+        return np.asarray(self._values)
+
+    def dtype(self):
+        return self._type
+
+
+class ScalarBatch:
+    """
+    Scalar arguments of a batch of records, whose statistics are
+    computed by one vectorized call per dtype on a samples x scalars
+    matrix
+    """
+
+    def __init__(self):
+        self._scalars = []
+
+    def append(self, scalar):
+        self._scalars.append(scalar)
+
+    def compute(self):
+        """
+        Compute the statistics of the scalars appended since the last call
+        """
+        if not self._scalars:
+            return
+        method = get_method()
+        groups = dict()
+        for scalar in self._scalars:
+            key = (scalar._type, scalar._samples)
+            groups.setdefault(key, []).append(scalar)
+        self._scalars = []
+        for (dtype, _), scalars in groups.items():
+            matrix = np.array([scalar._values for scalar in scalars],
+                              dtype=dtype).T
+            mean = np.mean(matrix, axis=0, dtype=np.float64)
+            std = np.std(matrix, axis=0, dtype=np.float64)
+            # Scalars whose samples are bitwise identical have all their bits
+            bits = digest.get_value_bytes(matrix).reshape(
+                *matrix.shape, -1)
+            identical = np.all(bits == bits[0], axis=(0, 2)) & \
+                (len(matrix) > 1)
+            mean[identical] = matrix[0, identical]
+            std[identical] = 0
+            sig = np.full(mean.shape, StatisticNumpy.max_sig(np.dtype(dtype)),
+                          dtype=np.float64)
+            different = ~identical
+            if different.any():
+                sig[different] = significant_digits(
+                    matrix[:, different], reference=mean[different],
+                    method=method)
+            for k, scalar in enumerate(scalars):
+                scalar.cached_mean = mean[k]
+                scalar.cached_std = std[k]
+                scalar.cached_sig = sig[k]
+                scalar._batch = None
+                if method != Method.General:
+                    scalar._values = None
+
+
+def get_accumulator(value, samples, scalars=None):
+    """
+    Accumulator of the samples of an argument, value being the first one.
+    Scalars are computed by the scalars batch when one is given.
+    """
+    if scalars is not None and is_scalar(value):
+        return StatisticScalar(value, scalars)
+    method = get_method()
+    if is_streamable(value, method):
+        return StatisticStream(value, samples, method)
+    return StatisticValues()
@@ -4,13 +4,86 @@ import sys
 
 from pytracer.core.config import DictAtKeyError
 from pytracer.core.config import config as cfg
+from pytracer.core.wrapper.plan import InstrumentationPlan
 from pytracer.utils.log import get_logger
 from pytracer.utils.singleton import Singleton
 
 logger = get_logger()
 
 
+_special_chars = re.compile(r"[.^$*+?{}\[\]\\|()]")
+# Quantifiers that allow no occurrence of the character before them
+_quantifiers = ("?", "*", "{")
+
+
+def translate(pattern):
+    return pattern.replace("*", Filter._wildcard)
+
+
+def get_literal_prefix(pattern):
+    """
+    Literal part of the regex pattern that the strings it matches start
+    with: the part before its first special character, but its last
+    character when a quantifier follows, and nothing for alternations
+    """
+    if "|" in pattern:
+        return ""
+    if (match := _special_chars.search(pattern)) is None:
+        return pattern
+    prefix = pattern[:match.start()]
+    if match.group() in _quantifiers:
+        return prefix[:-1]
+    return prefix
+
+
+class ModuleTrie:
+    """
+    Prefix trie of the module patterns: literal names are looked up
+    directly, the other patterns are only matched when their literal
+    prefix is a prefix of the module name
+    """
+
+    _patterns = None
+
+    def __init__(self):
+        self.literals = {}
+        self.root = {}
+
+    def add(self, pattern, group):
+        regex = translate(pattern)
+        prefix = get_literal_prefix(regex)
+        if prefix == regex:
+            self.literals.setdefault(pattern, []).append(group)
+            return
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(self._patterns, []).append((re.compile(regex), group))
+
+    def match(self, module):
+        """
+        Groups of the patterns matching module
+        """
+        groups = list(self.literals.get(module, ()))
+        node = self.root
+        for char in module:
+            for regex, group in node.get(self._patterns, ()):
+                if regex.fullmatch(module):
+                    groups.append(group)
+            if (node := node.get(char)) is None:
+                return groups
+        for regex, group in node.get(self._patterns, ()):
+            if regex.fullmatch(module):
+                groups.append(group)
+        return groups
+
+
 class Filter:
+    """
+    Rules (module pattern, function pattern) compiled on first use into
+    a module trie and one alternation regex of the function patterns per
+    module. Lookups are memoized per (module, function).
+    """
 
     _wildcard = ".*"
     _rewildcard = re.compile(".*")
@@ -19,6 +92,7 @@ class Filter:
 
     def __init__(self, filenames):
         self.__modules = {}
+        self._reset()
         for filename in filenames:
             self.load_file(filename)
 
@@ -28,17 +102,23 @@ class Filter:
 
     def load_file(self, filename):
         if filename:
-            logger.debug(f"read file: {filename}", caller=self)
+            logger.debug("read file: %s", filename, caller=self)
             self.fi = open(filename)
             self.read_file()
 
+    def _reset(self):
+        self._trie = None
+        self._any_function = None
+        self._module_matchers = {}
+        self._modules_cache = {}
+        self._functions_cache = {}
+
     def _add(self, module, function):
-        module_re = re.compile(module.replace("*", self._wildcard))
-        function_re = re.compile(function.replace("*", self._wildcard))
-        if module_re in self.__modules:
-            self.__modules[module_re].add(function_re)
+        if module in self.__modules:
+            self.__modules[module].add(function)
         else:
-            self.__modules[module_re] = set([function_re])
+            self.__modules[module] = set([function])
+        self._reset()
 
     def read_file(self):
         for i, line in enumerate(self.fi, start=1):
@@ -55,15 +135,48 @@ class Filter:
             if function[0].isupper():
                 self._add(module, f"{function}.*")
 
+    def _compile(self):
+        self._trie = ModuleTrie()
+        for module in self.__modules:
+            self._trie.add(module, module)
+        functions = set().union(*self.__modules.values())
+        self._any_function = self._compile_functions(functions)
+
+    def _compile_functions(self, functions):
+        if not functions:
+            return None
+        return re.compile("|".join(f"(?:{translate(function)})"
+                                   for function in sorted(functions)))
+
+    def _get_module_matcher(self, module):
+        """
+        Alternation regex of the function patterns of the modules
+        matching module, None if no module matches
+        """
+        try:
+            return self._module_matchers[module]
+        except KeyError:
+            pass
+        if self._trie is None:
+            self._compile()
+        groups = self._trie.match(module)
+        functions = set().union(*(self.__modules[group] for group in groups))
+        matcher = self._compile_functions(functions)
+        self._module_matchers[module] = matcher
+        return matcher
+
     def has_module(self, module):
         if not module:
             return False
         if not bool(self.__modules):
             return False
-        for _module in self.__modules:
-            if _module.fullmatch(module):
-                return True
-        return False
+        try:
+            return self._modules_cache[module]
+        except KeyError:
+            pass
+        found = self._get_module_matcher(module) is not None
+        self._modules_cache[module] = found
+        return found
 
     def has_function(self, functions, module=None):
         if isinstance(functions, tuple):
@@ -83,25 +196,26 @@ class Filter:
             return False
         if not bool(self.__modules):
             return False
+        key = (module, function)
+        try:
+            return self._functions_cache[key]
+        except KeyError:
+            pass
         # We search function in module
         if module:
-            for mod in self.__modules:
-                if mod.fullmatch(module):
-                    functions = self.__modules[mod]
-                    for _function in functions:
-                        if _function.fullmatch(function):
-                            return True
-            return False
-
+            matcher = self._get_module_matcher(module)
         # We search function across all modules
-        for function_set in self.__modules.values():
-            for _function in function_set:
-                if _function.fullmatch(function):
-                    return True
-        return False
+        else:
+            if self._trie is None:
+                self._compile()
+            matcher = self._any_function
+        found = matcher is not None and \
+            matcher.fullmatch(function) is not None
+        self._functions_cache[key] = found
+        return found
 
     def has_entire_module(self, module):
-        self.debug(f"has entier module {module}", caller=self)
+        self.debug("has entier module %s", module, caller=self)
         return self.has_function(self._wildcard, module)
 
 
@@ -150,7 +264,9 @@ class FilterExclusion(Filter, metaclass=Singleton):
             minor = version.minor
             root = sys.base_prefix
             python_modules_path = f"{root}/lib/python{major}.{minor}"
-            python_modules = os.listdir(python_modules_path)
+            python_modules = InstrumentationPlan().lookup(
+                "stdlib", python_modules_path,
+                lambda: os.listdir(python_modules_path))
             for python_module in python_modules:
                 if python_module.endswith(".py"):
                     python_module, _ = os.path.splitext(python_module)
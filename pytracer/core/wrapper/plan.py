@@ -0,0 +1,163 @@
+import importlib.machinery
+import importlib.metadata
+import os
+import pickle
+import sys
+import tempfile
+
+import xxhash
+
+import pytracer.core.inout._init as _init
+from pytracer.core.config import config as cfg
+from pytracer.core.config import constant
+from pytracer.utils.log import get_logger
+from pytracer.utils.singleton import Singleton
+
+logger = get_logger()
+
+# The plan of a run depends on the code of the instrumentation
+_instrumentation_files = ("wrapper.py", "filter.py", "plan.py")
+
+
+def _as_list(filenames):
+    if not filenames:
+        return []
+    if isinstance(filenames, str):
+        return [filenames]
+    return list(filenames)
+
+
+def _get_version(module):
+    try:
+        return importlib.metadata.version(module)
+    except (importlib.metadata.PackageNotFoundError, ValueError):
+        return None
+
+
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+def _get_module_stamp(module):
+    # PathFinder does not go through the pytracer importer
+    spec = importlib.machinery.PathFinder.find_spec(module)
+    if spec is None:
+        return (module, None, None, None)
+    origin = spec.origin
+    directory = os.path.dirname(origin) if origin else None
+    return (module, _get_version(module),
+            _get_mtime(origin), _get_mtime(directory))
+
+
+def _get_file_digest(filename):
+    try:
+        with open(filename, "rb") as istream:
+            return xxhash.xxh3_64_hexdigest(istream.read())
+    except OSError:
+        return None
+
+
+def get_key():
+    """
+    Digest of everything the instrumentation decisions depend on:
+    python and library versions, module files mtimes and filter files
+    """
+    modules = sorted(module.strip() for module in cfg.modules_to_load)
+    filters = _as_list(cfg.include_file) + _as_list(cfg.exclude_file)
+    directory = os.path.dirname(__file__)
+    key = (sys.version,
+           [_get_module_stamp(module) for module in modules],
+           sorted(module.strip() for module in cfg.modules_to_exclude or []),
+           [(filename, _get_file_digest(filename)) for filename in filters],
+           cfg.python_modules_path or None,
+           [_get_mtime(os.path.join(directory, filename))
+            for filename in _instrumentation_files])
+    return xxhash.xxh3_64_hexdigest(repr(key).encode())
+
+
+class InstrumentationPlan(metaclass=Singleton):
+    """
+    Classification and wrapping decisions taken for the symbols of the
+    traced modules. The plan is saved in the cache at the end of the run
+    and replayed by the next runs with the same key.
+    """
+
+    tables = ("names", "excluded", "class_excluded",
+              "static", "cython", "stdlib")
+
+    def __init__(self):
+        self.enable = bool(cfg.wrapper.plan)
+        self.hits = 0
+        self.misses = 0
+        self.modified = False
+        self.entries = {table: dict() for table in self.tables}
+        if self.enable:
+            self.path = self.get_path()
+            self.load()
+
+    def get_path(self):
+        parameters = _init.IOInitializer()
+        filename = f"{constant.plan.filename}.{get_key()}{constant.plan.ext}"
+        return os.path.join(parameters.cache_plans_path, filename)
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            logger.debug(f"No instrumentation plan {self.path}", caller=self)
+            return
+        try:
+            with open(self.path, "rb") as istream:
+                entries = pickle.load(istream)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.warning(f"Cannot read instrumentation plan {self.path}",
+                           caller=self, error=e)
+            return
+        for table in self.tables:
+            self.entries[table].update(entries.get(table, {}))
+        logger.info(f"Replay instrumentation plan {self.path}", caller=self)
+
+    def save(self):
+        if not self.enable or not self.modified:
+            return
+        directory = os.path.dirname(self.path)
+        # Concurrent runs of a campaign may save the same plan
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as ostream:
+            pickle.dump(self.entries, ostream,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self.modified = False
+        logger.info((f"Instrumentation plan saved {self.path} "
+                     f"(hits: {self.hits}, misses: {self.misses})"),
+                    caller=self)
+
+    def lookup(self, table, key, compute):
+        """
+        Decision key of table, computed by compute() when unknown
+        """
+        if not self.enable:
+            return compute()
+        entries = self.entries[table]
+        try:
+            value = entries[key]
+            self.hits += 1
+            return value
+        except KeyError:
+            pass
+        value = entries[key] = compute()
+        self.misses += 1
+        self.modified = True
+        return value
+
+
+def get_owner_name(_object):
+    """
+    Name identifying a module or a class across runs
+    """
+    if isinstance(_object, type):
+        module = getattr(_object, "__module__", None)
+        name = getattr(_object, "__qualname__", _object.__name__)
+        return f"{module}.{name}"
+    return getattr(_object, "__name__", None)
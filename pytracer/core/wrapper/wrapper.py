@@ -1,5 +1,6 @@
 import functools
 import inspect
+import threading
 import types
 from abc import ABCMeta, abstractmethod
 from types import FunctionType, LambdaType, MappingProxyType, ModuleType
@@ -8,8 +9,10 @@ import pytracer
 import pytracer.builtins
 import pytracer.cache as cache
 import pytracer.core.inout.writer as iowriter
+from pytracer.core.config import config as cfg
 from pytracer.core.inout.writer import Writer
 from pytracer.core.wrapper.filter import FilterExclusion, FilterInclusion
+from pytracer.core.wrapper.plan import InstrumentationPlan, get_owner_name
 from pytracer.utils.log import get_logger
 
 visited_attr = "__Pytracer_visited__"
@@ -164,8 +167,10 @@ class Wrapper(metaclass=ABCMeta):
             self.lazy_dict = {}
             self.included = FilterInclusion()
             self.excluded = FilterExclusion()
+            self.plan = InstrumentationPlan()
             self.real_obj = obj
             self.obj_name = getattr(self.real_obj, "__name__")
+            self.owner_name = get_owner_name(self.real_obj)
             self.wrapped_obj = self.new_obj()
             self.init_attributes()
             self.populate(self.real_obj, self.attributes)
@@ -188,7 +193,7 @@ class Wrapper(metaclass=ABCMeta):
                     _globals[_name] = _value_wrapped
 
     def mark_function_as_visited(self, func):
-        logger.debug(f"Function {func} marked as visited", caller=self)
+        logger.debug("Function %s marked as visited", func, caller=self)
         setattr(func, visited_attr, True)
 
     def get_name(self):
@@ -330,7 +335,7 @@ class Wrapper(metaclass=ABCMeta):
 
     def handle_excluded_function(self, name, function):
         cache.increment_exclude(self.real_obj, 'function')
-        logger.debug(f"[{self.get_name()}] Excluded function {name}")
+        logger.debug("[%s] Excluded function %s", self.get_name(), name)
         if self.islambda(function):
             self.handle_excluded_lambda(name, function)
             return
@@ -344,8 +349,8 @@ class Wrapper(metaclass=ABCMeta):
 
     def handle_included_function(self, name, function):
         cache.increment_include(self.real_obj, 'function')
-        logger.debug(
-            f"[{self.get_name()}] Included function {name}", caller=self)
+        logger.debug("[%s] Included function %s", self.get_name(), name,
+                     caller=self)
         if self.islambda(function):
             self.handle_included_lambda(name, function)
             return
@@ -393,7 +398,7 @@ class Wrapper(metaclass=ABCMeta):
         Handler for functions
         """
 
-        logger.debug(f"[FunctionHandler] {name} -> {function}", caller=self)
+        logger.debug("[FunctionHandler] %s -> %s", name, function, caller=self)
 
         if isinstance(function, functools.partial):
             setattr(self.wrapped_obj, name, function)
@@ -402,7 +407,7 @@ class Wrapper(metaclass=ABCMeta):
         fid = id(function)
 
         if fid in cache.id_dict:
-            logger.debug(f"Function {name} ({function}) cached")
+            logger.debug("Function %s (%s) cached", name, function)
             cached_function = cache.visited_functions[fid]
             try:
                 setattr(self.wrapped_obj, name, cached_function)
@@ -432,7 +437,7 @@ class Wrapper(metaclass=ABCMeta):
         """
         Handler for submodules
         """
-        logger.debug(f"[ModuleHandler] {attr} -> {submodule}", caller=self)
+        logger.debug("[ModuleHandler] %s -> %s", attr, submodule, caller=self)
 
         if submodule_wrapped := cache.get_global_mapping(submodule):
             submodule = submodule_wrapped
@@ -450,27 +455,27 @@ class Wrapper(metaclass=ABCMeta):
 
     def handle_included_class(self, name, clss):
         cache.increment_include(self.real_obj, 'classe')
-        logger.debug(f"[{self.get_name()}] Included class {name}", caller=self)
+        logger.debug("[%s] Included class %s", self.get_name(), name,
+                     caller=self)
         wrp = WrapperClass(clss)
         class_wrp = wrp.get_wrapped_object()
         cache.add_global_mapping(clss, class_wrp)
         self.compute_dependencies(clss, class_wrp)
         self.update_dependencies(clss, class_wrp)
         classname = getattr(clss, "__name__")
-        logger.debug(f"Wrapped class {class_wrp}", caller=self)
+        logger.debug("Wrapped class %s", class_wrp, caller=self)
         setattr(self.wrapped_obj, name, class_wrp)
         setattr(self.wrapped_obj, classname, class_wrp)
 
-        debug_msg = (f"[ClassHandler] {clss} ({hex(id(clss))})"
-                     f" -> "
-                     f"{class_wrp} ({hex(id(class_wrp))})")
-        logger.debug(debug_msg, caller=self)
+        logger.debug("[ClassHandler] %s (%#x) -> %s (%#x)", clss, id(clss),
+                     class_wrp, id(class_wrp), caller=self)
 
     def handle_excluded_class(self, name, clss):
         cache.increment_exclude(self.real_obj, 'classe')
-        logger.debug(f"[{self.get_name()}] Excluded class {name}", caller=self)
+        logger.debug("[%s] Excluded class %s", self.get_name(), name,
+                     caller=self)
         classname = getattr(clss, "__name__")
-        logger.debug(f"Normal class {clss}", caller=self)
+        logger.debug("Normal class %s", clss, caller=self)
         cache.add_global_mapping(clss, clss)
         setattr(self.wrapped_obj, name, clss)
         setattr(self.wrapped_obj, classname, clss)
@@ -479,10 +484,10 @@ class Wrapper(metaclass=ABCMeta):
         """
             Handler for class
         """
-        logger.debug(f"[ClassHandler] {attr} -> {clss}", caller=self)
+        logger.debug("[ClassHandler] %s -> %s", attr, clss, caller=self)
 
         if id(clss) in WrapperClass.visited_class:
-            logger.debug(f"{clss} has been visited", caller=self)
+            logger.debug("%s has been visited", clss, caller=self)
             if WrapperClass.visited_class[id(clss)] is not None:
                 setattr(self.wrapped_obj, attr,
                         WrapperClass.visited_class[id(clss)])
@@ -492,31 +497,31 @@ class Wrapper(metaclass=ABCMeta):
 
         modname = getattr(clss, "__module__", "")
         clssname = getattr(clss, "__name__")
-        logger.debug(
-            f"Handling class {clssname} from module {modname}", caller=self)
+        logger.debug("Handling class %s from module %s", clssname, modname,
+                     caller=self)
 
-        if exclude:
+        if exclude or self.plan.lookup(
+                "class_excluded", (modname, clssname, attr),
+                lambda: self.is_class_excluded(modname, clssname, attr)):
             self.handle_excluded_class(attr, clss)
-        elif self.included.has_module(modname):
-            if self.included.has_function(clssname, modname) or \
-                    self.included.has_function(attr, modname):
-                self.handle_included_class(attr, clss)
-            else:
-                self.handle_excluded_class(attr, clss)
-        elif self.excluded.has_module(modname):
-            if self.excluded.has_function(clssname, modname) or \
-                    self.excluded.has_function(attr, modname):
-                self.handle_excluded_class(attr, clss)
-            else:
-                self.handle_included_class(attr, clss)
         else:
             self.handle_included_class(attr, clss)
 
-        logger.debug(f"Class {clssname} has been handled", caller=self)
+        logger.debug("Class %s has been handled", clssname, caller=self)
+
+    def is_class_excluded(self, modname, clssname, attr):
+        if self.included.has_module(modname):
+            return not (self.included.has_function(clssname, modname) or
+                        self.included.has_function(attr, modname))
+        elif self.excluded.has_module(modname):
+            return self.excluded.has_function(clssname, modname) or \
+                self.excluded.has_function(attr, modname)
+        return False
 
     def handle_included_basic(self, name, obj):
         cache.increment_include(self.real_obj, 'basic')
-        logger.debug(f"[{self.get_name()}] Included basic {name}", caller=self)
+        logger.debug("[%s] Included basic %s", self.get_name(), name,
+                     caller=self)
         wrp_obj = obj
         if not hasattr(obj, visited_attr) and callable(obj):
             wrp_obj = get_instance_wrapper(name, self.get_name(), obj)
@@ -525,7 +530,8 @@ class Wrapper(metaclass=ABCMeta):
 
     def handle_excluded_basic(self, name, obj):
         cache.increment_exclude(self.real_obj, 'basic')
-        logger.debug(f"[{self.get_name()}] Excluded basic {name}", caller=self)
+        logger.debug("[%s] Excluded basic %s", self.get_name(), name,
+                     caller=self)
         setattr(self.wrapped_obj, name, obj)
 
     def is_hashable(self, obj):
@@ -563,7 +569,7 @@ class Wrapper(metaclass=ABCMeta):
         """
             Handler for special attributes
         """
-        logger.debug(f"[SpecialHandler] {attr}", caller=self)
+        logger.debug("[SpecialHandler] %s", attr, caller=self)
         try:
             setattr(self.wrapped_obj, attr, attr_obj)
         except Exception as e:
@@ -628,13 +634,11 @@ class Wrapper(metaclass=ABCMeta):
         ia = self.included.has_function(attr, obj)
         ea = self.excluded.has_function(attr, obj)
 
-        logger.debug(f"Is module {obj} included: {io}",
-                     caller=self)
-        logger.debug(f"Is module {obj} excluded: {eo}",
-                     caller=self)
-        logger.debug(f"Has module {obj} function {attr} included: {ia}",
+        logger.debug("Is module %s included: %s", obj, io, caller=self)
+        logger.debug("Is module %s excluded: %s", obj, eo, caller=self)
+        logger.debug("Has module %s function %s included: %s", obj, attr, ia,
                      caller=self)
-        logger.debug(f"Has module {obj} function {attr} excluded: {ea}",
+        logger.debug("Has module %s function %s excluded: %s", obj, attr, ea,
                      caller=self)
 
         if is_module:
@@ -700,6 +704,13 @@ class Wrapper(metaclass=ABCMeta):
         else:
             return None
 
+    def get_names(self, attribute, attribute_name):
+        module_name = self.get_module_name(attribute)
+        module_name = module_name if module_name else self.get_name()
+        object_name = self.get_object_name(attribute, attribute_name)
+        object_name = object_name if object_name else attribute_name
+        return module_name, object_name
+
     def is_instrumented(self, _object):
         return hasattr(_object, visited_attr) or\
             WrapperInstance.isinstance(_object)
@@ -726,17 +737,19 @@ class Wrapper(metaclass=ABCMeta):
                 self.handle_excluded(attribute_name, attribute)
                 continue
 
-            logger.debug(f'attribute {attribute_name}', caller=self)
-            module_name = self.get_module_name(attribute)
-            logger.debug(f'module_name {module_name}', caller=self)
-            module_name = module_name if module_name else self.get_name()
-            object_name = self.get_object_name(attribute, attribute_name)
-            logger.debug(f'object_name {object_name}', caller=self)
-            object_name = object_name if object_name else attribute_name
+            logger.debug("attribute %s", attribute_name, caller=self)
+            module_name, object_name = self.plan.lookup(
+                "names", (get_owner_name(_object), attribute_name),
+                lambda: self.get_names(attribute, attribute_name))
+            logger.debug("module_name %s", module_name, caller=self)
+            logger.debug("object_name %s", object_name, caller=self)
 
-            exclude = self.is_excluded(module_name,
-                                       object_name,
-                                       is_module=inspect.ismodule(attribute))
+            is_module = inspect.ismodule(attribute)
+            exclude = self.plan.lookup(
+                "excluded", (module_name, object_name, is_module),
+                lambda: self.is_excluded(module_name,
+                                         object_name,
+                                         is_module=is_module))
 
             if self.isspecialattr(attribute_name):
                 self.handle_special(attribute_name, attribute)
@@ -758,10 +771,18 @@ class Wrapper(metaclass=ABCMeta):
 
 class WrapperModule(Wrapper):
 
+    # Attributes resolved by the module itself
+    lazy_special_attributes = ("__getattr__", "__dir__")
+    sanitized_modules = set()
+
+    def __init__(self, obj, parent=None):
+        self.lazy = bool(cfg.wrapper.lazy)
+        super().__init__(obj, parent)
+
     def new_obj(self):
         new_obj = ModuleType(self.get_name())
-        logger.debug(
-            f"New object created {new_obj} {hex(id(new_obj))}", caller=self)
+        logger.debug("New object created %s %#x", new_obj, id(new_obj),
+                     caller=self)
         return new_obj
 
     def get_wrapped_module(self):
@@ -774,6 +795,108 @@ class WrapperModule(Wrapper):
         super().init_attributes()
         setattr(self.wrapped_obj, "generic_wrapper",
                 Writer.write_function)
+        if self.lazy:
+            self.init_lazy_attributes()
+
+    def init_lazy_attributes(self):
+        """
+            Only copy the special attributes, the others are wrapped
+            by the module __getattr__ on their first access
+        """
+        self._lock = threading.RLock()
+        self._real_getattr = vars(self.real_obj).get("__getattr__")
+        for name, attribute in vars(self.real_obj).items():
+            if is_special_attributes(name) and \
+                    name not in self.lazy_special_attributes:
+                self.handle_special(name, attribute)
+        # The module resolves them unless it has its own
+        self._lazy_attributes = {
+            name for name in self.lazy_special_attributes
+            if name not in vars(self.real_obj)}
+        self.wrapped_obj.__getattr__ = self.resolve
+        self.wrapped_obj.__dir__ = self.dir
+        self.attributes = []
+        logger.debug("Lazy module %s", self.get_name(), caller=self)
+
+    def resolve(self, name):
+        """
+            Wrap the attribute name on its first access
+        """
+        with self._lock:
+            wrapped_vars = vars(self.wrapped_obj)
+            if name in wrapped_vars:
+                return wrapped_vars[name]
+            if name == "__all__":
+                # Without __all__, "from module import *" imports the
+                # public names of the module dict
+                for attribute in list(vars(self.real_obj)):
+                    if not attribute.startswith("_"):
+                        self.resolve(attribute)
+            if name not in vars(self.real_obj):
+                if self._real_getattr is None:
+                    raise AttributeError((f"module {self.get_name()!r} "
+                                          f"has no attribute {name!r}"))
+                return self._real_getattr(name)
+            self.populate(self.real_obj, [name])
+            self.update_globals()
+            sanitize_attribute(self.real_obj, self.wrapped_obj, name,
+                               self.sanitized_modules)
+            logger.debug("Lazy attribute %s.%s resolved", self.get_name(),
+                         name, caller=self)
+            return wrapped_vars[name]
+
+    def dir(self):
+        names = set(vars(self.real_obj)) | set(vars(self.wrapped_obj))
+        return sorted(names - self._lazy_attributes)
+
+    def compute_dependencies(self, original_object, wrapped_object):
+        if self.lazy and original_object is self.real_obj:
+            # Resolved attributes compute their own dependencies
+            return
+        super().compute_dependencies(original_object, wrapped_object)
+
+
+def is_lazy(module):
+    resolve = vars(module).get("__getattr__")
+    return isinstance(getattr(resolve, "__self__", None), WrapperModule)
+
+
+def sanitize_attribute(real_module, wrapped_module, name, visited):
+    """
+    Copy the attribute name of the real module if it was not wrapped
+    and check the attributes of the module it may be
+    """
+    # Doing this instead of hasattr to not call __getattr__ of
+    # the module since it makes an infinite loop for numpy.testing
+    try:
+        obj = object.__getattribute__(real_module, name)
+    except (AttributeError, ImportError):
+        return
+    if not hasattr(wrapped_module, name):
+        try:
+            setattr(wrapped_module, name, obj)
+        except Exception:
+            pass
+        if name == "__warningregistry__":
+            return
+    sym_obj_wrp = getattr(wrapped_module, name)
+    sym_obj_rl = getattr(real_module, name)
+    if inspect.ismodule(sym_obj_wrp):
+        sanitize_module(sym_obj_rl, sym_obj_wrp, visited)
+
+
+def sanitize_module(real_module, wrapped_module, visited):
+    """
+    Check that the wrapped module has every attribute of the real one,
+    lazy modules checking their attributes as they resolve them
+    """
+    if wrapped_module.__name__ in visited:
+        return
+    visited.add(wrapped_module.__name__)
+    if hasattr(real_module, visited_attr) or is_lazy(wrapped_module):
+        return
+    for name in dir(real_module):
+        sanitize_attribute(real_module, wrapped_module, name, visited)
 
 
 class WrapperClass(Wrapper):
@@ -858,7 +981,8 @@ class WrapperClass(Wrapper):
                 logger.error(error)
         elif exclude:
             self.handle_excluded_function(name, function)
-        elif self.isstatic(function):
+        elif self.plan.lookup("static", (self.owner_name, name),
+                              lambda: self.isstatic(function)):
             self.handle_excluded_function(name, function)
         elif name == "__new__":
             self.handle_excluded_function(name, function)
@@ -872,7 +996,8 @@ class WrapperClass(Wrapper):
             self.handle_excluded_function(name, function)
         elif inspect.ismethod(function):
             self.handle_included_method(name, function)
-        elif self.is_cython_function(function):
+        elif self.plan.lookup("cython", (self.owner_name, name),
+                              lambda: self.is_cython_function(function)):
             self.handle_excluded_function(name, function)
         elif inspect.ismethoddescriptor(function):
             self.handle_included_methoddescriptor(name, function)
@@ -917,8 +1042,8 @@ class WrapperClass(Wrapper):
                          f"method {function} named {name}")
             logger.critical(error_msg, error=e, caller=self)
         else:
-            debug_msg = f"[{self.get_name()}] Include methoddescriptor {name}"
-            logger.debug(debug_msg, caller=self)
+            logger.debug("[%s] Include methoddescriptor %s", self.get_name(),
+                         name, caller=self)
 
     def handle_included_function(self, name, function):
         function_id = id(function)
@@ -957,15 +1082,12 @@ class WrapperClass(Wrapper):
                          f"wrapping method {function} named {name}")
             logger.critical(error_msg, error=e, caller=self)
         else:
-
-            debug_msg = (f"[{self.get_name()}] "
-                         f"Include function {function_name} ({function_id})")
-            logger.debug(debug_msg, caller=self)
+            logger.debug("[%s] Include function %s (%s)", self.get_name(),
+                         function_name, function_id, caller=self)
 
     def handle_visited_function(self, name, function):
-        debug_msg = (f"[{self.real_obj.__name__}] (Visited) "
-                     f"Include method {name} ({id(function)})")
-        logger.debug(debug_msg)
+        logger.debug("[%s] (Visited) Include method %s (%s)",
+                     self.real_obj.__name__, name, id(function))
         wrapped_function = cache.visited_functions[id(function)]
         try:
             setattr(self.wrapped_obj, name, wrapped_function)
@@ -976,11 +1098,10 @@ class WrapperClass(Wrapper):
         cache.visited_functions[id(function)] = function
         cache.add_global_mapping(function, function)
 
-        logger.debug(
-            f"[{self.real_obj.__name__}] Exclude method {name}")
+        logger.debug("[%s] Exclude method %s", self.real_obj.__name__, name)
 
     def handle_special(self, attr, attr_obj):
-        logger.debug(f"[SpecialHandler] {attr}", caller=self)
+        logger.debug("[SpecialHandler] %s", attr, caller=self)
         if attr.startswith("__") and attr.endswith("__"):
             return
         if attr in self.special_attributes:
@@ -993,8 +1114,8 @@ class WrapperClass(Wrapper):
                 super().handle_excluded_basic(name, obj)
             else:
                 super().handle_basic(name, obj)
-            logger.debug(
-                f"[{self.get_name()}] Include object {name}", caller=self)
+            logger.debug("[%s] Include object %s", self.get_name(), name,
+                         caller=self)
         except TypeError as e:
             logger.warning(
                 f"Cannot handle basic object {name}", error=e, caller=self)
@@ -1,4 +1,5 @@
 import pytracer.callgraph as pc
+import numpy as np
 import tables
 import os
 import re
@@ -48,6 +49,28 @@ class NodeNotFound(DataError):
         self.message = message
 
 
+class ExtraValue:
+    """
+    Statistic of an argument at a given time, a slice of the flat
+    array of its argument
+    """
+
+    def __init__(self, array, offset, size, shape, sparse):
+        self.array = array
+        self.offset = offset
+        self.size = size
+        self.shape = shape
+        self.sparse = sparse
+        self.ndim = len(shape)
+        self.dtype = array.atom.dtype
+
+    def read(self):
+        value = self.array[self.offset:self.offset + self.size]
+        if self.sparse:
+            return value
+        return value.reshape(self.shape)
+
+
 class Data:
 
     __cache = {}
@@ -77,12 +100,16 @@ class Data:
             return self.cached_header
 
         self.cached_header = []
+        sampling = getattr(self.data.root._v_attrs, "sampling", {})
         modules = self.data.iter_nodes("/")
         for module in modules:
             for function in module:
+                _, skipped = sampling.get(
+                    (module._v_name, function._v_name), (0, 0))
                 self.cached_header.append(
                     {"module": module._v_name,
-                        "function": function._v_name}
+                        "function": function._v_name,
+                        "skipped": skipped}
                 )
         return self.cached_header
 
@@ -125,10 +152,21 @@ class Data:
     def has_extra_value(self, module, function, label, arg):
         functionnode = self.get_function(module, function)
         if labelnode := getattr(functionnode, label, None):
-            if any(map(lambda a: arg in a, [arg._v_name for arg in labelnode])):
+            if isinstance(labelnode, tables.Group) and arg in labelnode:
                 return True
         return False
 
+    def get_times(self, argnode):
+        """
+        Rows of the index of the argument by time
+        """
+        if (key := argnode._v_pathname) in Data.__cache:
+            return Data.__cache[key]
+        times = {int(time): row for row, time in
+                 enumerate(argnode.index.read(field="time"))}
+        Data.__cache[key] = times
+        return times
+
     def get_extra_value(self, module, function, label=".*", arg=".*", time=".*", mode=".*"):
         if not self.has_extra_value(module, function, label, arg):
             raise KeyError(
@@ -144,22 +182,24 @@ class Data:
         functionnode = self.get_function(module, function)
 
         labelnode = getattr(functionnode, label)
-
-        for argnode in labelnode:
-            if arg in (argnode_name := argnode._v_name):
-                argnode = getattr(labelnode, argnode_name)
-                if hasattr(argnode, str(time)):
-                    timenode = getattr(argnode, str(time))
-                    extra_value = getattr(timenode, mode)
-                    break
+        argnode = getattr(labelnode, arg)
 
         key = (module, function, searchnodename)
-        try:
-            Data.__cache[key] = extra_value
-        except UnboundLocalError:
+        if (row := self.get_times(argnode).get(int(time))) is None:
             print(f'Inexisting {key}')
             return
 
+        entry = argnode.index[row]
+        name = f"{mode}_{np.dtype(entry['dtype'].decode()).name}"
+        # Offsets and sizes are given for mean, std and sig
+        stat = Data.__modes.index(mode)
+        extra_value = ExtraValue(getattr(argnode, name),
+                                 int(entry["offset"][stat]),
+                                 int(entry["size"][stat]),
+                                 tuple(entry["shape"][:entry["ndim"]]),
+                                 bool(entry["sparse"]))
+        Data.__cache[key] = extra_value
+
         return extra_value
 
     def filter(self, module, function, filters, col, *argv):
@@ -20,7 +20,8 @@ info_table = html.Div(
         dt.DataTable(
             id="info-table",
             columns=[{"id": "module", "name": "module"},
-                     {"id": "function", "name": "function"}],
+                     {"id": "function", "name": "function"},
+                     {"id": "skipped", "name": "sampled out"}],
             data=None,
             selected_rows=[],
             sort_action="native",
@@ -0,0 +1,149 @@
+import queue
+import socket
+import threading
+
+import pytracer.core.inout.stream as stream
+from pytracer.core.inout.reader._stream import ReaderStream
+from pytracer.module.info import register
+from pytracer.module.parser import Parser, export_stats_value, init_export
+from pytracer.utils.log import get_logger
+from tqdm import tqdm
+
+logger = get_logger()
+
+
+class Event:
+    record = 0
+    end = 1
+    accepted = 2
+
+
+class Aggregator(Parser):
+
+    '''
+    Merge the records streamed by the samples of a campaign as soon as
+    every sample has sent them, so that the traces are never written.
+    Records are lined up by (time, module, function, label).
+    '''
+
+    # Seconds between two checks of the end of the campaign
+    _accept_timeout = 0.1
+
+    def __init__(self, samples, queue_size=1024):
+        self.samples = samples
+        self.address = stream.get_address()
+        self.traces = []
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closing = threading.Event()
+        self._server = stream.listen(self.address, samples)
+        self._server.settimeout(self._accept_timeout)
+        self._thread = threading.Thread(target=self._accept,
+                                        name="PytracerAggregator",
+                                        daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """
+        Tell the aggregator that all the samples have exited
+        """
+        self._closing.set()
+
+    def _accept(self):
+        accepted = 0
+        while True:
+            try:
+                connection, _ = self._server.accept()
+            except socket.timeout:
+                # Samples connected before exiting are still in the backlog
+                if self._closing.is_set():
+                    break
+                continue
+            connection.settimeout(None)
+            threading.Thread(target=self._read, args=(connection,),
+                             daemon=True).start()
+            accepted += 1
+        self._server.close()
+        stream.remove_address(self.address)
+        self._queue.put((Event.accepted, None, accepted))
+
+    def _read(self, connection):
+        sample = None
+        complete = False
+        with connection, connection.makefile("rb") as istream:
+            try:
+                reader = ReaderStream(istream)
+            except Exception as e:
+                logger.warning("Cannot read a sample stream", caller=self,
+                               error=e)
+            else:
+                sample = reader.sample
+                self.traces.append(reader.filename)
+                for record in reader:
+                    self._queue.put((Event.record, sample, record))
+                complete = reader.complete
+        self._queue.put((Event.end, sample, complete))
+
+    def get_key(self, record):
+        return (record["time"], record["module"],
+                record["function"], record["label"])
+
+    def _complete(self, pending, alive):
+        """
+        Merge the pending records sent by every alive sample, in order
+        """
+        for key in [key for key, records in pending.items()
+                    if alive and records.keys() >= alive]:
+            records = pending.pop(key)
+            yield self.merge([records[sample] for sample in sorted(alive)])
+
+    def _drop(self, sample, pending, alive):
+        if sample not in alive:
+            return
+        alive.discard(sample)
+        logger.warning((f"Sample {sample} failed, the next records are "
+                        f"aggregated over {len(alive)} samples"), caller=self)
+        for records in pending.values():
+            records.pop(sample, None)
+
+    def __iter__(self):
+        pending = {}
+        alive = set(range(self.samples))
+        connected = set()
+        accepted = None
+        ended = 0
+        while accepted is None or ended < accepted:
+            event, sample, value = self._queue.get()
+            if event == Event.record:
+                connected.add(sample)
+                key = self.get_key(value)
+                records = pending.setdefault(key, {})
+                records[sample] = value
+                # Samples send their records in the same order,
+                # so the first complete record is the oldest one
+                if records.keys() >= alive:
+                    del pending[key]
+                    yield self.merge([records[i] for i in sorted(alive)])
+            elif event == Event.end:
+                connected.add(sample)
+                ended += 1
+                if not value:
+                    self._drop(sample, pending, alive)
+                    yield from self._complete(pending, alive)
+            else:
+                accepted = value
+
+        for sample in alive - connected:
+            self._drop(sample, pending, alive)
+        yield from self._complete(pending, alive)
+        if pending:
+            logger.warning((f"{len(pending)} records were not sent by every "
+                            f"sample and are not aggregated"), caller=self)
+
+    def main(self):
+        callchain, export = init_export()
+        expectedrows = [10]
+        for stats_value in tqdm(self, desc="Aggregating...",
+                                mininterval=0.1, maxinterval=1):
+            export_stats_value(callchain, export, stats_value, expectedrows)
+        register.add_traces(self.traces)
+        export.export_sampling(register.get_sampling(self.traces))
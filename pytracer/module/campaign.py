@@ -0,0 +1,271 @@
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pytracer.core.inout._init as _init
+import pytracer.core.inout.sampling as sampling
+import pytracer.utils.context.verificarlo as verificarlo
+from pytracer.core.config import _fix_path, constant
+from pytracer.module.info import register
+from pytracer.utils.context.context import ContextManager
+from pytracer.utils.log import get_logger
+
+logger = get_logger()
+
+_trace_extensions = (constant.extension.pickle, constant.extension.binary)
+
+
+class Sample:
+
+    def __init__(self, index, seed, name, streamed=False):
+        self.index = index
+        self.seed = seed
+        self.name = name
+        self.streamed = streamed
+        self.returncode = None
+        self.traces = []
+
+    def failed(self):
+        if self.streamed:
+            return self.returncode != 0
+        return self.returncode != 0 or self.traces == []
+
+
+class Campaign:
+
+    '''
+    Trace several runs of the same command, the samples of a
+    numerical-quality study, with J of them running at the same time.
+    Each sample writes its own trace in the campaign directory,
+    so the directory can be given to pytracer parse.
+    '''
+
+    datefmt = "%y%m%d%H%M%S"
+
+    def __init__(self, args):
+        self.parameters = _init.IOInitializer()
+        self.args = args
+        self.samples = args.samples
+        self.jobs = args.jobs
+        self.seed = args.seed
+        self.check_args()
+        self.backend_options = self.get_backend_options()
+        self.name = (f"{constant.campaign.filename}."
+                     f"{datetime.datetime.now().strftime(self.datefmt)}."
+                     f"{os.getpid()}")
+        self.cache_traces = os.path.join(self.parameters.cache_traces,
+                                         self.name)
+        self.traces_path = os.path.join(self.parameters.cache_path,
+                                        self.cache_traces)
+        self.path = os.path.join(self.parameters.cache_campaigns_path,
+                                 self.name)
+        os.makedirs(self.traces_path, exist_ok=True)
+        os.makedirs(self.path, exist_ok=True)
+        self.config = self.get_config()
+        self.schedule_path = self.freeze_schedule()
+        self.aggregator = None
+        if args.aggregate:
+            # Imported here since it loads the parser and its exporter
+            from pytracer.module.aggregator import Aggregator
+            self.aggregator = Aggregator(self.samples)
+
+    def check_args(self):
+        if self.samples < 1:
+            logger.error(f"Invalid number of samples {self.samples}",
+                         caller=self)
+        if self.jobs < 1:
+            logger.error(f"Invalid number of jobs {self.jobs}", caller=self)
+        if self.args.aggregate and self.jobs < self.samples:
+            logger.warning((f"Only {self.jobs} of the {self.samples} samples "
+                            f"run at a time, the aggregator keeps the records "
+                            f"in memory until the last samples send them"),
+                           caller=self)
+        if not os.path.isfile(self.args.command[0]):
+            logger.error(f"File {self.args.command[0]} not found",
+                         caller=self)
+
+    def get_config(self):
+        config_path = os.path.abspath(os.getenv(constant.env.config))
+        with open(config_path) as istream:
+            config = json.load(istream)
+        # The samples configs are not written next to the original one
+        _fix_path(os.path.dirname(config_path), config)
+        return config
+
+    def freeze_schedule(self):
+        """
+        Budget sampling adapts its strides to the time the calls take.
+        The samples replay the schedule of a previous run, copied in the
+        campaign, or the one the first sample records alone.
+        """
+        sampler = sampling.Sampler(self.parameters.cache_info_path)
+        if not sampler.timed:
+            return None
+        self.shared_schedule_path = sampler.schedule_path
+        path = os.path.join(self.path,
+                            os.path.basename(sampler.schedule_path))
+        if os.path.isfile(sampler.schedule_path):
+            shutil.copy(sampler.schedule_path, path)
+        return path
+
+    def share_schedule(self):
+        # The next runs replay the schedule recorded by the first sample
+        if not os.path.isfile(self.schedule_path) or \
+                os.path.isfile(self.shared_schedule_path):
+            return
+        tmp_path = f"{self.shared_schedule_path}.{os.getpid()}.tmp"
+        shutil.copy(self.schedule_path, tmp_path)
+        os.replace(tmp_path, self.shared_schedule_path)
+
+    def get_backend_options(self):
+        options = {}
+        for option in self.args.backend_option:
+            name, sep, value = option.partition("=")
+            if not sep:
+                logger.error((f"Invalid backend option {option}, "
+                              f"expected NAME=VALUE"), caller=self)
+            options[name] = value
+        return options
+
+    def get_environment(self, sample):
+        env = {"PYTHONHASHSEED": str(sample.seed)}
+        if self.args.backend:
+            backend = verificarlo.get_backend(
+                verificarlo.BackendType[self.args.backend.upper()],
+                self.backend_options)
+            if backend.seedable:
+                backend.set_default_option("seed", sample.seed)
+            env.update(backend.getenv())
+        if self.aggregator is not None:
+            env[constant.env.aggregator] = self.aggregator.address
+            env[constant.env.sample] = str(sample.index)
+        return ContextManager(env).get_environ()
+
+    def write_config(self, sample):
+        config = dict(self.config)
+        io = dict(config.get("io", {}))
+        io["trace"] = sample.name
+        io["cache"] = dict(io.get("cache", {}), traces=self.cache_traces)
+        config["io"] = io
+        if self.schedule_path:
+            config["sampling"] = dict(config["sampling"],
+                                      schedule=self.schedule_path)
+        filename = f"{sample.name}{constant.extension.json}"
+        path = os.path.join(self.path, filename)
+        with open(path, "w") as ostream:
+            json.dump(config, ostream, indent=4)
+        return path
+
+    def get_command(self):
+        command = [sys.executable, "-m", "pytracer", "trace",
+                   "--report", self.args.report.lower()]
+        if self.args.report_file:
+            command += ["--report-file", self.args.report_file]
+        if self.args.dry_run:
+            command.append("--dry-run")
+        return command + ["--command", *self.args.command]
+
+    def get_traces(self, sample):
+        prefix = f"{sample.name}."
+        return sorted(os.path.join(self.traces_path, filename)
+                      for filename in os.listdir(self.traces_path)
+                      if filename.startswith(prefix)
+                      and filename.endswith(_trace_extensions))
+
+    def remove_traces(self, sample):
+        # A partial trace would be merged with the complete ones by parse
+        for trace in sample.traces:
+            os.remove(trace)
+            blobs = f"{trace}{constant.extension.blobs}"
+            if os.path.isdir(blobs):
+                shutil.rmtree(blobs, ignore_errors=True)
+        sample.traces = []
+
+    def run_sample(self, sample):
+        env = self.get_environment(sample)
+        env[constant.env.config] = self.write_config(sample)
+        filename = f"{sample.name}{constant.extension.text}"
+        log = os.path.join(self.path, filename)
+        with open(log, "w") as ostream:
+            try:
+                process = subprocess.run(self.get_command(), env=env,
+                                         stdout=ostream,
+                                         stderr=subprocess.STDOUT)
+                sample.returncode = process.returncode
+            except OSError as e:
+                logger.warning(f"Cannot run {sample.name}", caller=self,
+                               error=e)
+                sample.returncode = -1
+        sample.traces = self.get_traces(sample)
+        if sample.failed():
+            logger.warning((f"{sample.name} failed with code "
+                            f"{sample.returncode}, see {log}"), caller=self)
+            self.remove_traces(sample)
+        return sample
+
+    def log_sample(self, sample):
+        logger.info(f"{sample.name} done (code {sample.returncode})",
+                    caller=self)
+
+    def run_samples(self, samples):
+        try:
+            if self.schedule_path and \
+                    not os.path.isfile(self.schedule_path):
+                # The first sample records the schedule the others replay
+                self.log_sample(self.run_sample(samples[0]))
+                self.share_schedule()
+                samples = samples[1:]
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                futures = [executor.submit(self.run_sample, sample)
+                           for sample in samples]
+                for future in as_completed(futures):
+                    self.log_sample(future.result())
+        finally:
+            if self.aggregator is not None:
+                self.aggregator.close()
+
+    def main(self):
+        width = len(str(self.samples - 1))
+        streamed = self.aggregator is not None
+        samples = [Sample(i, self.seed + i,
+                          f"{constant.campaign.sample}.{i:0{width}d}",
+                          streamed)
+                   for i in range(self.samples)]
+        logger.info((f"Campaign {self.name}: {self.samples} samples "
+                     f"of {self.args.command} on {self.jobs} jobs"),
+                    caller=self)
+        if streamed:
+            # The records are aggregated while the samples run
+            thread = threading.Thread(target=self.run_samples,
+                                      args=(samples,))
+            thread.start()
+            self.aggregator.main()
+            thread.join()
+        else:
+            self.run_samples(samples)
+
+        failed = [sample.index for sample in samples if sample.failed()]
+        traces = [trace for sample in samples for trace in sample.traces]
+        register.set_campaign(self.name, self.traces_path)
+        register.set_campaign_samples(self.samples, failed, traces)
+        if failed:
+            logger.warning(f"Failed samples: {failed}", caller=self)
+        if len(failed) == self.samples:
+            logger.error("All the samples failed", caller=self)
+        if streamed:
+            logger.info(f"Samples aggregated in {register.get_aggregation()}",
+                        caller=self)
+        else:
+            logger.info((f"{len(traces)} traces written in "
+                         f"{self.traces_path}, parse them with pytracer "
+                         f"parse --directory {self.traces_path}"),
+                        caller=self)
+
+
+def main(args):
+    Campaign(args).main()
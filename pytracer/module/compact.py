@@ -0,0 +1,136 @@
+import os
+import shutil
+from itertools import zip_longest
+
+import dill as pickle
+
+import pytracer.core.inout as ptinout
+import pytracer.core.inout.delta as delta
+import pytracer.core.inout.reader as ioreader
+from pytracer.core.inout.callsite import CallSite
+import pytracer.utils as ptutils
+from pytracer.core.config import constant
+from pytracer.utils.log import get_logger
+from tqdm import tqdm
+
+logger = get_logger()
+
+
+class Compactor:
+
+    '''
+    Rewrite the traces of a stochastic run so that only the
+    reference sample is stored in full, the floating-point arrays
+    of the other samples being stored as deltas against it
+    '''
+
+    def __init__(self, args):
+        self.directory = args.directory
+        self.level = args.level
+        self.reference = args.reference
+        self.check_args()
+
+    def check_args(self):
+        if not os.path.isdir(self.directory):
+            logger.error(f"{self.directory} is not a directory", caller=self)
+        if self.reference and not os.path.isfile(self.reference):
+            logger.error(f"{self.reference} is not a file", caller=self)
+
+    def get_traces(self):
+        filenames = sorted(
+            os.path.abspath(os.path.join(self.directory, filename))
+            for filename in os.listdir(self.directory)
+            if os.path.isfile(os.path.join(self.directory, filename)))
+        filenames = [filename for filename in filenames
+                     if filename.endswith(constant.extension.pickle)]
+        if len(filenames) < 2:
+            logger.error("Compaction needs at least two pickle traces",
+                         caller=self)
+        return filenames
+
+    def rewrite(self, reference, filename, compacted):
+        """
+        Write the records of filename to compacted, those of another call
+        than the reference record at the same position being kept in full.
+        Return the number of records kept in full.
+        """
+        Reader = ioreader.get_reader(ptinout.IOType.PICKLE)
+        callsites = set()
+        kept = 0
+        with open(compacted, "wb") as ostream:
+            pickler = pickle.Pickler(ostream,
+                                     protocol=pickle.HIGHEST_PROTOCOL)
+            for ref_record, record in zip_longest(Reader(reference),
+                                                  Reader(filename)):
+                if record is None:
+                    break
+                args = dict(record["args"].items())
+                if ref_record is not None and \
+                        (ref_record["module"], ref_record["function"],
+                         ref_record["label"]) == \
+                        (record["module"], record["function"],
+                         record["label"]):
+                    ref_args = ref_record["args"]
+                    for name, value in args.items():
+                        if name in ref_args:
+                            args[name] = delta.encode(
+                                value, ref_args[name], self.level)
+                else:
+                    kept += 1
+                record = dict(record)
+                record["args"] = args
+                if isinstance(callsite := record["backtrace"], CallSite):
+                    if callsite.id not in callsites:
+                        pickler.dump(callsite)
+                        callsites.add(callsite.id)
+                    record["backtrace"] = callsite.id
+                pickler.dump(record)
+                # Records are independent, do not keep them in the memo
+                pickler.dump(ptinout.memo_reset_marker)
+                pickler.clear_memo()
+        return kept
+
+    def compact(self, reference, filename):
+        compacted = f"{filename}.compact"
+        try:
+            kept = self.rewrite(reference, filename, compacted)
+        except BaseException:
+            # The trace is only replaced once fully rewritten
+            if os.path.isfile(compacted):
+                os.remove(compacted)
+            raise
+        if kept:
+            logger.warning((f"{kept} records of {filename} do not match "
+                            f"the calls of the reference, "
+                            f"they are kept in full"), caller=self)
+        os.replace(compacted, filename)
+        # Arrays are now stored in the compacted trace
+        blobs = f"{filename}{constant.extension.blobs}"
+        if os.path.isdir(blobs):
+            shutil.rmtree(blobs, ignore_errors=True)
+
+    def get_size(self, trace):
+        size = os.path.getsize(trace)
+        blobs = f"{trace}{constant.extension.blobs}"
+        if os.path.isdir(blobs):
+            size += sum(os.path.getsize(os.path.join(blobs, filename))
+                        for filename in os.listdir(blobs))
+        return size
+
+    def main(self):
+        traces = self.get_traces()
+        reference = os.path.abspath(self.reference) \
+            if self.reference else traces[0]
+        logger.info(f"Reference trace: {reference}", caller=self)
+        size_before = sum(map(self.get_size, traces))
+        for trace in tqdm(traces, desc="Compacting..."):
+            if trace != reference:
+                self.compact(reference, trace)
+        size_after = sum(map(self.get_size, traces))
+        logger.info((f"Traces compacted from "
+                     f"{ptutils.get_human_size(size_before)} to "
+                     f"{ptutils.get_human_size(size_after)}"), caller=self)
+
+
+def main(args):
+    Compactor(args).main()
@@ -0,0 +1,15 @@
+from pytracer.module.parser_init import directory_default
+
+
+def init_module(subparser):
+    compact_parser = subparser.add_parser(
+        "compact", help="compact traces of stochastic samples")
+    compact_parser.add_argument("--directory", default=directory_default,
+                                help="compact all traces in <directory>")
+    compact_parser.add_argument("--reference",
+                                help=("trace kept in full, "
+                                      "the others are stored as deltas "
+                                      "(first trace by default)"))
+    compact_parser.add_argument("--level", default=6, type=int,
+                                choices=range(10), metavar="[0-9]",
+                                help="zlib compression level")
@@ -42,6 +42,9 @@ class PytracerInfoTraceRegister(PytracerInfoRegisterAbstract):
         self._report_path = None
         self._pytracer_log_name = None
         self._pytracer_log_path = None
+        self._sampling = {}
+        self._metrics = None
+        self._metrics_path = None
 
     def get_date(self):
         return self._registration_date
@@ -51,7 +54,11 @@ class PytracerInfoTraceRegister(PytracerInfoRegisterAbstract):
         self._trace_path = path
 
     def set_size(self):
-        self._trace_size = os.stat(self._trace_path).st_size
+        # Traces streamed to an aggregator are not written
+        if os.path.isfile(self._trace_path):
+            self._trace_size = os.stat(self._trace_path).st_size
+        else:
+            self._trace_size = 0
 
     def get_trace_name(self):
         return self._trace_name
@@ -63,8 +70,38 @@ class PytracerInfoTraceRegister(PytracerInfoRegisterAbstract):
         self._report_name = name
         self._report_path = path
 
+    def set_sampling(self, counts):
+        self._sampling = counts
+
+    def get_sampling(self):
+        return getattr(self, "_sampling", {})
+
+    def set_metrics(self, summary, path):
+        self._metrics = summary
+        self._metrics_path = path
+
+    def get_metrics(self):
+        """
+        Last metrics snapshot of the run, None if metrics were disabled
+        """
+        # The logger imports this module
+        import pytracer.core.inout.metrics as metrics
+        path = getattr(self, "_metrics_path", None)
+        if path and os.path.isfile(path):
+            try:
+                return metrics.load(path)
+            except (OSError, ValueError):
+                pass
+        return getattr(self, "_metrics", None)
+
+    def get_trace_path(self):
+        return self._trace_path
+
     def __str__(self):
 
+        import pytracer.core.inout.metrics as metrics
+        summary = self.get_metrics()
+        skipped = sum(skipped for _, skipped in self.get_sampling().values())
         _str_fields = OrderedDict(
             Date=self._registration_date.ctime(),
             Name=self._trace_name,
@@ -73,6 +110,9 @@ class PytracerInfoTraceRegister(PytracerInfoRegisterAbstract):
             Args=self._pytracer_args,
             ReportName=self._report_name,
             ReportPath=self._report_path,
+            SampledOut=skipped,
+            Metrics=summary and metrics.format_summary(summary),
+            MetricsPath=getattr(self, "_metrics_path", None),
             PytracerLogName=self._pytracer_log_name,
             PytracerLogPath=self._pytracer_log_path
         )
@@ -105,6 +145,9 @@ class PytracerInfoAggregationRegister(PytracerInfoRegisterAbstract):
         self._aggregation_name = name
         self._aggregation_path = path
 
+    def get_aggregation_path(self):
+        return self._aggregation_path
+
     def add_trace(self, trace):
         self._traces.append(trace)
 
@@ -141,16 +184,70 @@ class PytracerInfoAggregationRegister(PytracerInfoRegisterAbstract):
         return _str
 
 
+class PytracerInfoCampaignRegister(PytracerInfoRegisterAbstract):
+
+    def __init__(self):
+        self._registration_date = datetime.datetime.now()
+        self._init_default()
+
+    def _init_default(self):
+        self._campaign_name = None
+        self._campaign_path = None
+        self._pytracer_args = None
+        self._pytracer_log_name = None
+        self._pytracer_log_path = None
+        self._samples = 0
+        self._failed = []
+        self._traces = []
+
+    def get_date(self):
+        return self._registration_date
+
+    def set_campaign(self, name, path):
+        self._campaign_name = name
+        self._campaign_path = path
+
+    def set_samples(self, samples, failed, traces):
+        self._samples = samples
+        self._failed = failed
+        self._traces = traces
+
+    def get_traces(self):
+        return self._traces
+
+    def __str__(self):
+
+        _str_fields = OrderedDict(
+            Date=self._registration_date.ctime(),
+            Name=self._campaign_name,
+            Path=self._campaign_path,
+            Args=self._pytracer_args,
+            Samples=self._samples,
+            Failed=self._failed,
+            Traces=self._traces,
+            PytracerLogName=self._pytracer_log_name,
+            PytracerLogPath=self._pytracer_log_path
+        )
+
+        _str_map = [f"{key:>15}:\t{value}\n" for key,
+                    value in _str_fields.items()]
+        _str = "".join(_str_map)
+
+        return _str
+
+
 class PytracerInfoRegister(metaclass=Singleton):
 
     def __init__(self):
         self.parameters = _init.IOInitializer()
         self._trace = PytracerInfoTraceRegister()
         self._aggregation = PytracerInfoAggregationRegister()
+        self._campaign = PytracerInfoCampaignRegister()
 
     def set_args(self, args):
         self._trace.set_args(args)
         self._aggregation.set_args(args)
+        self._campaign.set_args(args)
 
     def set_trace(self, name, path):
         self._trace.set_trace(name, path)
@@ -158,6 +255,12 @@ class PytracerInfoRegister(metaclass=Singleton):
     def set_report(self, name, path):
         self._trace.set_report(name, path)
 
+    def set_sampling(self, counts):
+        self._trace.set_sampling(counts)
+
+    def set_metrics(self, summary, path):
+        self._trace.set_metrics(summary, path)
+
     def add_trace(self, trace):
         self._aggregation.add_trace(trace)
 
@@ -167,10 +270,14 @@ class PytracerInfoRegister(metaclass=Singleton):
     def set_pytracer_log(self, name, path):
         self._trace.set_pytracer_log(name, path)
         self._aggregation.set_pytracer_log(name, path)
+        self._campaign.set_pytracer_log(name, path)
 
     def set_aggregation(self, name, path):
         self._aggregation.set_aggregation(name, path)
 
+    def get_aggregation(self):
+        return self._aggregation.get_aggregation_path()
+
     def set_trace_size(self):
         self._trace.set_size()
 
@@ -180,6 +287,12 @@ class PytracerInfoRegister(metaclass=Singleton):
     def set_callgraph(self, name, path):
         self._aggregation.set_callgraph(name, path)
 
+    def set_campaign(self, name, path):
+        self._campaign.set_campaign(name, path)
+
+    def set_campaign_samples(self, samples, failed, traces):
+        self._campaign.set_samples(samples, failed, traces)
+
     def _get_trace_registration_filename(self):
         path = self.parameters.cache_info_path
         filename = ptutils.get_filename(
@@ -192,6 +305,29 @@ class PytracerInfoRegister(metaclass=Singleton):
             constant.register.aggregation, ext=constant.extension.pickle)
         return os.path.join(path, filename)
 
+    def _get_campaign_registration_filename(self):
+        path = self.parameters.cache_info_path
+        filename = ptutils.get_filename(
+            constant.register.campaign, ext=constant.extension.pickle)
+        return os.path.join(path, filename)
+
+    def get_sampling(self, traces):
+        """
+        Sampling counts registered by the runs that wrote traces
+        """
+        path = self.parameters.cache_info_path
+        traces = set(traces)
+        counts = {}
+        for filename in os.listdir(path):
+            if not filename.startswith(constant.register.trace):
+                continue
+            with open(os.path.join(path, filename), 'rb') as istream:
+                trace = pickle.Unpickler(istream).load()
+            if trace.get_trace_path() in traces:
+                for key, value in trace.get_sampling().items():
+                    counts.setdefault(key, value)
+        return counts
+
     def register_trace(self):
         filename = self._get_trace_registration_filename()
         with open(filename, 'wb') as ostream:
@@ -204,6 +340,12 @@ class PytracerInfoRegister(metaclass=Singleton):
             pickler = pickle.Pickler(ostream)
             pickler.dump(self._aggregation)
 
+    def register_campaign(self):
+        filename = self._get_campaign_registration_filename()
+        with open(filename, 'wb') as ostream:
+            pickler = pickle.Pickler(ostream)
+            pickler.dump(self._campaign)
+
 
 class PytracerInfoPrinter(metaclass=Singleton):
 
@@ -212,6 +354,7 @@ class PytracerInfoPrinter(metaclass=Singleton):
         self.args = args
         self._trace_info = self._get_trace_info()
         self._aggregation_info = self._get_aggregation_info()
+        self._campaign_info = self._get_campaign_info()
 
     def _load_trace_info(self, trace_path):
         with open(trace_path, 'rb') as istream:
@@ -241,6 +384,15 @@ class PytracerInfoPrinter(metaclass=Singleton):
             path, aggregation) for aggregation in _aggregations if aggregation.startswith(constant.register.aggregation)]
         return sorted([self._load_aggregation_info(aggregation) for aggregation in aggregations_path], key=lambda a: a.get_date())
 
+    def _get_campaign_info(self):
+        path = self.parameters.cache_info_path
+        campaigns_path = [os.path.join(path, campaign)
+                          for campaign in os.listdir(path)
+                          if campaign.startswith(constant.register.campaign)]
+        return sorted([self._load_trace_info(campaign)
+                       for campaign in campaigns_path],
+                      key=lambda campaign: campaign.get_date())
+
     def print_trace(self, trace):
         print(trace)
 
@@ -259,7 +411,17 @@ class PytracerInfoPrinter(metaclass=Singleton):
         for aggregation in self._aggregation_info:
             self.print_aggregation(aggregation)
 
+    def print_campaigns(self):
+        self._header = '='*10 + " Campaigns " + '='*10 + "\n"
+        print(self._header)
+        for campaign in self._campaign_info:
+            print(campaign)
+
     def print(self):
+        if self.args.campaign:
+            self.print_campaigns()
+            return
+
         if self.args.trace:
             self.print_traces()
 
@@ -269,6 +431,7 @@ class PytracerInfoPrinter(metaclass=Singleton):
 
         self.print_traces()
         self.print_aggregations()
+        self.print_campaigns()
 
 
 register = PytracerInfoRegister()
@@ -13,3 +13,5 @@ def init_module(subparser):
                                help="Print traces information")
     parser_parser.add_argument('--aggregation', action='store_true',
                                help="Print aggregations information")
+    parser_parser.add_argument('--campaign', action='store_true',
+                               help="Print campaigns information")
@@ -2,11 +2,15 @@ import argparse
 import os
 import pickle
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum, auto
+from itertools import islice
 
 import networkx as nx
 import pytracer.core.inout as ptinout
 import pytracer.core.inout._init as _init
+import pytracer.core.inout.delta as delta
 import pytracer.core.inout.exporter as ioexporter
 import pytracer.core.inout.reader as ioreader
 import pytracer.module.parser_init as parser_init
@@ -25,29 +29,59 @@ class Group:
 
     '''
     Group class holds several traces and
-    facilitates iteration over them
+    facilitates iteration over them.
+    Each iteration gives the records of the next call,
+    pulled from one trace at a time, that must be consumed
+    before the next iteration
     '''
 
     def __init__(self, iotype, filenames):
         self.iotype = iotype
+        self.filenames = filenames
+        self.exhausted = False
         self.init_reader(filenames)
 
     def init_reader(self, filenames):
-        self.readers = [iter(ioreader.Reader(f)) for f in filenames]
+        Reader = ioreader.get_reader(self.iotype)
+        self.readers = [Reader(f) for f in filenames]
+
+    def seek_record(self, i, indexes):
+        for reader, index in zip(self.readers, indexes):
+            reader.seek_record(i, index)
 
     def __iter__(self):
-        self.iterator = zip(*self.readers)
         return self
 
+    def _pull(self, first):
+        yield first
+        for filename, reader in zip(self.filenames[1:], self.readers[1:]):
+            try:
+                yield next(reader)
+            except (StopIteration, EOFError):
+                logger.warning(f"{filename} has fewer records than "
+                               f"{self.filenames[0]}", caller=self)
+                self.exhausted = True
+                return
+
     def __next__(self):
+        if self.exhausted:
+            raise StopIteration
         try:
-            return next(self.iterator)
+            first = next(self.readers[0])
         except EOFError:
             raise StopIteration
+        return delta.reconstruct_stream(self._pull(first))
+
+
+def get_index(iotype, filename):
+    return ioreader.get_reader(iotype)(filename).get_index()
 
 
 class Parser:
 
+    # Ranges per job, so that a slow range does not leave the others idle
+    ranges_per_job = 4
+
     def __init__(self, args):
         self.init_args(args)
         self.check_args(args)
@@ -55,6 +89,7 @@ class Parser:
     def init_args(self, args):
         self.online = args.online
         self.batch_size = args.batch_size
+        self.jobs = args.jobs
         self.directory = None
         self.filename = None
 
@@ -68,10 +103,14 @@ class Parser:
             if not os.path.isfile(args.filename):
                 logger.error(f"{args.filename} is not a file", caller=self)
             self.filename = args.filename
+        if args.append and not os.path.isfile(args.append):
+            logger.error(f"{args.append} is not a file", caller=self)
 
     def auto_detect_format(self, filename):
         if filename.endswith(constant.extension.pickle):
             return ptinout.IOType.PICKLE
+        if filename.endswith(constant.extension.binary):
+            return ptinout.IOType.BINARY
         return None
 
     # def merge_dict(self, args):
@@ -80,7 +119,7 @@ class Parser:
     #     for arg_name in args_name:
     #         assert (all([d == arg_name for d in args_name]))
     def merge_dict(self, args, info):
-        from pytracer.core.stats.stats import get_stats
+        from pytracer.core.stats.digest import get_stats_memoized
         args_name = [arg.keys() for arg in args]
         for arg_name in args_name:
             if not (all([d == arg_name for d in args_name])):
@@ -90,7 +129,7 @@ class Parser:
         stats_dict = {}
         for arg_name in args_name[0]:
             arg_value = [arg[arg_name] for arg in args]
-            arg_stat = get_stats(arg_value)
+            arg_stat = get_stats_memoized(arg_value)
             if isinstance(arg_stat, (tuple, list)):
                 for i, arg in enumerate(arg_stat):
                     stats_dict[f"{arg_name}.{i}"] = arg
@@ -154,6 +193,48 @@ class Parser:
                 "backtrace": backtrace,
                 "args": stats_args}
 
+    def merge_samples(self, samples):
+        """
+        Merge the records of a call read one sample at a time
+        """
+        from pytracer.core.stats.stream import get_accumulator
+        first = None
+        accumulators = None
+        for record in samples:
+            args = record["args"]
+            if first is None:
+                first = record
+                accumulators = {name: get_accumulator(value, self.samples,
+                                                      self.scalars)
+                                for name, value in args.items()}
+            else:
+                for attr in ("time", "module", "function", "label"):
+                    self._merge((first, record), attr)
+                if args.keys() != accumulators.keys():
+                    logger.error((f"Divergence found "
+                                  f"{[accumulators.keys(), args.keys()]} "
+                                  f"in {first['module']}."
+                                  f"{first['function']}"), caller=self)
+            for name, value in args.items():
+                accumulators[name].push(value)
+
+        stats_args = {}
+        for name, accumulator in accumulators.items():
+            arg_stat = accumulator.get_stats()
+            if isinstance(arg_stat, (tuple, list)):
+                for i, arg in enumerate(arg_stat):
+                    stats_args[f"{name}.{i}"] = arg
+            else:
+                stats_args[name] = arg_stat
+
+        return {"id": first["id"],
+                "time": first["time"],
+                "module": first["module"],
+                "function": first["function"],
+                "label": first["label"],
+                "backtrace": first["backtrace"],
+                "args": stats_args}
+
     def get_traces(self):
         filenames = []
         sizes = set()
@@ -177,29 +258,104 @@ class Parser:
                    f"sizes: {sizes}")
             logger.warning(msg, caller=self)
 
-        logger.debug(f"List of files to parse: {filenames}", caller=self)
-        logger.debug(f"Filesize: {sizes}", caller=self)
+        logger.debug("List of files to parse: %s", filenames, caller=self)
+        logger.debug("Filesize: %s", sizes, caller=self)
 
         return filenames
 
+    def get_ranges(self, indexes):
+        """
+        Contiguous ranges of records starting at a record
+        that every trace can be read from
+        """
+        records = min(index.records for index in indexes)
+        starts = set.intersection(*[index.get_starts()
+                                    for index in indexes])
+        size = max(1, records // (self.jobs * self.ranges_per_job))
+        ranges = []
+        begin = 0
+        for start in sorted(starts):
+            if start >= records:
+                break
+            if start - begin >= size:
+                ranges.append((begin, start))
+                begin = start
+        ranges.append((begin, records))
+        return ranges
+
+    def parse_range(self, iotype, traces, indexes, start, stop):
+        """
+        Merged records start to stop of the traces, run by a worker
+        """
+        group = Group(iotype, traces)
+        group.seek_record(start, indexes)
+        stats_values = [self.merge_samples(samples)
+                        for samples in islice(group, stop - start)]
+        self.scalars.compute()
+        return stats_values
+
+    def parse_traces_parallel(self, iotype, traces):
+        # The records unpickled by the workers import the writer, that
+        # opens a trace when imported. Imported first, the workers share
+        # the trace of the parser, removed at exit since it stays empty.
+        import pytracer.core.inout.writer  # noqa: F401
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            indexes = list(executor.map(get_index, [iotype] * len(traces),
+                                        traces))
+            ranges = self.get_ranges(indexes)
+            if len(ranges) == 1:
+                logger.warning(("The traces cannot be split, they have "
+                                "fewer records than the writer writes "
+                                "between two memo resets "
+                                "(io.writer.memo_records)"), caller=self)
+            logger.info(f"Parsing {len(ranges)} ranges on {self.jobs} jobs",
+                        caller=self)
+            # Results are consumed in order, a few ranges ahead at most
+            futures = deque()
+            ranges = iter(tqdm(ranges, desc="Parsing..."))
+            for start, stop in islice(ranges, 2 * self.jobs):
+                futures.append(executor.submit(
+                    self.parse_range, iotype, traces, indexes, start, stop))
+            while futures:
+                stats_values = futures.popleft().result()
+                for start, stop in islice(ranges, 1):
+                    futures.append(executor.submit(
+                        self.parse_range, iotype, traces, indexes,
+                        start, stop))
+                if self.online:
+                    yield from stats_values
+                else:
+                    yield stats_values
+
     def parse_traces(self, traces):
 
         iotype = self.auto_detect_format(traces[0])
         logger.info(f"Auto-detection type: {iotype.name} file", caller=self)
+        self.samples = len(traces)
+        # Scalars are merged by batches, before the batch is yielded
+        from pytracer.core.stats.stream import ScalarBatch
+        self.scalars = ScalarBatch()
+        if self.jobs > 1:
+            yield from self.parse_traces_parallel(iotype, traces)
+            return
         filenames_grouped = Group(iotype, traces)
 
         if self.online:
-            for value in tqdm(filenames_grouped, desc="Parsing..."):
-                yield self.merge(value)
+            for samples in tqdm(filenames_grouped, desc="Parsing..."):
+                stats_value = self.merge_samples(samples)
+                self.scalars.compute()
+                yield stats_value
         else:
             stats_values = []
             append = stats_values.append
-            for value in tqdm(filenames_grouped, desc="Parsing..."):
-                append(self.merge(value))
+            for samples in tqdm(filenames_grouped, desc="Parsing..."):
+                append(self.merge_samples(samples))
                 if len(stats_values) % self.batch_size == 0:
+                    self.scalars.compute()
                     yield stats_values
                     stats_values.clear()
             if len(stats_values) > 0:
+                self.scalars.compute()
                 yield stats_values
 
 
@@ -217,12 +373,8 @@ def parse_stat_value(stats_value, info_dict, counter):
                           "function": function,
                           "label": label}
     logger.debug("==============================")
-    logger.debug((f"[{counter}]",
-                  f"id: {function_id}",
-                  f"time: {time}",
-                  f"module: {module},",
-                  f"function: {function},"
-                  f"{label}"))
+    logger.debug("[%s] id: %s time: %s module: %s, function: %s, %s",
+                 counter, function_id, time, module, function, label)
     # if isinstance(args, dict):
     # for arg, stat in args.items():
     #     print_stats(arg, stat)
@@ -489,6 +641,10 @@ class CallChain:
     def dump(self, obj):
         self._pickler.dump(obj)
 
+    def remove(self):
+        self._ostream.close()
+        os.remove(self.get_filename_path())
+
     def isclosure(self, call1, call2):
         (id1, name1, _, bt1, t1) = call1
         (id2, name2, _, bt2, t2) = call2
@@ -568,6 +724,26 @@ class CallChain:
             #     self._indent += " "
 
 
+def init_export(append=None):
+    """
+    Call chain and exporter of a new aggregation,
+    or of the aggregation append the samples are merged into
+    """
+    callchain = CallChain()
+    register.set_callgraph(callchain.get_filename(),
+                           callchain.get_filename_path())
+
+    export = ioexporter.Exporter(append)
+    register.set_aggregation(export.get_filename(), export.get_filename_path())
+    return callchain, export
+
+
+def export_stats_value(callchain, export, stats_value, expectedrows):
+    call = callchain.to_call(stats_value)
+    callchain.push(call, short=True)
+    export.export(stats_value, expectedrows)
+
+
 def main(args):
     enable_timer = False
 
@@ -582,32 +758,33 @@ def main(args):
     stats_values = parser.parse_traces(traces)
 
     # Construct call chain
-    callchain = CallChain()
-    register.set_callgraph(callchain.get_filename(),
-                           callchain.get_filename_path())
-
-    export = ioexporter.Exporter()
-    register.set_aggregation(export.get_filename(), export.get_filename_path())
+    callchain, export = init_export(args.append)
 
     expectedrows = [10]
 
-    if args.online:
-        for stats_value in tqdm(stats_values,
-                                desc="Exporting...",
-                                mininterval=0.1,
-                                maxinterval=1):
-            call = callchain.to_call(stats_value)
-            callchain.push(call, short=True)
-            export.export(stats_value, expectedrows)
-    else:
-        for stats_value_batch in tqdm(stats_values,
-                                      desc="Exporting...",
-                                      mininterval=0.1,
-                                      maxinterval=1):
-            for stats_value in stats_value_batch:
-                call = callchain.to_call(stats_value)
-                callchain.push(call, short=True)
-                export.export(stats_value, expectedrows)
+    try:
+        if args.online:
+            for stats_value in tqdm(stats_values,
+                                    desc="Exporting...",
+                                    mininterval=0.1,
+                                    maxinterval=1):
+                export_stats_value(callchain, export, stats_value,
+                                   expectedrows)
+        else:
+            for stats_value_batch in tqdm(stats_values,
+                                          desc="Exporting...",
+                                          mininterval=0.1,
+                                          maxinterval=1):
+                for stats_value in stats_value_batch:
+                    export_stats_value(callchain, export, stats_value,
+                                       expectedrows)
+    except BaseException:
+        # A failed parse leaves no partial call graph or aggregation
+        callchain.remove()
+        export.remove()
+        raise
+
+    export.export_sampling(register.get_sampling(traces))
 
     if enable_timer:
         end = time.time()
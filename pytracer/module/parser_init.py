@@ -21,3 +21,16 @@ def init_module(subparser):
                                help='Method used to compute the significant digits: Centered Normal Hypothesis (CNH) or General (see significantdigits package)')
     parser_parser.add_argument(
         "--online", action="store_true", default=False, help="Do not bufferized parsing")
+    parser_parser.add_argument("--jobs", default=1, type=int, metavar="J",
+                               help=("Number of processes computing the "
+                                     "statistics of ranges of records"))
+    parser_parser.add_argument("--tile-size", type=int, metavar="ELEMENTS",
+                               help=("Arrays larger than ELEMENTS are kept "
+                                     "on disk and their statistics computed "
+                                     "by tiles of ELEMENTS elements of each "
+                                     "sample (default 262144)"))
+    parser_parser.add_argument("--append", metavar="STATS",
+                               help=("Merge the statistics of the new "
+                                     "samples into the STATS aggregation "
+                                     "of a previous parse instead of "
+                                     "writing a new one"))
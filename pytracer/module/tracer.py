@@ -15,9 +15,11 @@ import pytracer.cache as cache
 import pytracer.module.tracer_init as tracer_init
 import pytracer.utils.report as report
 from pytracer.core.config import config as cfg
+from pytracer.core.inout.writer import Writer
 from pytracer.cache import (add_global_mapping,
                             get_global_mapping, visited_files)
-from pytracer.core.wrapper.wrapper import (WrapperModule, visited_attr)
+from pytracer.core.wrapper.plan import InstrumentationPlan
+from pytracer.core.wrapper.wrapper import WrapperModule, sanitize_module
 from pytracer.module.info import register
 from pytracer.utils.log import get_logger
 
@@ -37,64 +39,30 @@ class PytracerLoader(Loader):
         return True
 
     def find_spec(self, fullname, path=None):
-        logger.debug(f"find spec {fullname} {path}", caller=self)
+        logger.debug("find spec %s %s", fullname, path, caller=self)
         return super().find_spec(fullname, path)
 
     def find_module(self, fullname, path=None):
-        logger.debug(f"find spec {fullname} {path}", caller=self)
+        logger.debug("find spec %s %s", fullname, path, caller=self)
         spec = self.find_spec(fullname, path)
         if spec is None:
             return None
         return spec
 
     def compare_module(self, mod1, mod2):
-        logger.debug(f"Comparing {mod1} and {mod2}")
+        logger.debug("Comparing %s and %s", mod1, mod2)
         dir1 = dir(mod1)
 
         for attr in dir1:
             a1 = getattr(mod1, attr, None)
             a2 = getattr(mod2, attr, None)
             if a1 != a2:
-                logger.debug(f"{a1} and {a2} differ", caller=self)
+                logger.debug("%s and %s differ", a1, a2, caller=self)
                 if inspect.ismodule(a1):
                     self.compare_module(a1, a2)
 
-    def sanitize_check(self, real_module, wrapped_module, indent=""):
-        if wrapped_module.__name__ in self.visited_modules:
-            return
-
-        self.visited_modules.add(wrapped_module.__name__)
-
-        symbols = dir(real_module)
-
-        if hasattr(real_module, visited_attr):
-            return
-
-        for sym in symbols:
-            # Doing this instead of hasattr to not call __getattr__ of
-            # the module since it makes an infinite loop for numpy.testing
-            try:
-                obj = object.__getattribute__(real_module, sym)
-                has_attr = True
-            except AttributeError:
-                has_attr = False
-            except ModuleNotFoundError:
-                has_attr = False
-            except ImportError:
-                has_attr = False
-            if not has_attr:
-                continue
-            if not hasattr(wrapped_module, sym):
-                try:
-                    setattr(wrapped_module, sym, obj)
-                except Exception:
-                    pass
-                if sym == "__warningregistry__":
-                    continue
-            sym_obj_wrp = getattr(wrapped_module, sym)
-            sym_obj_rl = getattr(real_module, sym)
-            if inspect.ismodule(sym_obj_wrp):
-                self.sanitize_check(sym_obj_rl, sym_obj_wrp, indent+" ")
+    def sanitize_check(self, real_module, wrapped_module):
+        sanitize_module(real_module, wrapped_module, self.visited_modules)
 
     def get_globals(self, spec, module):
         for alias, value in globals().items():
@@ -104,7 +72,7 @@ class PytracerLoader(Loader):
 
     def create_module(self, spec):
         try:
-            logger.debug(f"create module for spec {spec}")
+            logger.debug("create module for spec %s", spec)
             real_module = importlib.import_module(spec.name)
             self.get_globals(spec, real_module)
 
@@ -115,8 +83,8 @@ class PytracerLoader(Loader):
                 cache.add_global_mapping(real_module, None)
             cache.required_modules[real_module] = []
 
-            logger.debug(
-                f"real module {real_module} imported ({hex(id(real_module))})")
+            logger.debug("real module %s imported (%#x)", real_module,
+                         id(real_module))
             wrp = WrapperModule(real_module)
             wrapped_module = wrp.wrapped_obj
 
@@ -125,11 +93,11 @@ class PytracerLoader(Loader):
             cache.orispec_to_wrappedmodule[cache.hash_spec(
                 spec)] = wrapped_module
             add_global_mapping(real_module, wrapped_module)
-            logger.debug(f"create Wrapped module {wrapped_module.__spec__}")
-            logger.debug(f"Wrapped module {hex(id(wrapped_module))}")
+            logger.debug("create Wrapped module %s", wrapped_module.__spec__)
+            logger.debug("Wrapped module %#x", id(wrapped_module))
             self.sanitize_check(real_module, wrapped_module)
-            logger.debug(
-                f"wrapper module for {spec.name} created", caller=self)
+            logger.debug("wrapper module for %s created", spec.name,
+                         caller=self)
             return wrapped_module
         except ImportError as e:
             logger.warning(f"ImportError encountered for {spec}", caller=self,
@@ -139,13 +107,13 @@ class PytracerLoader(Loader):
                             caller=self)
 
     def exec_module(self, module):
-        logger.debug(f"exec module {module}", caller=self)
+        logger.debug("exec module %s", module, caller=self)
 
         try:
             _ = sys.modules.pop(module.__name__)
         except KeyError:
-            logger.debug(
-                f"module {module.__name__} is not in sys.modules", caller=self)
+            logger.debug("module %s is not in sys.modules", module.__name__,
+                         caller=self)
 
         sys.modules[module.__name__] = module
         globals()[module.__name__] = module
@@ -169,7 +137,7 @@ class PytracerImporter(MetaPathFinder):
         if self.modules_to_load == []:
             for module in cfg.modules_to_load:
                 module_name = module.strip()
-                logger.debug(f"Module to load: {module_name}", caller=self)
+                logger.debug("Module to load: %s", module_name, caller=self)
                 try:
                     _ = sys.modules.pop(module_name)
                 except KeyError:
@@ -187,7 +155,7 @@ class PytracerImporter(MetaPathFinder):
         return isinstance(m.body[0], (ast.Import, ast.ImportFrom))
 
     def return_original_spec(self, fullname):
-        logger.debug(f"Need the original module {fullname}", caller=self)
+        logger.debug("Need the original module %s", fullname, caller=self)
         self.importing_module.remove(fullname)
         return None
 
@@ -198,32 +166,33 @@ class PytracerImporter(MetaPathFinder):
                     if hasattr(finder, "find_spec")])
 
     def find_spec(self, fullname, path=None, target=None):
-        logger.debug(f"find spec for {fullname} {path} {target}", caller=self)
+        logger.debug("find spec for %s %s %s", fullname, path, target,
+                     caller=self)
 
         if not self.is_valid_spec(fullname, path):
             return None
 
         if fullname in self.importing_module:
-            logger.debug(f"{fullname} in importing_module", caller=self)
+            logger.debug("%s in importing_module", fullname, caller=self)
             return self.return_original_spec(fullname)
         else:
             self.importing_module.add(fullname)
 
         for to_exclude in cfg.modules_to_exclude:
             if fullname.startswith(to_exclude):
-                logger.debug(f"{fullname} in to_exclude modules", caller=self)
+                logger.debug("%s in to_exclude modules", fullname, caller=self)
                 return self.return_original_spec(fullname)
 
         to_load = any([fullname.startswith(module)
                        for module in self.modules_to_load])
         if not to_load:
-            logger.debug(
-                f"{fullname} is not in to_include modules", caller=self)
+            logger.debug("%s is not in to_include modules", fullname,
+                         caller=self)
             return self.return_original_spec(fullname)
 
         spec = ModuleSpec(name=fullname, loader=PytracerLoader(fullname))
 
-        logger.debug(f"{fullname} spec found", caller=self)
+        logger.debug("%s spec found", fullname, caller=self)
         return spec
 
 
@@ -276,10 +245,10 @@ class TracerRun:
         self.install(finder)
         for module in finder.modules_to_load:
             if module in sys.modules:
-                logger.debug(
-                    f"original module {module} was removed from sys.module")
+                logger.debug("original module %s was removed from sys.module",
+                             module)
                 sys.modules.pop(module)
-            logger.debug(f"Load module {module}", caller=self)
+            logger.debug("Load module %s", module, caller=self)
             importlib.import_module(module)
 
     def exec_module(self):
@@ -329,6 +298,12 @@ class TracerRun:
                     logger.error(
                         f"Unexpected error {e}", error=e, caller=self,
                         raise_error=True)
+            Writer.flush()
+            InstrumentationPlan().save()
+            register.set_sampling(Writer.sampler.get_counts())
+            if Writer.metrics.enable:
+                register.set_metrics(Writer.write_metrics(),
+                                     Writer.metrics.get_json_path())
             if report.report.report_enable():
                 report.report.dump_report()
             self.dump_visited()
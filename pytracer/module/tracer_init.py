@@ -1,4 +1,5 @@
 import pytracer.utils.report as report
+from pytracer.utils.context.verificarlo import BackendType
 
 import argparse
 
@@ -14,6 +15,21 @@ def init_arguments(parser):
                         help="Report call and memory usage")
     parser.add_argument("--report-file", default='', metavar="FILE",
                         help="Write report to <FILE>")
+    parser.add_argument("--samples", type=int, default=1, metavar="N",
+                        help="Trace N runs of the command (campaign)")
+    parser.add_argument("--jobs", type=int, default=1, metavar="J",
+                        help="Number of runs of the campaign at a time")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the first run, the run i uses seed+i")
+    parser.add_argument("--backend", default=None,
+                        choices=[b.name.lower() for b in BackendType],
+                        help="Verificarlo backend of the campaign runs")
+    parser.add_argument("--backend-option", action="append", default=[],
+                        metavar="NAME=VALUE",
+                        help="Option of the verificarlo backend")
+    parser.add_argument("--aggregate", action="store_true",
+                        help=("Compute the statistics of the campaign runs "
+                              "while they run, without writing the traces"))
 
 
 def init_module(subparser):
@@ -0,0 +1,133 @@
+import glob
+import os
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import tables
+
+from pytracer.module import aggregator
+from pytracer.module.aggregator import Aggregator, Event
+
+script = """
+import numpy as np
+
+x = np.linspace(0, 1, 10)
+for i in range(20):
+    y = np.sin(x + i)
+"""
+
+killed_script = """
+import os
+import signal
+
+import numpy as np
+
+x = np.linspace(0, 1, 10)
+for i in range(20):
+    y = np.sin(x + i)
+    # The second sample is killed halfway
+    if i == 10 and os.environ.get("PYTRACER_SAMPLE") == "1":
+        os.kill(os.getpid(), signal.SIGKILL)
+"""
+
+columns = ("time", "label", "name", "mean", "std", "sig", "count")
+
+
+def trace(script_runner, pytracer_config, tmp_path, source, export,
+          *options):
+    path = tmp_path / "script.py"
+    path.write_text(source)
+    pytracer_config(modules_to_load=["numpy"],
+                    io={"export": {"filename": export}})
+    ret = script_runner.run(["pytracer", "trace", "--samples", "3",
+                             "--jobs", "3", *options,
+                             "--command", str(path)], cwd=tmp_path)
+    assert ret.success
+    return ret
+
+
+def get_export(name):
+    export, = glob.glob(f".__pytracercache__/stats/{name}.*.h5")
+    return export
+
+
+def get_values(export):
+    with tables.open_file(export) as h5file:
+        return {node._v_pathname: {column: node.col(column)
+                                   for column in columns}
+                for node in h5file.walk_nodes("/", "Table")
+                if node.name == "values"}
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_aggregate_equals_parse(script_runner, pytracer_config, tmp_path):
+    trace(script_runner, pytracer_config, tmp_path, script, "aggregated",
+          "--aggregate")
+    assert not glob.glob(".__pytracercache__/traces/campaign.*/*.pkl")
+    trace(script_runner, pytracer_config, tmp_path, script, "parsed")
+    directory, = {os.path.dirname(trace) for trace in
+                  glob.glob(".__pytracercache__/traces/campaign.*/*.pkl")}
+    ret = script_runner.run(["pytracer", "parse", "--directory", directory])
+    assert ret.success
+
+    expected = get_values(get_export("parsed"))
+    values = get_values(get_export("aggregated"))
+    assert values.keys() == expected.keys()
+    assert any(path.endswith("/sin/values") for path in values)
+    for path, table in expected.items():
+        for column, x in table.items():
+            y = values[path][column]
+            if x.dtype.kind == "f":
+                np.testing.assert_array_equal(x, y)
+            else:
+                assert x.tolist() == y.tolist()
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_aggregate_killed_sample(script_runner, pytracer_config, tmp_path):
+    ret = trace(script_runner, pytracer_config, tmp_path, killed_script,
+                "aggregated", "--aggregate")
+    assert "Failed samples: [1]" in ret.stderr + ret.stdout
+    sin, = [table for path, table in
+            get_values(get_export("aggregated")).items()
+            if path.endswith("/sin/values")]
+    # Every call is aggregated, over the two other samples once the
+    # records of the killed one stop
+    times = sorted(set(sin["time"].tolist()))
+    assert len(times) == 20
+    order = np.argsort(sin["time"], kind="stable")
+    counts = sin["count"][order].tolist()
+    assert counts == sorted(counts, reverse=True)
+    assert set(counts) <= {2, 3}
+    assert counts[-1] == 2
+
+
+def test_aggregate_unconnected_sample(monkeypatch):
+    # Events queued by hand, without the server and its threads
+    monkeypatch.setattr(aggregator.stream, "get_address", lambda: None)
+    monkeypatch.setattr(aggregator.stream, "listen", lambda address, backlog:
+                        SimpleNamespace(settimeout=lambda timeout: None))
+    monkeypatch.setattr(threading.Thread, "start", lambda thread: None)
+    _aggregator = Aggregator(3)
+    monkeypatch.setattr(_aggregator, "merge", lambda records: [
+        record["sample"] for record in records])
+
+    def get_record(sample, time):
+        return {"time": time, "module": "module", "function": "function",
+                "label": "inputs", "sample": sample}
+
+    # Sample 2 never connects, sample 1 fails after its first record:
+    # the records of sample 0 are aggregated alone once the others
+    # are dropped
+    events = [(Event.record, 0, get_record(0, 0)),
+              (Event.record, 1, get_record(1, 0)),
+              (Event.record, 0, get_record(0, 1)),
+              (Event.end, 1, False),
+              (Event.record, 0, get_record(0, 2)),
+              (Event.end, 0, True),
+              (Event.accepted, None, 2)]
+    for event in events:
+        _aggregator._queue.put(event)
+    assert list(_aggregator) == [[0], [0], [0]]
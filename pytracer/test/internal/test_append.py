@@ -0,0 +1,145 @@
+import shutil
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import tables
+
+from pytracer.cache import module_args
+from pytracer.core.inout.exporter import _init
+from pytracer.core.inout.exporter._hdf5 import ExporterHDF5
+from pytracer.core.stats.stream import ScalarBatch, get_accumulator
+from pytracer.utils.singleton import Singleton
+
+nsamples = 5
+backtrace = SimpleNamespace(filename="test", line="", lineno=0, name="test")
+
+
+def get_padded(value, samples, seed=0):
+    # Extended precision floats with garbage in their padding
+    array = np.full(samples, value, dtype=np.longdouble)
+    bytes_ = array.view(np.uint8).reshape(samples, -1)
+    bytes_[:, 10:] = np.random.default_rng(seed).integers(
+        0, 256, bytes_[:, 10:].shape)
+    return array
+
+
+def get_calls():
+    rng = np.random.default_rng(0)
+    uniform = rng.uniform(size=nsamples)
+    array = 1 + rng.normal(0, 1e-6, (nsamples, 4, 3))
+    # The first column does not change
+    array[:, :, 0] = 2
+    # Fewer rows than the elements of a tile
+    wide = 1 + rng.normal(0, 1e-6, (nsamples, 2, 9))
+    return [
+        ("numpy", "random", {"x": list(uniform)}),
+        ("numpy", "isfinite", {"x": [np.bool_(True)] * nsamples,
+                               "a": [np.ones(5, dtype=bool)] * nsamples}),
+        ("numpy", "log10", {"x": list(get_padded(0.5, nsamples))}),
+        ("numpy", "sin", {"x": list(array),
+                          "n": list(rng.integers(0, 100, nsamples)),
+                          "c": [np.arange(3.)] * nsamples,
+                          "s": ["abc"] * nsamples,
+                          "w": list(wide)}),
+        ("numpy", "_v_call", {"x": list(np.arange(nsamples * 1.))}),
+    ]
+
+
+def parse(samples, repeat=1):
+    scalars = ScalarBatch()
+    records = []
+    for time, (module, function, args) in enumerate(get_calls() * repeat):
+        stats = {}
+        for name, values in args.items():
+            values = values[samples]
+            accumulator = get_accumulator(values[0], len(values), scalars)
+            for value in values:
+                accumulator.push(value)
+            stats[name] = accumulator.get_stats()
+        records.append({"module": module, "function": function,
+                        "label": "inputs", "id": time, "time": time,
+                        "backtrace": backtrace, "args": stats})
+    scalars.compute()
+    return records
+
+
+def export(samples, append=None, repeat=1):
+    Singleton._instances.pop(ExporterHDF5, None)
+    exporter = ExporterHDF5(append)
+    for record in parse(samples, repeat):
+        exporter.export(record, [10])
+    exporter.end()
+    return exporter.filename_path
+
+
+def assert_equal(expected, actual):
+    def close(x, y):
+        np.testing.assert_allclose(np.asarray(x, dtype=float),
+                                   np.asarray(y, dtype=float), rtol=1e-6)
+
+    with tables.open_file(expected) as a, tables.open_file(actual) as b:
+        for node in a.walk_nodes("/", "Table"):
+            other = b.get_node(node._v_pathname)
+            if node.name == "values":
+                columns = ("mean", "std", "sig", "count")
+            elif node.name == "index":
+                columns = ("count",)
+            else:
+                continue
+            for column in columns:
+                close(node.col(column), other.col(column))
+        for node in a.walk_nodes("/", "EArray"):
+            name = node.name.rsplit("_", 1)[0]
+            if name in ("mean", "std", "sig", "mean_acc", "m2"):
+                close(node[:], b.get_node(node._v_pathname)[:])
+
+
+@pytest.mark.parametrize("tile_size", [None, 4])
+@pytest.mark.parametrize("method", ["cnh", "general"])
+def test_append_equals_parse(method, tile_size, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delitem(Singleton._instances, _init.IOInitializer,
+                        raising=False)
+    monkeypatch.setitem(module_args, "method", method)
+    monkeypatch.setitem(module_args, "tile_size", tile_size)
+    expected = tmp_path / "expected.h5"
+    shutil.copy(export(slice(None)), expected)
+    filename = export(slice(0, 3))
+    export(slice(3, None), append=filename)
+    assert_equal(expected, filename)
+    with tables.open_file(filename) as h5file:
+        assert h5file.root._v_attrs.appends == 1
+        assert "/numpy/safename__v_call" in h5file
+
+
+def test_append_twice(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delitem(Singleton._instances, _init.IOInitializer,
+                        raising=False)
+    monkeypatch.setitem(module_args, "method", "general")
+    expected = tmp_path / "expected.h5"
+    # Functions called several times
+    shutil.copy(export(slice(None), repeat=3), expected)
+    filename = export(slice(0, 2), repeat=3)
+    export(slice(2, 4), append=filename, repeat=3)
+
+    # The indexes of the samples kept by the previous parses are read
+    # once per node, not once per call
+    reads = []
+
+    def count(method):
+        def read(self, *args, **kwargs):
+            if self.name == "samples" or \
+                    self.name.startswith("samples_index"):
+                reads.append(self._v_pathname)
+            return method(self, *args, **kwargs)
+        return read
+
+    for cls in (tables.Table, tables.EArray):
+        for name in ("read", "__getitem__"):
+            monkeypatch.setattr(cls, name, count(getattr(cls, name)))
+    export(slice(4, None), append=filename, repeat=3)
+    assert reads
+    assert len(reads) == len(set(reads))
+    assert_equal(expected, filename)
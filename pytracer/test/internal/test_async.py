@@ -0,0 +1,154 @@
+import glob
+
+import numpy as np
+import pytest
+import scipy.sparse as spr
+
+import pytracer.core.inout.reader as ioreader
+import pytracer.core.inout.writer._pickle as _pickle
+from pytracer.core.inout import IOType
+
+script = """
+import numpy as np
+
+x = np.zeros(100)
+for i in range(50):
+    y = np.sin(x)
+    # Modified in place once the call is recorded
+    x += 1
+"""
+
+module = """
+def total(values, pair, named):
+    return len(values) + len(pair) + len(named)
+"""
+
+containers_script = """
+import numpy as np
+
+import asyncmod
+
+x = np.zeros(100)
+for i in range(50):
+    asyncmod.total([x], (x, i), {"x": x})
+    # Modified in place within the containers
+    x += 1
+"""
+
+
+def trace(script_runner, pytracer_config, tmp_path, source, modules,
+          **writer):
+    (tmp_path / "asyncmod.py").write_text(module)
+    path = tmp_path / "script.py"
+    path.write_text(source)
+    pytracer_config(modules_to_load=modules,
+                    python_modules_path=str(tmp_path),
+                    io={"writer": writer})
+    before = set(glob.glob(".__pytracercache__/traces/*.pkl"))
+    ret = script_runner.run(["pytracer", "trace", "--command", str(path)],
+                            cwd=tmp_path)
+    assert ret.success
+    trace, = set(glob.glob(".__pytracercache__/traces/*.pkl")) - before
+    records = []
+    for record in ioreader.get_reader(IOType.PICKLE)(trace):
+        record["args"] = dict(record["args"].items())
+        records.append(record)
+    return records
+
+
+def assert_same_values(expected, value):
+    assert type(value) is type(expected)
+    if spr.issparse(expected):
+        np.testing.assert_array_equal(value.toarray(), expected.toarray())
+    elif isinstance(expected, np.ndarray):
+        np.testing.assert_array_equal(value, expected)
+    elif isinstance(expected, (list, tuple)):
+        assert len(value) == len(expected)
+        for x, y in zip(expected, value):
+            assert_same_values(x, y)
+    elif isinstance(expected, dict):
+        assert value.keys() == expected.keys()
+        for key in expected:
+            assert_same_values(expected[key], value[key])
+
+
+def assert_same_records(expected, records):
+    assert len(records) == len(expected) > 0
+    for x, y in zip(expected, records):
+        for key in ("module", "function", "label", "time"):
+            assert x[key] == y[key]
+        assert x["args"].keys() == y["args"].keys()
+        for name, value in x["args"].items():
+            assert_same_values(value, y["args"][name])
+
+
+parameters = pytest.mark.parametrize("backpressure,queue_size", [
+    ("block", 1024),
+    ("block", 1),
+    ("spill", 1),
+])
+
+
+def get_inputs(records, function):
+    return [record["args"] for record in records
+            if record["function"] == function and record["label"] == "inputs"]
+
+
+@pytest.mark.usefixtures("cleandir")
+@parameters
+def test_async_writer(script_runner, pytracer_config, tmp_path,
+                      backpressure, queue_size):
+    expected = trace(script_runner, pytracer_config, tmp_path, script,
+                     ["numpy"], mode="sync")
+    records = trace(script_runner, pytracer_config, tmp_path, script,
+                    ["numpy"], mode="async", queue_size=queue_size,
+                    backpressure=backpressure)
+    assert_same_records(expected, records)
+    sin = get_inputs(records, "sin")
+    assert len(sin) == 50
+    for i, args in enumerate(sin):
+        assert np.all(next(iter(args.values())) == i)
+
+
+@pytest.mark.usefixtures("cleandir")
+@parameters
+def test_async_writer_containers(script_runner, pytracer_config, tmp_path,
+                                 backpressure, queue_size):
+    expected = trace(script_runner, pytracer_config, tmp_path,
+                     containers_script, ["asyncmod"], mode="sync")
+    records = trace(script_runner, pytracer_config, tmp_path,
+                    containers_script, ["asyncmod"], mode="async",
+                    queue_size=queue_size, backpressure=backpressure)
+    assert_same_records(expected, records)
+    total = get_inputs(records, "total")
+    assert len(total) == 50
+    for i, args in enumerate(total):
+        assert np.all(args["values"][0] == i)
+        assert np.all(args["pair"][0] == i)
+        assert np.all(args["named"]["x"] == i)
+
+
+def test_snapshot_sparse():
+    # scipy cannot be imported by a traced script on this python
+    x = np.zeros(3)
+    m = spr.csr_matrix(np.eye(3))
+    args = _pickle.snapshot({"m": m, "nested": [{"m": m}, (x,)]})
+    x += 1
+    m.data += 1
+    assert_same_values({"m": spr.csr_matrix(np.eye(3)),
+                        "nested": [{"m": spr.csr_matrix(np.eye(3))},
+                                   (np.zeros(3),)]}, args)
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_async_writer_drop(script_runner, pytracer_config, tmp_path):
+    expected = trace(script_runner, pytracer_config, tmp_path, script,
+                     ["numpy"], mode="sync")
+    records = trace(script_runner, pytracer_config, tmp_path, script,
+                    ["numpy"], mode="async", queue_size=1,
+                    backpressure="drop")
+    # Records are only dropped, those written keep their order
+    times = [record["time"] for record in expected]
+    kept = [record["time"] for record in records]
+    assert 0 < len(kept) <= len(times)
+    assert kept == sorted(kept, key=times.index)
@@ -0,0 +1,61 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+import pytracer.core.inout.reader as ioreader
+from pytracer.core.inout import IOType
+
+script = """
+import numpy as np
+
+x = np.linspace(0, 1, 10000)
+for i in range(3):
+    y = np.sin(x + i)
+    z = np.sum(y)
+    w = np.add(x, x)
+"""
+
+
+def trace(script_runner, pytracer_config, tmp_path, iotype):
+    path = tmp_path / "script.py"
+    path.write_text(script)
+    # The reader logs while it opens the trace
+    pytracer_config(modules_to_load=["numpy"],
+                    io={"type": iotype},
+                    logger={"level": "debug"})
+    ret = script_runner.run(["pytracer", "trace", "--command", str(path)])
+    assert ret.success
+
+
+def get_trace(extension):
+    traces = glob.glob(f".__pytracercache__/traces/*{extension}")
+    assert len(traces) == 1
+    return traces[0]
+
+
+def assert_same_records(pickle_trace, binary_trace):
+    pickle_reader = ioreader.get_reader(IOType.PICKLE)(pickle_trace)
+    binary_reader = ioreader.get_reader(IOType.BINARY)(binary_trace)
+    records = 0
+    for expected, record in zip(pickle_reader, binary_reader):
+        for key in ("module", "function", "label", "time"):
+            assert record[key] == expected[key]
+        assert record["args"].keys() == expected["args"].keys()
+        for name, value in expected["args"].items():
+            if isinstance(value, np.ndarray):
+                np.testing.assert_array_equal(record["args"][name], value)
+        records += 1
+    assert records == len(binary_reader) > 0
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_trace_parse_binary(script_runner, pytracer_config, tmp_path):
+    trace(script_runner, pytracer_config, tmp_path, "pickle")
+    trace(script_runner, pytracer_config, tmp_path, "binary")
+    assert_same_records(get_trace(".pkl"), get_trace(".ptb"))
+    # The traces of a directory are parsed together
+    os.remove(get_trace(".pkl"))
+    ret = script_runner.run(["pytracer", "parse", "--format", "binary"])
+    assert ret.success
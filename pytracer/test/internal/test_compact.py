@@ -0,0 +1,85 @@
+import glob
+from itertools import zip_longest
+
+import numpy as np
+import pytest
+
+import pytracer.core.inout.delta as delta
+import pytracer.core.inout.reader as ioreader
+from pytracer.core.inout import IOType
+
+script = """
+import os
+
+import numpy as np
+
+x = np.linspace(0, 1, 1000)
+for i in range(int(os.environ["PYTRACER_TEST_CALLS"])):
+    y = np.sin(x + i)
+    z = np.cos(y)
+"""
+
+
+def trace(script_runner, tmp_path, monkeypatch, calls):
+    path = tmp_path / "script.py"
+    path.write_text(script)
+    monkeypatch.setenv("PYTRACER_TEST_CALLS", str(calls))
+    before = set(glob.glob(".__pytracercache__/traces/*.pkl"))
+    ret = script_runner.run(["pytracer", "trace", "--command", str(path)])
+    assert ret.success
+    trace, = set(glob.glob(".__pytracercache__/traces/*.pkl")) - before
+    return trace
+
+
+def read(filename):
+    records = []
+    for record in ioreader.get_reader(IOType.PICKLE)(filename):
+        # Arguments deduplicated in blobs are read before compaction
+        record["args"] = dict(record["args"].items())
+        records.append(record)
+    return records
+
+
+def assert_same_records(expected, records):
+    assert len(records) == len(expected)
+    for x, y in zip(expected, records):
+        for key in ("module", "function", "label", "time"):
+            assert x[key] == y[key]
+        assert x["args"].keys() == y["args"].keys()
+        for name, value in x["args"].items():
+            if isinstance(value, np.ndarray):
+                np.testing.assert_array_equal(y["args"][name], value)
+
+
+def decode(reference, filename):
+    records = []
+    for ref_record, record in zip_longest(read(reference), read(filename)):
+        if record is None:
+            break
+        if ref_record is not None:
+            delta.reconstruct([ref_record, record])
+        records.append(record)
+    return records
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_compact(script_runner, pytracer_config, tmp_path, monkeypatch):
+    pytracer_config(modules_to_load=["numpy"])
+    reference = trace(script_runner, tmp_path, monkeypatch, 3)
+    # Traces as long as the reference and longer than it
+    traces = [trace(script_runner, tmp_path, monkeypatch, calls)
+              for calls in (3, 5)]
+    expected = [read(filename) for filename in traces]
+    assert len(expected[1]) > len(expected[0]) == len(read(reference))
+
+    ret = script_runner.run(["pytracer", "compact",
+                             "--directory", ".__pytracercache__/traces",
+                             "--reference", reference])
+    assert ret.success
+    assert not glob.glob(".__pytracercache__/traces/*.compact")
+    for filename, records in zip(traces, expected):
+        compacted = read(filename)
+        assert any(isinstance(value, delta.XorDelta)
+                   for record in compacted
+                   for value in dict.values(record["args"]))
+        assert_same_records(records, decode(reference, filename))
@@ -0,0 +1,82 @@
+import glob
+import os
+
+import dill as pickle
+import numpy as np
+import pytest
+
+import pytracer.core.inout.blob as blob
+import pytracer.core.inout.reader as ioreader
+from pytracer.core.inout import IOType
+
+script = """
+import numpy as np
+
+x = np.linspace(0, 1, 10000)
+for i in range(3):
+    y = np.sin(x)
+    z = np.add(x, x)
+    w = np.sum(np.cos(x[:10]))
+"""
+
+
+def trace(script_runner, pytracer_config, tmp_path, enable):
+    path = tmp_path / "script.py"
+    path.write_text(script)
+    pytracer_config(modules_to_load=["numpy"],
+                    io={"dedup": {"enable": enable, "min_bytes": 4096}})
+    before = set(glob.glob(".__pytracercache__/traces/*.pkl"))
+    ret = script_runner.run(["pytracer", "trace", "--command", str(path)])
+    assert ret.success
+    trace, = set(glob.glob(".__pytracercache__/traces/*.pkl")) - before
+    return trace
+
+
+def read(filename):
+    records = []
+    for record in ioreader.get_reader(IOType.PICKLE)(filename):
+        references = [name for name, value in dict.items(record["args"])
+                      if isinstance(value, blob.BlobReference)]
+        records.append((record, dict(record["args"].items()), references))
+    return records
+
+
+def read_index(filename):
+    digests = []
+    path = os.path.join(f"{filename}.blobs", blob.index_filename)
+    with open(path, "rb") as istream:
+        while True:
+            try:
+                digest, _, _ = pickle.load(istream)
+            except EOFError:
+                return digests
+            digests.append(digest)
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_dedup(script_runner, pytracer_config, tmp_path):
+    expected = read(trace(script_runner, pytracer_config, tmp_path, False))
+    filename = trace(script_runner, pytracer_config, tmp_path, True)
+    records = read(filename)
+    assert not any(references for _, _, references in expected)
+    assert len(records) == len(expected) > 0
+
+    arrays = set()
+    references = 0
+    for (x, x_args, _), (y, y_args, names) in zip(expected, records):
+        for key in ("module", "function", "label", "time"):
+            assert x[key] == y[key]
+        assert x_args.keys() == y_args.keys()
+        for name, value in x_args.items():
+            if isinstance(value, np.ndarray):
+                np.testing.assert_array_equal(y_args[name], value)
+                # Only the large arrays are stored in blobs
+                assert (name in names) == (value.nbytes >= 4096)
+                if name in names:
+                    arrays.add(blob.get_digest(value))
+        references += len(names)
+
+    # Each distinct array is stored once
+    digests = read_index(filename)
+    assert sorted(digests) == sorted(arrays)
+    assert references > len(digests)
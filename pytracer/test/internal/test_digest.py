@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+import scipy.sparse as spr
+
+from pytracer.cache import module_args
+from pytracer.core.stats import digest
+from pytracer.core.stats.numpy import StatisticNumpy
+from pytracer.core.stats.stream import ScalarBatch, get_accumulator
+
+
+def get_padded(value, samples, seed=0):
+    # Extended precision floats with garbage in their padding
+    array = np.full(samples, value, dtype=np.longdouble)
+    if np.finfo(array.dtype).nmant == 63:
+        rng = np.random.default_rng(seed)
+        bytes_ = array.view(np.uint8).reshape(samples, -1)
+        bytes_[:, digest._extended_bytes:] = rng.integers(
+            0, 256, bytes_[:, digest._extended_bytes:].shape)
+    return array
+
+
+def merge(samples, scalars=None):
+    accumulator = get_accumulator(samples[0], len(samples), scalars)
+    for sample in samples:
+        accumulator.push(sample)
+    stats = accumulator.get_stats()
+    if scalars is not None:
+        scalars.compute()
+    return stats
+
+
+def test_digest_padding():
+    x, y = get_padded(1.5, 2)
+    assert digest.get_digest(x) == digest.get_digest(y)
+    assert digest.get_digest(x) != digest.get_digest(np.longdouble(2.5))
+    a, b = get_padded(1.5, 2, seed=1)
+    assert digest.get_digest(np.array([x, a])) == \
+        digest.get_digest(np.array([y, b]))
+
+
+def test_digest_negative_zero():
+    assert digest.get_digest(0.0) != digest.get_digest(-0.0)
+    assert digest.get_digest(np.float64(0.0)) != \
+        digest.get_digest(np.float64(-0.0))
+
+
+def test_scalar_identical_padding():
+    samples = list(get_padded(1.5, 4))
+    stats = merge(samples, ScalarBatch())
+    assert stats.std() == 0
+    assert stats.sig() == StatisticNumpy.max_sig(np.dtype(np.longdouble))
+
+
+@pytest.mark.parametrize("value", [True, False])
+def test_scalar_bool(value):
+    scalar = merge([np.bool_(value)] * 4, ScalarBatch())
+    array = merge([np.array([value])] * 4)
+    assert scalar.dtype() == np.dtype(bool)
+    assert scalar.sig() == array.sig()[0] == 1
+    assert scalar.mean() == array.mean()[0]
+
+
+def test_python_bool():
+    # Python booleans keep the statistics of the other builtin types
+    stats = merge([True] * 4, ScalarBatch())
+    assert np.isnan(stats.mean())
+
+
+def test_scalar_different():
+    samples = list(np.float64(1) + np.arange(4) * 1e-8)
+    stats = merge(samples, ScalarBatch())
+    assert stats.std() > 0
+    assert stats.sig() < StatisticNumpy.max_sig(np.dtype(np.float64))
+
+
+def test_values_memoized(monkeypatch):
+    # Sparse samples are not streamed by the general method
+    monkeypatch.setitem(module_args, "method", "general")
+    value = spr.csr_matrix(np.eye(3))
+    stats = merge([value] * 3)
+    assert isinstance(stats, digest.StatisticDigest)
+    assert (stats.std() != 0).nnz == 0
+
+    samples = [value * (1 + i * 1e-8) for i in range(3)]
+    misses = digest.cache.misses
+    merge(samples)
+    hits = digest.cache.hits
+    stats = merge(samples)
+    assert isinstance(stats, digest.StatisticDigest)
+    assert digest.cache.misses == misses + 1
+    assert digest.cache.hits == hits + 1
+
+
+def test_cache_bytes():
+    def get_stats(size):
+        return tuple(np.zeros(size) for _ in range(3))
+
+    # Room for four entries of three statistics of 800 bytes
+    cache = digest.StatisticsCache(12000)
+    for key in range(4):
+        cache.put(key, get_stats(100))
+    assert len(cache.entries) == 4
+    assert 4 * 2400 < cache.nbytes <= 12000
+    cache.put(4, get_stats(100))
+    assert cache.get(0) is None
+    assert cache.get(4) is not None
+    assert cache.nbytes <= 12000
+    # Statistics larger than the cache are not cached
+    cache.put(5, get_stats(1000))
+    assert cache.get(5) is None
+    assert cache.get(1) is not None
@@ -0,0 +1,37 @@
+import pytest
+
+import pytracer.core.inout.exporter._init as _init
+from pytracer.core.config import DictAt
+
+
+def get_parameters(monkeypatch, export):
+    monkeypatch.setattr(_init, "cfg", DictAt({"io": {"export": export}}))
+    parameters = object.__new__(_init.IOInitializer)
+    parameters.read_parameters()
+    return parameters
+
+
+def test_export_parameters_default(monkeypatch):
+    parameters = get_parameters(monkeypatch, {})
+    assert parameters.complib == "zlib"
+    assert parameters.complevel == 9
+    assert parameters.shuffle == _init.Shuffle.BYTE
+    assert parameters.chunk == "auto"
+
+
+def test_export_parameters_filename(monkeypatch):
+    parameters = get_parameters(monkeypatch, "stats.h5")
+    assert parameters.export == "stats.h5"
+    assert parameters.complevel == 9
+
+
+@pytest.mark.parametrize("export,attr,expected", [
+    ({"complevel": 0}, "complevel", 0),
+    ({"chunk": None}, "chunk", None),
+    ({"chunk": 4096}, "chunk", 4096),
+    ({"shuffle": "none"}, "shuffle", _init.Shuffle.NONE),
+    ({"complib": "blosc:lz4"}, "complib", "blosc:lz4"),
+])
+def test_export_parameters_values(monkeypatch, export, attr, expected):
+    parameters = get_parameters(monkeypatch, export)
+    assert getattr(parameters, attr) == expected
@@ -0,0 +1,110 @@
+import glob
+import os
+import re
+
+import pytest
+
+from pytracer.core.wrapper.filter import (Filter, ModuleTrie,
+                                          get_literal_prefix, translate)
+
+patterns = ["numpy", "numpy?", "nump{0,1}y", "sklearn|scipy", "numpy*",
+            "numpy.*", "scipy.linalg", "scipy.sparse.*", "_?numpy",
+            "numpy[0-9]?", "nu(m)?py", "num+py", "(numpy|scipy).core",
+            "*", "scipy\\.special"]
+
+modules = ["numpy", "nump", "numy", "numpyy", "numpy2", "numpy.linalg",
+           "_numpy", "nupy", "nummpy", "sklearn", "scipy", "sklearnscipy",
+           "scipy.linalg", "scipyXlinalg", "scipy.sparse.linalg",
+           "numpy.core", "scipy.core", "scipy.special", "os", ""]
+
+
+def fullmatch(patterns, module):
+    """
+    Groups of the patterns matching module, as the filter did before
+    the trie by matching every pattern
+    """
+    return sorted(pattern for pattern in patterns
+                  if re.fullmatch(translate(pattern), module))
+
+
+def get_trie(patterns):
+    trie = ModuleTrie()
+    for pattern in patterns:
+        trie.add(pattern, pattern)
+    return trie
+
+
+@pytest.mark.parametrize("pattern,prefix", [
+    ("numpy", "numpy"),
+    ("numpy?", "nump"),
+    ("nump{0,1}y", "num"),
+    ("sklearn|scipy", ""),
+    ("numpy.*", "numpy"),
+    ("numpy[0-9]?", "numpy"),
+])
+def test_literal_prefix(pattern, prefix):
+    assert get_literal_prefix(translate(pattern)) == prefix
+
+
+@pytest.mark.parametrize("pattern,module", [
+    ("numpy?", "nump"),
+    ("nump{0,1}y", "numy"),
+    ("sklearn|scipy", "scipy"),
+])
+def test_trie_quantifiers(pattern, module):
+    assert get_trie([pattern]).match(module) == [pattern]
+
+
+@pytest.mark.parametrize("module", modules)
+def test_trie_fullmatch(module):
+    trie = get_trie(patterns)
+    assert sorted(trie.match(module)) == fullmatch(patterns, module)
+
+
+def test_trie_exclude_files():
+    directory = os.path.join(os.path.dirname(__file__), "..", "..",
+                             "data", "config")
+    rules = []
+    for filename in glob.glob(os.path.join(directory, "exclude.*.txt")):
+        with open(filename) as istream:
+            rules += [line.split()[0] for line in istream
+                      if line.strip() and not line.startswith("#")]
+    trie = get_trie(set(rules))
+    names = set(rules) | {name.replace("*", "x") for name in rules} | \
+        set(modules)
+    for module in names:
+        assert sorted(trie.match(module)) == fullmatch(set(rules), module)
+
+
+def get_filter(*rules):
+    _filter = Filter([])
+    for module, function in rules:
+        _filter._add(module, function)
+    return _filter
+
+
+def test_filter_memoized(monkeypatch):
+    _filter = get_filter(("numpy?", "sin"), ("sklearn|scipy", "*"))
+    assert _filter.has_module("nump")
+    assert _filter.has_function("sin", "nump")
+    assert not _filter.has_function("cos", "nump")
+    assert _filter.has_function("cos", "scipy")
+    assert not _filter.has_module("numpy.linalg")
+    # Answered from the caches, the rules are not matched again
+    monkeypatch.setattr(ModuleTrie, "match", None)
+    assert _filter.has_module("nump")
+    assert _filter.has_function("sin", "nump")
+    assert not _filter.has_function("cos", "nump")
+    assert _filter.has_function("cos", "scipy")
+    assert not _filter.has_module("numpy.linalg")
+    assert _filter._modules_cache == {"nump": True, "numpy.linalg": False}
+
+
+def test_filter_add_resets_cache():
+    _filter = get_filter(("numpy", "sin"))
+    assert not _filter.has_module("scipy")
+    assert not _filter.has_function("cos", "numpy")
+    _filter._add("scipy", "cos")
+    _filter._add("numpy", "cos")
+    assert _filter.has_module("scipy")
+    assert _filter.has_function("cos", "numpy")
@@ -0,0 +1,126 @@
+import glob
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import scipy.sparse as spr
+import tables
+
+import pytracer.core.inout.reader as ioreader
+from pytracer.core.inout import IOType
+from pytracer.core.inout.exporter._hdf5 import ExporterHDF5
+from pytracer.core.stats.stream import get_accumulator
+from pytracer.gui.core import Data
+
+script = """
+import numpy as np
+
+# Arguments whose shape changes between calls
+for i in range(1, 5):
+    y = np.sin(np.arange(10 * i, dtype=float).reshape(i, 10))
+    z = np.cos(np.arange(3 * i, dtype=np.float32))
+"""
+
+
+def trace_parse(script_runner, pytracer_config, tmp_path, samples):
+    path = tmp_path / "script.py"
+    path.write_text(script)
+    pytracer_config(modules_to_load=["numpy"])
+    for _ in range(samples):
+        ret = script_runner.run(["pytracer", "trace", "--command", str(path)])
+        assert ret.success
+    ret = script_runner.run(["pytracer", "parse"])
+    assert ret.success
+    export, = glob.glob(".__pytracercache__/stats/*.h5")
+    return export
+
+
+def get_arrays(function):
+    trace = glob.glob(".__pytracercache__/traces/*.pkl")[0]
+    arrays = []
+    for record in ioreader.get_reader(IOType.PICKLE)(trace):
+        if record["function"] != function:
+            continue
+        for name, value in record["args"].items():
+            if isinstance(value, np.ndarray):
+                arrays.append((record["module"], record["label"], name,
+                               record["time"], np.array(value)))
+    return arrays
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_export_layout(script_runner, pytracer_config, tmp_path):
+    export = trace_parse(script_runner, pytracer_config, tmp_path, 2)
+    data = Data(export, ".__pytracercache__")
+    for function in ("sin", "cos"):
+        arrays = get_arrays(function)
+        assert len(arrays) == 8
+        for module, label, name, time, value in arrays:
+            # Both samples are identical
+            stats = {mode: data.get_extra_value(
+                module, function, label, name, time, mode).read()
+                for mode in ("mean", "std", "sig")}
+            np.testing.assert_array_equal(stats["mean"], value)
+            np.testing.assert_array_equal(stats["std"], np.zeros_like(value))
+            assert stats["sig"].shape == value.shape
+    data.data.close()
+
+    with tables.open_file(export) as h5file:
+        # One flat array per statistic, no group per call
+        indexes = [node for node in h5file.walk_nodes("/", "Table")
+                   if node.name == "index"]
+        assert indexes
+        for node in indexes:
+            assert not node._v_parent._v_groups
+
+
+def get_exporter(filename):
+    exporter = object.__new__(ExporterHDF5)
+    exporter.h5file = tables.open_file(str(filename), mode="w")
+    exporter.filters = tables.Filters()
+    exporter.chunk = None
+    exporter.append = None
+    exporter._rows = dict()
+    exporter._nrows = dict()
+    return exporter
+
+
+def get_stats(samples):
+    accumulator = get_accumulator(samples[0], len(samples))
+    for sample in samples:
+        accumulator.push(sample)
+    return accumulator.get_stats()
+
+
+def test_export_sparse(tmp_path):
+    filename = tmp_path / "stats.h5"
+    exporter = get_exporter(filename)
+    backtrace = SimpleNamespace(filename="script.py", line="", lineno=0,
+                                name="")
+    x = spr.csr_matrix(np.array([[1., 0, 2], [0, 3, 0]]))
+    y = spr.csr_matrix(np.array([[1., 0, 2], [0, 4, 0]]))
+    dense = np.arange(6.).reshape(2, 3)
+    # The mean has three nonzeros, the std only one
+    calls = [[x, y], [y, x], [x, y], [dense, dense + 1]]
+    expected = []
+    for time, samples in enumerate(calls):
+        stats = get_stats(samples)
+        expected.append([stats.mean(), stats.std(), stats.sig()])
+        exporter.export({"module": "module", "function": "function",
+                         "label": "inputs", "args": {"x": stats},
+                         "backtrace": backtrace, "id": 0, "time": time},
+                        [10])
+    exporter.end()
+
+    (tmp_path / "sources").mkdir()
+    data = Data(str(filename), str(tmp_path))
+    for time, values in enumerate(expected):
+        for mode, value in zip(("mean", "std", "sig"), values):
+            array = data.get_extra_value("module", "function", "inputs", "x",
+                                         time, mode).read()
+            if spr.issparse(value):
+                value = exporter._get_sparse_representation(value)
+                value = value["Pytracer"]
+            np.testing.assert_array_equal(array, value)
+    data.data.close()
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+package = {
+    "__init__.py": """
+import math
+
+from . import sub
+
+value = 1.5
+
+
+def double(x):
+    return 2 * x
+
+
+def _private():
+    return 0
+
+
+def __getattr__(name):
+    if name == "dynamic":
+        return 42
+    raise AttributeError(name)
+""",
+    "sub.py": """
+def triple(x):
+    return 3 * x
+""",
+}
+
+script = """
+import json
+import sys
+
+import lazymod
+
+star = {}
+exec("from lazymod import *", star)
+result = {
+    "star": sorted(name for name in star if name != "__builtins__"),
+    "dir": dir(lazymod),
+    "sub": dir(lazymod.sub),
+    "all": hasattr(lazymod, "__all__"),
+    "dynamic": lazymod.dynamic,
+    "missing": hasattr(lazymod, "missing"),
+    "calls": [lazymod.double(2), lazymod.sub.triple(2), lazymod.math.pi],
+}
+with open(sys.argv[1], "w") as ostream:
+    json.dump(result, ostream)
+"""
+
+
+def run(script_runner, pytracer_config, tmp_path, lazy):
+    for filename, source in package.items():
+        path = tmp_path / "lazymod" / filename
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(source)
+    path = tmp_path / "script.py"
+    path.write_text(script)
+    output = tmp_path / f"lazy.{lazy}.json"
+    pytracer_config(modules_to_load=["lazymod"],
+                    python_modules_path=str(tmp_path),
+                    wrapper={"lazy": lazy, "plan": False})
+    ret = script_runner.run(["pytracer", "trace", "--command",
+                             str(path), str(output)], cwd=tmp_path)
+    assert ret.success
+    with open(output) as istream:
+        return json.load(istream)
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_lazy_module(script_runner, pytracer_config, tmp_path):
+    eager = run(script_runner, pytracer_config, tmp_path, False)
+    lazy = run(script_runner, pytracer_config, tmp_path, True)
+    assert "double" in eager["star"] and "_private" not in eager["star"]
+    assert eager["dynamic"] == 42 and not eager["missing"]
+    assert lazy == eager
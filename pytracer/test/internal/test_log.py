@@ -0,0 +1,75 @@
+import io
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+import pytracer.utils.log as log
+from pytracer.utils.log import Level, LogLogger, format_message
+from pytracer.utils.singleton import Singleton
+
+
+def test_format_message():
+    assert format_message("message", ()) == "message"
+    assert format_message("%s of %d", ("message", 2)) == "message of 2"
+    assert format_message("%#x", (255,)) == "0xff"
+    # Messages with no arguments are not formatted
+    assert format_message("100%", ()) == "100%"
+    assert format_message(lambda: "message", ()) == "message"
+    assert format_message(lambda: "%s", ("message",)) == "message"
+
+
+@pytest.fixture
+def get_logger(monkeypatch):
+    """
+    LogLogger of the given level, replaced by the previous one after
+    """
+    instances = Singleton._instances
+    previous = instances.pop(LogLogger, None)
+
+    def get(level):
+        instances.pop(LogLogger, None)
+        monkeypatch.setattr(log, "LogInitializer", lambda: SimpleNamespace(
+            level=level, datefmt="%H:%M:%S", ostream=io.StringIO()))
+        return LogLogger()
+
+    yield get
+    instances.pop(LogLogger, None)
+    if previous is not None:
+        instances[LogLogger] = previous
+
+
+@pytest.mark.parametrize("level", list(Level))
+def test_is_enabled(get_logger, level):
+    _logger = get_logger(level)
+    for other in Level:
+        assert _logger.is_enabled(other) == (other >= level)
+    assert _logger.debug_enabled == (level <= Level.DEBUG)
+    assert _logger.info_enabled == (level <= Level.INFO)
+    assert _logger.warning_enabled == (level <= Level.WARNING)
+
+
+@pytest.mark.parametrize("level", [Level.DEBUG, Level.INFO, Level.WARNING])
+def test_log_logger_level(get_logger, caplog, level):
+    _logger = get_logger(level)
+    caplog.set_level(logging.DEBUG)
+    built = []
+
+    def message():
+        built.append(True)
+        return "debug message"
+
+    _logger.debug(message)
+    _logger.debug("debug %s", "args")
+    _logger.info("info %s", "args")
+    _logger.warning("warning %#x", 255)
+    messages = [record.getMessage() for record in caplog.records]
+    expected = []
+    if level <= Level.DEBUG:
+        expected += ["debug message", "debug args"]
+    if level <= Level.INFO:
+        expected += ["info args"]
+    expected += ["warning 0xff"]
+    assert messages == expected
+    # Messages below the level are not even built
+    assert built == ([True] if level <= Level.DEBUG else [])
@@ -0,0 +1,98 @@
+import glob
+import sys
+
+import numpy as np
+import pytest
+import scipy.sparse as spr
+
+import pytracer.core.inout.reader as ioreader
+from pytracer.core.inout import IOType
+from pytracer.utils.memory import Sizer
+
+script = """
+import numpy as np
+
+x = np.linspace(0, 1, 1000)
+for i in range(5):
+    y = np.sin(x + i)
+"""
+
+
+def test_sizer_array_view():
+    x = np.zeros(1000)
+    view = x[::2]
+    # getsizeof does not count the buffer of views
+    assert sys.getsizeof(view) < view.nbytes
+    assert Sizer().sizeof(view) == object.__sizeof__(view) + view.nbytes
+    assert Sizer().sizeof(x) == object.__sizeof__(x) + x.nbytes
+
+
+@pytest.mark.parametrize("fmt", ["csr", "csc", "coo", "dia"])
+def test_sizer_sparse(fmt):
+    matrix = spr.random(50, 40, density=0.1, format=fmt, random_state=0)
+    buffers = [getattr(matrix, name) for name in
+               ("data", "indices", "indptr", "row", "col", "offsets")
+               if isinstance(getattr(matrix, name, None), np.ndarray)]
+    assert len(buffers) >= 2
+    expected = object.__sizeof__(matrix) + \
+        sum(object.__sizeof__(buffer) + buffer.nbytes for buffer in buffers)
+    assert Sizer().sizeof(matrix) == expected
+
+
+def test_sizer_shared():
+    x = np.zeros(1000)
+    sizer = Sizer()
+    # The arrays shared by the arguments are counted once
+    assert sizer.sizeof([x, x, {"x": x}]) < 2 * x.nbytes
+    assert sizer.sizeof([x, x.copy()]) > 2 * x.nbytes
+
+
+@pytest.mark.parametrize("container", [list, tuple, set, dict])
+def test_sizer_sampled(container):
+    arrays = [np.zeros(100) for _ in range(1000)]
+    if container is dict:
+        values = dict(enumerate(arrays))
+    elif container is set:
+        # Arrays cannot be hashed
+        values = {str(i).zfill(800) for i in range(1000)}
+    else:
+        values = container(arrays)
+    exact = Sizer().sizeof(values)
+    sampled = Sizer(sample=10).sizeof(values)
+    # Items of about the same size are estimated from a few of them
+    assert sampled == pytest.approx(exact, rel=0.05)
+    assert Sizer(sample=10).sizeof(values) == sampled
+    # Containers with fewer items than the sample are counted exactly
+    assert Sizer(sample=1000).sizeof(values) == exact
+
+
+def test_sizer_sampled_items():
+    arrays = [np.zeros(10) for _ in range(1000)]
+    sizer = Sizer(sample=10)
+    sized = []
+    sizeof_array = sizer._sizeof_array
+    sizer._handlers[np.ndarray] = lambda o, seen: (
+        sized.append(o), sizeof_array(o, seen))[1]
+    sizer.sizeof(arrays)
+    # Only the sampled items are sized
+    assert len(sized) == 10
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_report_only(script_runner, pytracer_config, tmp_path):
+    path = tmp_path / "script.py"
+    path.write_text(script)
+    pytracer_config(modules_to_load=["numpy"])
+    ret = script_runner.run(["pytracer", "trace", "--report", "only",
+                             "--command", str(path)])
+    assert ret.success
+    # The records are sized, not written: no trace or an empty one
+    for trace in glob.glob(".__pytracercache__/traces/*.pkl"):
+        assert not list(ioreader.get_reader(IOType.PICKLE)(trace))
+    report, = glob.glob(".__pytracercache__/report/*.csv")
+    with open(report) as istream:
+        rows = [line.strip().split(",") for line in istream]
+    sin, = [row for row in rows if row[1] == "sin"]
+    assert float(sin[2]) == 5
+    # Inputs and outputs of 1000 float64
+    assert int(sin[3]) >= 10 * 8000
@@ -0,0 +1,104 @@
+import csv
+import glob
+import json
+import threading
+
+import pytest
+
+from pytracer.core.inout import metrics
+from pytracer.core.inout.metrics import Metrics, Phase
+
+script = """
+import numpy as np
+
+x = np.linspace(0, 1, 100)
+for i in range(10):
+    y = np.sin(x + i)
+"""
+
+
+def run_threads(target, threads=4):
+    barrier = threading.Barrier(threads)
+
+    def run(i):
+        barrier.wait()
+        target(i)
+
+    workers = [threading.Thread(target=run, args=(i,))
+               for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def test_metrics_threads(tmp_path):
+    _metrics = Metrics(True, 3600, str(tmp_path / "metrics"))
+    calls = 2000
+
+    def trace(i):
+        for j in range(calls):
+            # Functions shared by the threads and of their own
+            _metrics.call("module", "shared")
+            _metrics.add("module", "shared", Phase.WRITE, 1)
+            _metrics.call("module", f"f{i}_{j % 10}")
+            if j % 100 == 0:
+                _metrics.snapshot()
+
+    run_threads(trace)
+    counters = _metrics.get_counters()
+    assert counters[("module", "shared")][0] == 4 * calls
+    assert counters[("module", "shared")][2 + Phase.WRITE] == 4 * calls
+    assert len(counters) == 1 + 4 * 10
+    assert sum(values[0] for values in counters.values()) == 8 * calls
+    summary = _metrics.summary()
+    assert summary["phases_ns"]["write"] == 4 * calls
+
+
+def test_metrics_snapshot(tmp_path):
+    _metrics = Metrics(True, 3600, str(tmp_path / "metrics"))
+    _metrics.call("numpy", "sin")
+    _metrics.add("numpy", "sin", Phase.SERIALIZATION, 10)
+    _metrics.record("numpy", "sin", 100, 3)
+    thread = threading.Thread(target=_metrics.call, args=("numpy", "cos"))
+    thread.start()
+    thread.join()
+    summary = _metrics.snapshot()
+
+    with open(_metrics.get_json_path()) as istream:
+        snapshot = json.load(istream)
+    assert snapshot == {**summary, "functions": snapshot["functions"]}
+    assert snapshot["records"] == 1
+    assert snapshot["bytes_written"] == 100
+    assert snapshot["queue_depth_max"] == 3
+    assert snapshot["phases_ns"]["serialization"] == 10
+    functions = {row["function"]: row for row in snapshot["functions"]}
+    assert functions["sin"]["calls"] == 1
+    assert functions["sin"]["bytes"] == 100
+    assert functions["cos"]["calls"] == 1
+
+    with open(_metrics.get_csv_path(), newline="") as istream:
+        rows = list(csv.DictReader(istream))
+    assert list(rows[0]) == metrics.csv_fields
+    assert {row["function"]: int(row["calls"]) for row in rows} == \
+        {"sin": 1, "cos": 1}
+    assert "1 records" in metrics.format_summary(summary)
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_metrics_info(script_runner, pytracer_config, tmp_path):
+    path = tmp_path / "script.py"
+    path.write_text(script)
+    pytracer_config(modules_to_load=["numpy"],
+                    io={"metrics": {"enable": True}})
+    ret = script_runner.run(["pytracer", "trace", "--command", str(path)])
+    assert ret.success
+    snapshot, = glob.glob(".__pytracercache__/**/*metrics*.json",
+                          recursive=True)
+    summary = metrics.load(snapshot)
+    assert summary["records"] > 0
+    assert any(row["function"] == "sin" and row["calls"] == 10
+               for row in summary["functions"])
+    ret = script_runner.run(["pytracer", "info", "--trace"])
+    assert ret.success
+    assert metrics.format_summary(summary) in ret.stdout
@@ -0,0 +1,88 @@
+import glob
+
+import numpy as np
+import pytest
+import tables
+
+from pytracer.core.inout import IOType
+from pytracer.module.parser import get_index
+
+script = """
+import numpy as np
+
+x = np.linspace(0, 1, 100)
+for i in range(6):
+    y = np.sin(x + i)
+    z = np.sum(y)
+    # Arguments and results that are no numbers
+    s = np.array_repr(np.array([np, str(i)], dtype=object))
+"""
+
+long_script = """
+import numpy as np
+
+x = np.linspace(0, 1, 10)
+for i in range(1200):
+    y = np.sin(x + i)
+"""
+
+
+def trace(script_runner, pytracer_config, tmp_path, samples,
+          source=script, **writer):
+    path = tmp_path / "script.py"
+    path.write_text(source)
+    pytracer_config(modules_to_load=["numpy"], io={"writer": writer})
+    for _ in range(samples):
+        ret = script_runner.run(["pytracer", "trace", "--command", str(path)])
+        assert ret.success
+
+
+def parse(script_runner, pytracer_config, jobs):
+    pytracer_config(io={"export": {"filename": f"jobs{jobs}"}})
+    ret = script_runner.run(["pytracer", "parse", "--jobs", str(jobs)])
+    assert ret.success
+    exports = glob.glob(f".__pytracercache__/stats/jobs{jobs}.*.h5")
+    assert len(exports) == 1
+    return exports[0]
+
+
+def assert_same_export(expected, actual):
+    with tables.open_file(expected) as a, tables.open_file(actual) as b:
+        tables_a = {node._v_pathname: node
+                    for node in a.walk_nodes("/", "Table")}
+        tables_b = {node._v_pathname: node
+                    for node in b.walk_nodes("/", "Table")}
+        assert tables_a.keys() == tables_b.keys()
+        assert any(node.name == "values" for node in tables_a.values())
+        for path, node in tables_a.items():
+            for column in node.colnames:
+                x, y = node.col(column), tables_b[path].col(column)
+                if x.dtype.kind == "f":
+                    np.testing.assert_array_equal(x, y)
+                elif x.dtype.fields is None:
+                    assert x.tolist() == y.tolist()
+        for node in a.walk_nodes("/", "EArray"):
+            np.testing.assert_array_equal(
+                node[:], b.get_node(node._v_pathname)[:])
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_parse_jobs(script_runner, pytracer_config, tmp_path):
+    # Memo resets let the traces be split into ranges
+    trace(script_runner, pytracer_config, tmp_path, 2, memo_records=4)
+    expected = parse(script_runner, pytracer_config, 1)
+    assert_same_export(expected, parse(script_runner, pytracer_config, 2))
+    # The workers open no trace of their own
+    assert len(glob.glob(".__pytracercache__/traces/*.pkl")) == 2
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_parse_jobs_default(script_runner, pytracer_config, tmp_path):
+    trace(script_runner, pytracer_config, tmp_path, 2, long_script)
+    traces = glob.glob(".__pytracercache__/traces/*.pkl")
+    # The traces written with the default config can be split
+    starts = set.intersection(*[get_index(IOType.PICKLE, trace).get_starts()
+                                for trace in traces])
+    assert len(starts) > 1
+    expected = parse(script_runner, pytracer_config, 1)
+    assert_same_export(expected, parse(script_runner, pytracer_config, 2))
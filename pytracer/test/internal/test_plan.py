@@ -0,0 +1,97 @@
+import os
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+import pytracer.core.wrapper.plan as plan
+from pytracer.core.wrapper.plan import InstrumentationPlan
+
+
+@pytest.fixture
+def config(monkeypatch, tmp_path):
+    (tmp_path / "planmod.py").write_text("def f():\n    pass\n")
+    (tmp_path / "include.txt").write_text("planmod *\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    config = SimpleNamespace(modules_to_load=["planmod"],
+                             include_file=str(tmp_path / "include.txt"),
+                             exclude_file=[], modules_to_exclude=[],
+                             python_modules_path=None)
+    monkeypatch.setattr(plan, "cfg", config)
+    return config
+
+
+def test_key(config, tmp_path):
+    key = plan.get_key()
+    assert plan.get_key() == key
+
+    (tmp_path / "include.txt").write_text("planmod f\n")
+    filter_key = plan.get_key()
+    assert filter_key != key
+
+    module = tmp_path / "planmod.py"
+    stat = os.stat(module)
+    os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    module_key = plan.get_key()
+    assert module_key not in (key, filter_key)
+
+    config.modules_to_exclude = ["other"]
+    assert plan.get_key() not in (key, filter_key, module_key)
+
+
+def get_plan(path):
+    # A plan of its own, not the one of the tests run
+    _plan = object.__new__(InstrumentationPlan)
+    _plan.enable = True
+    _plan.hits = 0
+    _plan.misses = 0
+    _plan.modified = False
+    _plan.entries = {table: dict() for table in InstrumentationPlan.tables}
+    _plan.path = str(path)
+    _plan.load()
+    return _plan
+
+
+def not_computed():
+    raise AssertionError("The decision is computed again")
+
+
+def test_lookup_replay(tmp_path):
+    path = tmp_path / "plan.pkl"
+    _plan = get_plan(path)
+    assert _plan.lookup("names", "key", lambda: "value") == "value"
+    assert _plan.lookup("names", "key", not_computed) == "value"
+    assert (_plan.hits, _plan.misses) == (1, 1)
+    _plan.save()
+    assert path.is_file()
+
+    replay = get_plan(path)
+    assert replay.lookup("names", "key", not_computed) == "value"
+    assert (replay.hits, replay.misses) == (1, 0)
+    # Nothing new, the plan is not written again
+    assert not replay.modified
+    mtime = os.stat(path).st_mtime_ns
+    replay.save()
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+@pytest.mark.parametrize("content", [
+    b"not a plan",
+    pickle.dumps({"names": {"key": "value"}})[:-4],
+    b"",
+])
+def test_corrupt_plan(tmp_path, content):
+    path = tmp_path / "plan.pkl"
+    path.write_bytes(content)
+    _plan = get_plan(path)
+    computed = []
+
+    def compute():
+        computed.append(True)
+        return "value"
+
+    assert _plan.lookup("names", "key", compute) == "value"
+    assert computed == [True]
+    # The corrupt plan is replaced by the recomputed one
+    _plan.save()
+    assert get_plan(path).lookup("names", "key", not_computed) == "value"
@@ -0,0 +1,97 @@
+import glob
+import json
+import os
+
+import pytest
+
+import pytracer.core.inout.reader as ioreader
+import pytracer.core.inout.sampling as sampling
+from pytracer.core.config import DictAt
+from pytracer.core.inout import IOType
+
+script = """
+import numpy as np
+
+x = np.linspace(0, 1, 100)
+for i in range(200):
+    y = np.sin(x + i)
+"""
+
+
+def budget(**rule):
+    return {"module": "*", "function": "sin", "policy": "budget",
+            "window": 10, **rule}
+
+
+def set_rules(monkeypatch, *rules, **section):
+    monkeypatch.setattr(sampling, "cfg", DictAt(
+        {"sampling": {"enable": True, "rules": list(rules), **section}}))
+
+
+def run(sampler, calls, elapsed=0):
+    kept = []
+    for _ in range(calls):
+        kept.append(sampler.sample("numpy", "sin"))
+        sampler.charge("numpy", "sin", elapsed)
+    return kept
+
+
+def test_schedule_key(monkeypatch, tmp_path):
+    set_rules(monkeypatch, budget(budget=0.1))
+    path = sampling.get_schedule_path(str(tmp_path))
+    assert sampling.get_schedule_path(str(tmp_path)) == path
+    set_rules(monkeypatch, budget(budget=0.2))
+    assert sampling.get_schedule_path(str(tmp_path)) != path
+    frozen = str(tmp_path / "frozen.pkl")
+    set_rules(monkeypatch, budget(budget=0.2), schedule=frozen)
+    assert sampling.get_schedule_path(str(tmp_path)) == frozen
+
+
+def test_schedule_replay(monkeypatch, tmp_path):
+    set_rules(monkeypatch, budget(budget=1e-3))
+    sampler = sampling.Sampler(str(tmp_path))
+    # Every window is over budget, the stride doubles
+    kept = run(sampler, 100, elapsed=1)
+    assert kept.count(True) < 50
+    sampler.save_schedules()
+    assert os.listdir(tmp_path) == [os.path.basename(sampler.schedule_path)]
+
+    # A faster run replays the strides and saves nothing
+    replay = sampling.Sampler(str(tmp_path))
+    assert run(replay, 100) == kept
+    replay.save_schedules()
+    assert len(os.listdir(tmp_path)) == 1
+
+    set_rules(monkeypatch, budget(budget=1e-3, window=20))
+    other = sampling.Sampler(str(tmp_path))
+    assert other.schedule_path != sampler.schedule_path
+    assert run(other, 100) == [True] * 100
+
+
+@pytest.mark.usefixtures("cleandir")
+def test_campaign_schedule(script_runner, pytracer_config, tmp_path):
+    path = tmp_path / "script.py"
+    path.write_text(script)
+    pytracer_config(modules_to_load=["numpy"],
+                    sampling={"enable": True,
+                              "rules": [budget(budget=1e-6)]})
+    ret = script_runner.run(["pytracer", "trace", "--samples", "3",
+                             "--jobs", "3", "--command", str(path)])
+    assert ret.success
+
+    campaign, = glob.glob(".__pytracercache__/campaigns/*")
+    schedule, = glob.glob(f"{campaign}/sampling_schedule.*.pkl")
+    shared = f".__pytracercache__/info/{os.path.basename(schedule)}"
+    assert os.path.isfile(shared)
+    for config in glob.glob(f"{campaign}/*.json"):
+        with open(config) as istream:
+            frozen = json.load(istream)["sampling"]["schedule"]
+        assert os.path.samefile(frozen, schedule)
+
+    traces = glob.glob(".__pytracercache__/traces/campaign.*/*.pkl")
+    assert len(traces) == 3
+    times = [[record["time"] for record in
+              ioreader.get_reader(IOType.PICKLE)(trace)
+              if record["function"] == "sin"] for trace in traces]
+    assert 0 < len(times[0]) < 400
+    assert times[0] == times[1] == times[2]
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from pytracer.cache import module_args
+from pytracer.core.stats.numpy import (Method, get_method,
+                                       significant_digits)
+from pytracer.core.stats.stats import get_stats
+from pytracer.core.stats.stream import get_accumulator, sig_cnh
+
+
+@pytest.fixture(params=["cnh", "general"])
+def method(request, monkeypatch):
+    monkeypatch.setitem(module_args, "method", request.param)
+    return request.param
+
+
+def get_samples(shape, dtype=np.float64, nsamples=8, seed=0):
+    rng = np.random.default_rng(seed)
+    samples = 1 + rng.normal(0, 1e-6, (nsamples, *shape))
+    if np.dtype(dtype).kind == "c":
+        samples = samples + 1j * (2 + rng.normal(0, 1e-5,
+                                                 (nsamples, *shape)))
+    return samples.astype(dtype)
+
+
+def stream(samples):
+    accumulator = get_accumulator(samples[0], len(samples))
+    for sample in samples:
+        accumulator.push(sample)
+    return accumulator.get_stats()
+
+
+@pytest.mark.parametrize("nsamples", [3, 8, 32])
+def test_sig_cnh(nsamples):
+    samples = get_samples((100,), nsamples=nsamples)
+    mean = np.mean(samples, axis=0)
+    std = np.std(samples, axis=0)
+    expected = significant_digits(samples, reference=mean,
+                                  method=Method.CNH)
+    np.testing.assert_allclose(sig_cnh(mean, std, nsamples), expected,
+                               rtol=1e-6)
+
+
+def get_sig(samples, mean, method):
+    # Complex samples have the significant digits of each part
+    if np.iscomplexobj(samples):
+        return get_sig(samples.real, mean.real, method) + \
+            1j * get_sig(samples.imag, mean.imag, method)
+    return significant_digits(samples, reference=mean, method=method)
+
+
+@pytest.mark.parametrize("shape", [(10,), (4, 5)])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64, np.complex128])
+def test_stream_stats(method, shape, dtype):
+    samples = get_samples(shape, dtype)
+    expected = get_stats(list(samples))
+    stats = stream(list(samples))
+    assert stats.count() == len(samples)
+    assert stats.shape() == shape
+    for attr in ("mean", "std"):
+        np.testing.assert_allclose(getattr(stats, attr)(),
+                                   getattr(expected, attr)(), rtol=1e-6)
+    np.testing.assert_allclose(stats.sig(),
+                               get_sig(samples, expected.mean(), get_method()),
+                               rtol=1e-6)
+
+
+@pytest.mark.parametrize("shape", [(10,), (7, 5), (2, 30)])
+@pytest.mark.parametrize("dtype", [np.float64, np.complex128])
+def test_tiled_stats(method, monkeypatch, shape, dtype):
+    samples = get_samples(shape, dtype)
+    expected = stream(list(samples))
+    # Tiles of 8 elements, fewer than a row of some samples
+    monkeypatch.setitem(module_args, "tile_size", 8)
+    accumulator = get_accumulator(samples[0], len(samples))
+    assert accumulator._tiled
+    size = int(np.prod(shape))
+    elements = [range(size)[tile] for tile in accumulator.tiles()]
+    assert len(elements) > 1
+    assert all(len(tile) <= 8 for tile in elements)
+    assert [i for tile in elements for i in tile] == list(range(size))
+    for sample in samples:
+        accumulator.push(sample)
+    stats = accumulator.get_stats()
+    assert stats.count() == len(samples)
+    for attr in ("mean", "std", "sig"):
+        np.testing.assert_allclose(getattr(stats, attr)(),
+                                   getattr(expected, attr)(), rtol=1e-6)
+
+
+@pytest.mark.parametrize("shape", [(10, 3), (2, 30)])
+def test_tiled_identical_stats(monkeypatch, shape):
+    samples = [get_samples(shape, nsamples=1)[0]] * 4
+    expected = stream(samples)
+    monkeypatch.setitem(module_args, "tile_size", 8)
+    stats = stream(samples)
+    assert stats._tiled
+    for attr in ("mean", "std", "sig"):
+        np.testing.assert_array_equal(getattr(stats, attr)(),
+                                      getattr(expected, attr)())
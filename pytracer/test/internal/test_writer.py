@@ -0,0 +1,121 @@
+import io
+import threading
+from types import SimpleNamespace
+
+import dill as pickle
+import pytest
+
+import pytracer.core.inout.writer._pickle as _pickle
+from pytracer.core.inout.metrics import Metrics
+from pytracer.core.inout.reader._pickle import ReaderPickle
+from pytracer.utils import report
+
+
+class Unpicklable:
+
+    def __reduce__(self):
+        raise TypeError("cannot pickle")
+
+
+def get_writer(**parameters):
+    writer = object.__new__(_pickle.WriterPickle)
+    writer._local = threading.local()
+    writer.parameters = SimpleNamespace(
+        **{"writer_memo_records": 0, "writer_memo_bytes": 0, **parameters})
+    writer.memo_size_max = 0
+    writer._memo_records = 0
+    writer._memo_position = 0
+    writer.metrics = Metrics(False, 0, None)
+    writer.ostream = io.BytesIO()
+    writer._init_pickler()
+    return writer
+
+
+def read(writer):
+    reader = object.__new__(ReaderPickle)
+    reader.istream = io.BytesIO(writer.ostream.getvalue())
+    reader.unpickler = pickle.Unpickler(reader.istream)
+    reader.callsites = dict()
+    records = []
+    while True:
+        try:
+            records.append(reader._load())
+        except EOFError:
+            return records
+
+
+def get_record(time, **args):
+    return _pickle.PytracerPickleTrace(
+        id=0, time=time, module="module", function="function",
+        label="inputs", args=args, backtrace=None)
+
+
+def test_dump_failure_leaves_no_record():
+    writer = get_writer()
+    # The shared list is memoized before the dump fails
+    shared = [1, 2, 3]
+    writer._write(get_record(0, x=shared))
+    with pytest.raises(TypeError):
+        writer._write(get_record(1, x=shared, y=Unpicklable()))
+    assert not writer.is_dumping
+    writer._write(get_record(2, x=shared))
+    records = read(writer)
+    assert [record["time"] for record in records] == [0, 2]
+    assert records[1]["args"] == {"x": shared}
+
+
+def test_dump_record_without_args(monkeypatch):
+    monkeypatch.setattr(report, "report", SimpleNamespace(
+        report_only=lambda: False, report_enable=lambda: False),
+        raising=False)
+    writer = get_writer()
+    # Arguments that pickle alone but not within the record
+    monkeypatch.setattr(writer, "clean_args", lambda args: None)
+    writer._dump_record(get_record(0, x=1.5, y=Unpicklable()))
+    writer._dump_record(get_record(1, x=2.5))
+    records = read(writer)
+    assert [record["args"] for record in records] == [{}, {"x": 2.5}]
+
+
+def test_spill_encodes_on_replay(monkeypatch):
+    monkeypatch.setattr(report, "report", SimpleNamespace(
+        report_only=lambda: False, report_enable=lambda: False),
+        raising=False)
+    writer = get_writer()
+    writer.filename = "trace"
+    writer._spill_lock = threading.Lock()
+    writer._spill_ostream = None
+    writer.spilled_records = 0
+    writer._picklable_types = dict()
+    writer.parameters.dedup_enable = False
+    encoded = []
+    clean_args = writer.clean_args
+    monkeypatch.setattr(writer, "clean_args", lambda args: (
+        encoded.append(dict(args)), clean_args(args)))
+    # The application thread spills, only the writer thread encodes
+    writer._spill(get_record(0, x=1.5, y=Unpicklable(), self=None))
+    assert not encoded and writer.spilled_records == 1
+    writer._replay_spill()
+    assert encoded == [{"x": 1.5}]
+    records = read(writer)
+    assert [record["args"] for record in records] == [{"x": 1.5}]
+
+
+def get_index(writer):
+    reader = object.__new__(ReaderPickle)
+    reader.istream = io.BytesIO(writer.ostream.getvalue())
+    return reader.get_index()
+
+
+def test_memo_resets_align():
+    # Samples whose records differ in size reset at different bytes
+    writers = [get_writer(writer_memo_records=3, writer_memo_bytes=400)
+               for _ in range(2)]
+    for time in range(12):
+        writers[0]._write(get_record(time, x=list(range(10 * time))))
+        writers[1]._write(get_record(time, x=time))
+    indexes = [get_index(writer) for writer in writers]
+    assert all(index.records == 12 for index in indexes)
+    assert indexes[0].get_starts() != indexes[1].get_starts()
+    starts = set.intersection(*[index.get_starts() for index in indexes])
+    assert {0, 3, 6, 9} <= starts
@@ -1,9 +1,7 @@
 import os
 
-from pytracer.utils.singleton import Singleton
 
-
-class ContextManager(Singleton):
+class ContextManager:
 
     def __init__(self, env=None, exclude=None):
         """
@@ -15,17 +13,15 @@ class ContextManager(Singleton):
         exclude : list of str, default: None
             list of environment variables to exclude (unset)
         """
-        self._include_env = env
-        self._exclude_env = exclude
+        self._include_env = {} if env is None else env
+        self._exclude_env = [] if exclude is None else exclude
         self._contexts = {}
 
     def _save_contexts(self):
-        if self._include_env is not None:
-            for env in self._include_env.keys():
-                self._contexts[env] = os.getenv(env)
-        if self._exclude_env is not None:
-            for env in self._exclude_env:
-                self._contexts[env] = os.getenv(env)
+        for env in self._include_env.keys():
+            self._contexts[env] = os.getenv(env)
+        for env in self._exclude_env:
+            self._contexts[env] = os.getenv(env)
 
     def _set_contexts(self):
         for env, value in self._include_env.items():
@@ -35,17 +31,26 @@ class ContextManager(Singleton):
                 os.environ.pop(env)
 
     def _restore_context(self):
-        if self._include_env is not None:
-            for env in self._include_env.keys():
-                if value := self._contexts[env]:
-                    os.environ[env] = self._contexts[env]
-                else:  # value is None, it didn't exist before, so we remove it
-                    os.environ.pop(env)
-        if self._exclude_env is not None:
-            for env in self._exclude_env:
-                if value := self._contexts[env]:  # It existed before
-                    os.environ[env] = value
-                # else it didn't exist before
+        for env in self._include_env.keys():
+            if (value := self._contexts[env]) is not None:
+                os.environ[env] = value
+            else:  # value is None, it didn't exist before, so we remove it
+                os.environ.pop(env, None)
+        for env in self._exclude_env:
+            if (value := self._contexts[env]) is not None:  # It existed before
+                os.environ[env] = value
+            # else it didn't exist before
+
+    def get_environ(self):
+        """
+        Copy of the current environment with the context applied,
+        for a subprocess, without modifying os.environ
+        """
+        environ = dict(os.environ)
+        environ.update(self._include_env)
+        for env in self._exclude_env:
+            environ.pop(env, None)
+        return environ
 
     def __enter__(self):
         self._save_contexts()
@@ -13,8 +13,14 @@ class BackendType(Enum):
     VPREC = auto()
 
 
+environment_variable = "VFC_BACKENDS"
+
+
 class Backend:
 
+    # Backends drawing random numbers accept a --seed option
+    seedable = False
+
     def __init__(self, backend_type, **kwargs):
         self._type = backend_type
         self._libname = f"libinterflop_{self._type.name.lower()}.so"
@@ -24,8 +30,12 @@ class Backend:
         options_str = [f"--{item[0]}={item[1]}" for item in self._options.items()]
         return " ".join(options_str)
 
+    def set_default_option(self, name, value):
+        self._options.setdefault(name, value)
+
     def getenv(self):
-        pass
+        backend = f"{self._libname} {self.__options_str()}".strip()
+        return {environment_variable: backend}
 
 
 class BackendIEEE(Backend):
@@ -36,12 +46,16 @@ class BackendIEEE(Backend):
 
 class BackendMCA(Backend):
 
+    seedable = True
+
     def __init__(self, **kwargs):
         super().__init__(BackendType.MCA, **kwargs)
 
 
 class BackendMCAMPFR(Backend):
 
+    seedable = True
+
     def __init__(self, **kwargs):
         super().__init__(BackendType.MCA_MPFR, **kwargs)
 
@@ -60,8 +74,13 @@ _smart_constructor = {
 }
 
 
-def get_env(backend, options=None):
+def get_backend(backend, options=None):
     try:
-        return _smart_constructor[backend](options).getenv()
+        constructor = _smart_constructor[backend]
     except KeyError:
         raise UnknownVerificarloBackend(backend)
+    return constructor(**(options or {}))
+
+
+def get_env(backend, options=None):
+    return get_backend(backend, options).getenv()
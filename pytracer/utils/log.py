@@ -36,6 +36,18 @@ def level_from_str(level):
         return None
 
 
+def format_message(msg, args):
+    """
+    Messages are only formatted when emitted: msg is either the message,
+    a callable returning it or a %-style format of args
+    """
+    if callable(msg):
+        msg = msg()
+    if args:
+        msg = msg % args
+    return msg
+
+
 class LogInitializer(metaclass=singleton.Singleton):
 
     ofilename_default = "pytracer.log"
@@ -94,6 +106,17 @@ class Log(metaclass=singleton.Singleton):
 
     def __init__(self):
         self.parameters = LogInitializer()
+        self.level = self.parameters.level
+        # Plain booleans: comparing enums costs more than the call
+        self.debug_enabled = self.is_enabled(Level.DEBUG)
+        self.info_enabled = self.is_enabled(Level.INFO)
+        self.warning_enabled = self.is_enabled(Level.WARNING)
+
+    def is_enabled(self, level):
+        """
+        True if messages of this level are emitted
+        """
+        return level >= self.level
 
     @ abstractmethod
     def start(self):
@@ -104,23 +127,24 @@ class Log(metaclass=singleton.Singleton):
         pass
 
     @ abstractmethod
-    def debug(self, msg, caller=None):
+    def debug(self, msg, *args, caller=None):
         pass
 
     @ abstractmethod
-    def info(self, msg, caller=None):
+    def info(self, msg, *args, caller=None):
         pass
 
     @ abstractmethod
-    def warning(self, msg, caller=None, error=None):
+    def warning(self, msg, *args, caller=None, error=None):
         pass
 
     @ abstractmethod
-    def error(self, msg, caller=None, error=None, raise_error=True):
+    def error(self, msg, *args, caller=None, error=None, raise_error=True):
         pass
 
     @ abstractmethod
-    def critical(self, msg, caller=None, error=None, raise_error=True):
+    def critical(self, msg, *args, caller=None, error=None,
+                 raise_error=True):
         pass
 
 
@@ -155,10 +179,12 @@ class LogPrint(Log):
     def flush(self):
         self.parameters.ostream.flush()
 
-    def _print(self, level, caller, msg, ostream=None):
-        if self.parameters.level > level:
+    def _print(self, level, caller, msg, args=(), ostream=None):
+        if self.level > level:
             return
 
+        msg = format_message(msg, args)
+
         if caller:
             scaller = getattr(caller, "__class__", "")
             scaller = getattr(scaller, "__name__", "")
@@ -184,27 +210,30 @@ class LogPrint(Log):
             ostream.write(to_print)
         self.parameters.ostream.write(to_print)
 
-    def debug(self, msg, caller=None):
-        self._print(Level.DEBUG, caller, msg)
+    def debug(self, msg, *args, caller=None):
+        if not self.debug_enabled:
+            return
+        self._print(Level.DEBUG, caller, msg, args)
 
-    def info(self, msg, caller=None):
-        self._print(Level.INFO, caller, msg)
+    def info(self, msg, *args, caller=None):
+        self._print(Level.INFO, caller, msg, args)
 
-    def warning(self, msg, caller=None, error=None):
-        self._print(Level.WARNING, caller, msg, ostream=sys.stderr)
+    def warning(self, msg, *args, caller=None, error=None):
+        self._print(Level.WARNING, caller, msg, args, ostream=sys.stderr)
         if error:
             self._print(Level.WARNING, caller, error, ostream=sys.stderr)
 
-    def error(self, msg, caller=None, error=None, raise_error=True):
-        self._print(Level.ERROR, caller, msg, ostream=sys.stderr)
+    def error(self, msg, *args, caller=None, error=None, raise_error=True):
+        self._print(Level.ERROR, caller, msg, args, ostream=sys.stderr)
         if error:
             self._print(Level.ERROR, caller, error, ostream=sys.stderr)
             if raise_error:
                 raise error
         sys.exit(1)
 
-    def critical(self, msg, caller=None, error=None, raise_error=True):
-        self._print(Level.CRITICAL, caller, msg, ostream=sys.stderr)
+    def critical(self, msg, *args, caller=None, error=None,
+                 raise_error=True):
+        self._print(Level.CRITICAL, caller, msg, args, ostream=sys.stderr)
         if error:
             self._print(Level.CRITICAL, caller, error, ostream=sys.stderr)
             if raise_error:
@@ -247,23 +276,28 @@ class LogLogger(Log):
     def flush(self):
         pass
 
-    def debug(self, msg, caller=None):
-        _msg = self._caller_str(caller) + str(msg)
-        logging.debug(_msg)
+    def _message(self, caller, msg, args):
+        return self._caller_str(caller) + str(format_message(msg, args))
 
-    def info(self, msg, caller=None):
-        _msg = self._caller_str(caller) + str(msg)
-        logging.info(_msg)
+    def debug(self, msg, *args, caller=None):
+        if not self.debug_enabled:
+            return
+        logging.debug(self._message(caller, msg, args))
+
+    def info(self, msg, *args, caller=None):
+        if not self.info_enabled:
+            return
+        logging.info(self._message(caller, msg, args))
 
-    def warning(self, msg, caller=None, error=None):
-        _msg = self._caller_str(caller) + str(msg)
-        logging.warning(_msg)
+    def warning(self, msg, *args, caller=None, error=None):
+        if not self.warning_enabled:
+            return
+        logging.warning(self._message(caller, msg, args))
         if error:
             logging.warning(error)
 
-    def error(self, msg, caller=None, error=None, raise_error=True):
-        _msg = self._caller_str(caller) + str(msg)
-        logging.error(_msg)
+    def error(self, msg, *args, caller=None, error=None, raise_error=True):
+        logging.error(self._message(caller, msg, args))
         if error:
             logging.error(error)
             if raise_error:
@@ -272,9 +306,9 @@ class LogLogger(Log):
         self.end()
         sys.exit(1)
 
-    def critical(self, msg, caller=None, error=None, raise_error=True):
-        _msg = self._caller_str(caller) + str(msg)
-        logging.critical(_msg)
+    def critical(self, msg, *args, caller=None, error=None,
+                 raise_error=True):
+        logging.critical(self._message(caller, msg, args))
         if error:
             logging.critical(error)
             if raise_error:
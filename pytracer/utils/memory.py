@@ -2,8 +2,9 @@
 
 from __future__ import print_function
 
+import random
 from collections import deque
-from itertools import chain
+from itertools import chain, islice
 from sys import getsizeof, stderr
 
 try:
@@ -52,3 +53,100 @@ def total_size(o, handlers={}, verbose=False):
         return s
 
     return sizeof(o)
+
+
+# Buffers of the scipy.sparse formats
+_sparse_buffers = ("data", "indices", "indptr", "row", "col", "offsets")
+
+_sequence_types = (tuple, list, deque)
+_iterable_types = (set, frozenset)
+
+
+class Sizer:
+    """
+    Approximate memory footprint of the traced arguments.
+
+    The way to size a type is resolved once and cached: arrays count
+    their nbytes, sparse matrices their buffers and containers their
+    items. Containers with more than sample items are estimated from
+    sample of them (0 to count every item).
+    """
+
+    def __init__(self, sample=0, seed=0):
+        self.sample = sample
+        self._random = random.Random(seed)
+        self._handlers = {}
+        self._default_size = getsizeof(0)
+
+    def sizeof(self, o):
+        return self._sizeof(o, set())
+
+    def _sizeof(self, o, seen):
+        if id(o) in seen:
+            return 0
+        seen.add(id(o))
+        _type = type(o)
+        try:
+            handler = self._handlers[_type]
+        except KeyError:
+            handler = self._handlers[_type] = self._get_handler(_type)
+        return handler(o, seen)
+
+    def _get_handler(self, _type):
+        if hasattr(_type, "__array_interface__") and hasattr(_type, "nbytes"):
+            return self._sizeof_array
+        if _type.__module__.startswith("scipy.sparse"):
+            return self._sizeof_sparse
+        if issubclass(_type, dict):
+            return self._sizeof_dict
+        if issubclass(_type, _sequence_types):
+            return self._sizeof_sequence
+        if issubclass(_type, _iterable_types):
+            return self._sizeof_iterable
+        return self._sizeof_object
+
+    def _sizeof_object(self, o, seen):
+        return getsizeof(o, self._default_size)
+
+    def _sizeof_array(self, o, seen):
+        # Views do not count their buffer in getsizeof
+        return object.__sizeof__(o) + o.nbytes
+
+    def _sizeof_sparse(self, o, seen):
+        size = object.__sizeof__(o)
+        for name in _sparse_buffers:
+            if (buffer := getattr(o, name, None)) is not None:
+                size += self._sizeof(buffer, seen)
+        return size
+
+    def _sum(self, items, seen):
+        sizeof = self._sizeof
+        size = 0
+        for item in items:
+            size += sizeof(item, seen)
+        return size
+
+    def _is_sampled(self, o):
+        return self.sample and len(o) > self.sample
+
+    def _sizeof_sequence(self, o, seen):
+        size = getsizeof(o)
+        if self._is_sampled(o):
+            indices = self._random.sample(range(len(o)), self.sample)
+            items = [o[i] for i in indices]
+            return size + self._sum(items, seen) * len(o) // self.sample
+        return size + self._sum(o, seen)
+
+    def _sizeof_iterable(self, o, seen):
+        size = getsizeof(o)
+        if self._is_sampled(o):
+            items = islice(o, self.sample)
+            return size + self._sum(items, seen) * len(o) // self.sample
+        return size + self._sum(o, seen)
+
+    def _sizeof_dict(self, o, seen):
+        size = getsizeof(o)
+        if self._is_sampled(o):
+            items = chain.from_iterable(islice(o.items(), self.sample))
+            return size + self._sum(items, seen) * len(o) // self.sample
+        return size + self._sum(o.keys(), seen) + self._sum(o.values(), seen)
@@ -6,7 +6,7 @@ from enum import Enum, auto
 
 from pytracer.core.config import constant
 from pytracer.utils import get_filename
-from pytracer.utils.memory import total_size
+from pytracer.utils.memory import Sizer
 from pytracer.utils.singleton import Singleton
 import pytracer.core.inout._init as _init
 
@@ -23,9 +23,9 @@ class Report(metaclass=Singleton):
 
     def __init__(self, option, filename):
         self.parameters = _init.IOInitializer()
+        self.sizer = Sizer(self.parameters.report_sample)
         self.set_report(option)
         if self.report_enable():
-            self._report_type = None
             self._report_call_dict = {}
             self._report_memory_dict = {}
             self._init_filename(filename)
@@ -91,7 +91,7 @@ class Report(metaclass=Singleton):
 
     def report(self, key, value):
         self.increment_call_report(key)
-        sizeof = total_size(value)
+        sizeof = self.sizer.sizeof(value)
         self.increment_memory_report(key, sizeof)
 
     def dump_report(self):